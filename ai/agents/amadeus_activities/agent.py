@@ -1,5 +1,13 @@
+import logging
+from functools import lru_cache
 
-def get_as_openai_function(query: str) -> dict:
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def get_agent_executor():
+    # Built once and shared by every session; the compiled graph holds no
+    # per-conversation state.
     from ai.models.loader import Loader
     model = Loader.load_model("open_ai_chat_gpt_4o")
     from ai.agents.amadeus_activities.tools import get_activities
@@ -7,10 +15,22 @@ def get_as_openai_function(query: str) -> dict:
     tools = [get_activities]
     from langgraph.prebuilt import create_react_agent
     from ai.agents.amadeus_activities.instruction import system_prompt
-    langgraph_agent_executor = create_react_agent(model, tools, prompt=system_prompt)
-    messages = langgraph_agent_executor.invoke({"messages": [("user", query)]})
+    return create_react_agent(model, tools, prompt=system_prompt)
+
+
+def get_as_openai_function(query: str) -> dict:
+    from ai.agents.llm_timing import LLMTimingCallback
+    from assistant_modules.log_utils import truncate_payload
+    from assistant_modules.tracing import tracer
+
+    langgraph_agent_executor = get_agent_executor()
+    with tracer.span("agent.activities"):
+        messages = langgraph_agent_executor.invoke(
+            {"messages": [("user", query)]},
+            config={"callbacks": [LLMTimingCallback("activities")]},
+        )
     response = messages["messages"][-1].content
-    print("response:", response)
+    logger.info("response: %s", truncate_payload(response))
     return response
 
 
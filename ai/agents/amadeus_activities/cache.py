@@ -0,0 +1,145 @@
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from ai.agents.amadeus_client import get_client
+from ai.locations import geohash
+from assistant_modules.metrics import CACHE_REQUESTS
+from config import ACTIVITY_CACHE_MAX_CELLS, ACTIVITY_CACHE_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+ACTIVITIES_PATH = "/v1/shopping/activities"
+# The largest radius /v1/shopping/activities accepts.
+MAX_UPSTREAM_RADIUS_KM = 20
+
+
+def _compact(activity: dict) -> dict:
+    price = activity.get("price", {})
+    geo = activity["geoCode"]
+    return {
+        "name": activity.get("name"),
+        "price": price.get("amount"),
+        "currency": price.get("currencyCode"),
+        "description": activity.get("shortDescription"),
+        "lat": float(geo["latitude"]),
+        "lon": float(geo["longitude"]),
+    }
+
+
+class ActivityCache(object):
+    """Amadeus activities per geohash cell, shared by every session.
+
+    Each cell is fetched once (a circle around its centre that covers it),
+    trimmed to the activities inside it and kept for `ttl` seconds. A query
+    merges the cells covering its circle and filters by true distance, so
+    "Paris" and "central Paris" share cells and repeats cost no request.
+    Concurrent queries for a cell that is being fetched wait for that fetch
+    instead of starting another.
+    """
+
+    def __init__(self, precision: int = 4, ttl: float = ACTIVITY_CACHE_TTL_SECONDS, max_cells: int = ACTIVITY_CACHE_MAX_CELLS):
+        self.precision = precision
+        self.ttl = ttl
+        self.max_cells = max_cells
+        self._cells = OrderedDict()  # cell -> (expires_at, activities)
+        self._inflight = {}  # cell -> Future of activities
+        self._lock = threading.Lock()
+
+    def _request(self, cell: str) -> Future:
+        lat_lo, lat_hi, lon_lo, lon_hi = geohash.bounds(cell)
+        lat, lon = (lat_lo + lat_hi) / 2, (lon_lo + lon_hi) / 2
+        # Cells are narrower than this away from the equator; near it the
+        # far corners of a cell may fall just outside the upstream circle.
+        radius = min(MAX_UPSTREAM_RADIUS_KM, math.ceil(geohash.distance_km(lat, lon, lat_hi, lon_hi)))
+        params = {"latitude": round(lat, 5), "longitude": round(lon, 5), "radius": radius}
+        return get_client().submit(ACTIVITIES_PATH, params, {"accept": "application/vnd.amadeus+json"})
+
+    def _parse(self, cell: str, data: dict) -> list:
+        lat_lo, lat_hi, lon_lo, lon_hi = geohash.bounds(cell)
+        activities = []
+        for activity in data.get("data", []):
+            try:
+                item = _compact(activity)
+            except (KeyError, TypeError, ValueError):
+                continue
+            # Neighbouring cells' circles overlap; keep each activity in one cell.
+            if lat_lo <= item["lat"] < lat_hi and lon_lo <= item["lon"] < lon_hi:
+                activities.append(item)
+        return activities
+
+    def _store(self, cell: str, activities: list):
+        with self._lock:
+            self._cells[cell] = (time.monotonic() + self.ttl, activities)
+            self._cells.move_to_end(cell)
+            while len(self._cells) > self.max_cells:
+                self._cells.popitem(last=False)
+
+    def search(self, lat: float, lon: float, radius_km: float):
+        """Activities within `radius_km`, nearest first, plus one error per cell that failed.
+
+        Callers get the cells that did load even when others failed, and
+        should say the results may be incomplete.
+        """
+        cells = geohash.cells_covering(lat, lon, radius_km, self.precision)
+        now = time.monotonic()
+        found, waiting, owned = [], {}, {}
+        with self._lock:
+            for cell in cells:
+                entry = self._cells.get(cell)
+                if entry is not None and entry[0] > now:
+                    self._cells.move_to_end(cell)
+                    found.extend(entry[1])
+                    CACHE_REQUESTS.labels("activity_cells", "hit").inc()
+                elif cell in self._inflight:
+                    waiting[cell] = self._inflight[cell]
+                    CACHE_REQUESTS.labels("activity_cells", "shared").inc()
+                else:
+                    waiting[cell] = self._inflight[cell] = owned[cell] = Future()
+                    CACHE_REQUESTS.labels("activity_cells", "miss").inc()
+
+        if owned:
+            pending = {}
+            for cell, future in owned.items():
+                try:
+                    pending[cell] = self._request(cell)
+                except Exception as e:
+                    self._finish(cell, future, error=e)
+            for cell, request in pending.items():
+                try:
+                    activities = self._parse(cell, request.result())
+                except Exception as e:
+                    self._finish(cell, owned[cell], error=e)
+                else:
+                    self._store(cell, activities)
+                    self._finish(cell, owned[cell], activities)
+
+        errors = []
+        for cell, future in waiting.items():
+            try:
+                found.extend(future.result())
+            except Exception as e:
+                errors.append(e)
+
+        results = []
+        for item in found:
+            distance = geohash.distance_km(lat, lon, item["lat"], item["lon"])
+            if distance <= radius_km:
+                results.append(dict(item, distance_km=round(distance, 1)))
+        results.sort(key=lambda item: item["distance_km"])
+        return results, errors
+
+    def _finish(self, cell: str, future: Future, activities: list = None, error: Exception = None):
+        with self._lock:
+            self._inflight.pop(cell, None)
+        if error is not None:
+            logger.warning(f"Activity fetch for cell {cell} failed: {error}")
+            future.set_exception(error)
+        else:
+            future.set_result(activities)
+
+
+activity_cache = ActivityCache()
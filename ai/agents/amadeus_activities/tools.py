@@ -1,67 +1,48 @@
-import os
-import requests
 from langchain.tools import tool
-from typing import List, Dict, Any
 
+from ai.agents.amadeus_activities.cache import activity_cache
+from ai.agents.projections import Activity, render, text
+from ai.locations.tools import resolve_location
+from config import ACTIVITY_SEARCH_RADIUS_KM
 
-api_key = os.environ["AMADEUS_API_KEY"]
-api_secret = os.environ["AMADEUS_API_SECRET"]
-base_url = "https://test.api.amadeus.com"
-
-def get_access_token():
-    """Retrieve an access token for authenticating API requests."""
-    url = f"{base_url}/v1/security/oauth2/token"
-    headers = {"Content-Type": "application/x-www-form-urlencoded"}
-    data = {
-        "grant_type": "client_credentials",
-        "client_id": api_key,
-        "client_secret": api_secret,
-    }
-    response = requests.post(url, headers=headers, data=data)
-    print(response)
-    response.raise_for_status()
-    return response.json()["access_token"]
-access_token = get_access_token()
 
 @tool("get_activities")
-def get_activities(latitude: float, longitude: float) -> Dict[str, Any]:
+def get_activities(location: str = None, latitude: float = None, longitude: float = None) -> str:
     """
-    Get a list of activities based on latitude and longitude.
+    Get a list of activities in a city, by name or by latitude and longitude.
 
     Args:
-        latitude (float): The latitude of the location.
-        longitude (float): The longitude of the location.
+        location (str, optional): The city name as the user said it (e.g., "Rome", "Bombay"). Coordinates are looked up for you.
+        latitude (float, optional): The latitude of the location, only if the user gave coordinates.
+        longitude (float, optional): The longitude of the location, only if the user gave coordinates.
 
     Returns:
-        dict: A dictionary containing a list of simplified activities.
+        str: Compact JSON of up to 3 activities, nearest first; "incomplete" is set when part of the area could not be searched.
     """
-    radius = 25
-    url = f"{base_url}/v1/shopping/activities"
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "accept": "application/vnd.amadeus+json"
-    }
-    params = {
-        "latitude": latitude,
-        "longitude": longitude,
-        "radius": radius
-    }
-
-    try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        data = response.json()
-
-        activities = []
-        for activity in data.get("data", [])[0:3]:  # Limit to 3 activities
-            activities.append({
-                "name": activity.get("name"),
-                "price": activity.get("price", {}).get("amount"),
-                "currency": activity.get("price", {}).get("currencyCode"),
-                "description": activity.get("shortDescription"),
-            })
-
-        return {"activities": activities}
-
-    except requests.RequestException as e:
-        return {"error": str(e)}
+    if latitude is None or longitude is None:
+        if not location:
+            return render("activities", [], error="Give a location name or both latitude and longitude.")
+        resolved = resolve_location(location, kind="city")
+        matches = resolved.get("matches") or []
+        if not matches or matches[0].get("lat") is None:
+            return render("activities", [], **dict(resolved, error=f"Could not find {location!r}"))
+        latitude, longitude = matches[0]["lat"], matches[0]["lon"]
+    activities, errors = activity_cache.search(latitude, longitude, ACTIVITY_SEARCH_RADIUS_KM)
+    if errors and not activities:
+        return render("activities", [], error=str(errors[0]))
+    extra = {}
+    if errors:
+        # Some areas failed (usually rate limiting); say so rather than
+        # presenting a partial list as complete.
+        extra = {"incomplete": True, "failed_areas": len(errors), "error": str(errors[0])}
+    # Nearest first; 3 is what the agent summarises.
+    return render("activities", [
+        Activity(
+            name=text(item["name"]),
+            price=item["price"],
+            currency=item["currency"],
+            description=text(item["description"]),
+            distance_km=item["distance_km"],
+        )
+        for item in activities[:3]
+    ], **extra)
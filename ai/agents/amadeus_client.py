@@ -0,0 +1,151 @@
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from assistant_modules.metrics import AMADEUS_RATE_LIMITED, CACHE_REQUESTS
+from assistant_modules.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+base_url = os.getenv("AMADEUS_BASE_URL", "https://test.api.amadeus.com")
+
+# The test tier allows about 10 requests a second; fan-outs (activity cells,
+# flexible dates, hotel offers) burst past that and get 429s.
+RATE_LIMIT_RETRIES = 3
+RATE_LIMIT_BACKOFF_SECONDS = 0.25
+RATE_LIMIT_MAX_WAIT_SECONDS = 2.0
+
+
+class AmadeusClient(object):
+    """Amadeus API client shared by every agent and session.
+
+    Holds one OAuth token (refreshed shortly before it expires) and one
+    pooled HTTP session, so concurrent sessions reuse TLS connections instead
+    of logging in and reconnecting per module or per call.
+    """
+
+    def __init__(self, api_key: str, api_secret: str, base_url: str = base_url, pool_size: int = 32, max_parallel: int = 8):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.base_url = base_url
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._token = None
+        self._token_expiry = 0.0
+        self._lock = threading.Lock()
+        # Fan-out requests from every session share these workers, which
+        # bounds the parallel load we put on Amadeus.
+        self.max_parallel = max_parallel
+        self._executor = None
+
+    def get_access_token(self, force_refresh: bool = False) -> str:
+        """Retrieve an access token for authenticating API requests."""
+        with self._lock:
+            if not force_refresh and self._token and time.time() < self._token_expiry:
+                CACHE_REQUESTS.labels("amadeus_token", "hit").inc()
+                return self._token
+            CACHE_REQUESTS.labels("amadeus_token", "miss").inc()
+            url = f"{self.base_url}/v1/security/oauth2/token"
+            headers = {"Content-Type": "application/x-www-form-urlencoded"}
+            data = {
+                "grant_type": "client_credentials",
+                "client_id": self.api_key,
+                "client_secret": self.api_secret,
+            }
+            response = self.session.post(url, headers=headers, data=data)
+            logger.info(f"Amadeus token request: {response.status_code}")
+            response.raise_for_status()
+            payload = response.json()
+            self._token = payload["access_token"]
+            # Refresh a minute early so in-flight requests never carry a stale token.
+            self._token_expiry = time.time() + int(payload.get("expires_in", 1799)) - 60
+            return self._token
+
+    def get(self, path: str, params: dict = None, headers: dict = None) -> dict:
+        url = f"{self.base_url}{path}"
+        refresh = False
+        refreshed = False
+        rate_limited = 0
+        while True:
+            request_headers = {"Authorization": f"Bearer {self.get_access_token(force_refresh=refresh)}"}
+            if headers:
+                request_headers.update(headers)
+            with tracer.span("amadeus_http"):
+                response = self.session.get(url, headers=request_headers, params=params)
+            refresh = response.status_code == 401 and not refreshed
+            if refresh:
+                refreshed = True
+                continue
+            if response.status_code == 429:
+                if rate_limited < RATE_LIMIT_RETRIES:
+                    AMADEUS_RATE_LIMITED.labels("retried").inc()
+                    time.sleep(self._retry_delay(response, rate_limited))
+                    rate_limited += 1
+                    continue
+                AMADEUS_RATE_LIMITED.labels("gave_up").inc()
+            break
+        response.raise_for_status()
+        return response.json()
+
+    @staticmethod
+    def _retry_delay(response, attempt: int) -> float:
+        """Retry-After when the server sends one, else jittered exponential backoff."""
+        try:
+            delay = float(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            delay = RATE_LIMIT_BACKOFF_SECONDS * 2 ** attempt * random.uniform(1.0, 1.5)
+        return min(max(delay, 0.0), RATE_LIMIT_MAX_WAIT_SECONDS)
+
+    def submit(self, path: str, params: dict = None, headers: dict = None) -> Future:
+        """Run get() on the shared worker pool."""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.max_parallel, thread_name_prefix="amadeus")
+        return self._executor.submit(self.get, path, params, headers)
+
+    def get_many(self, calls: list) -> list:
+        """get() for each (path, params[, headers]) in parallel on the shared pool.
+
+        Results come back in order; a failed call yields its exception
+        instead of raising, so one bad request does not sink the rest.
+        """
+        futures = [self.submit(*call) for call in calls]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> AmadeusClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = AmadeusClient(
+                    os.environ["AMADEUS_API_KEY"], os.environ["AMADEUS_API_SECRET"]
+                )
+    return _client
+
+
+def prefetch_token():
+    """Fetch the shared token ahead of the first tool call; failures are non-fatal."""
+    try:
+        get_client().get_access_token()
+    except Exception as e:
+        logger.warning(f"Amadeus token prefetch failed: {e}")
@@ -0,0 +1,147 @@
+"""Deterministic ranking of Amadeus flight offers.
+
+Offers are parsed once into parallel NumPy columns (price, total duration,
+stops, first departure) and ranked with vectorised arithmetic: the Pareto
+front over price, duration and stops, then the cheapest, the fastest and the
+best-balanced offer by a weighted score. Only those few winners are
+summarised for the agent, instead of the raw offer JSON.
+"""
+from typing import List, Optional
+
+import numpy as np
+
+from ai.agents.projections import FlightOffer, Itinerary, duration_minutes, render
+
+# Weighted score for "best balanced": price and duration dominate, extra
+# stops and departures at antisocial hours (before 06:00, after 22:00) break ties.
+WEIGHTS = {"price": 0.5, "duration": 0.3, "stops": 0.1, "night": 0.1}
+
+
+def _minute_of_day(timestamp: str) -> int:
+    # "2025-06-01T10:30:00"
+    try:
+        return int(timestamp[11:13]) * 60 + int(timestamp[14:16])
+    except (TypeError, ValueError):
+        return 12 * 60
+
+
+class OfferColumns(object):
+    """Flight offers as parallel arrays; row i is offers[i]."""
+
+    def __init__(self, offers: List[dict]):
+        self.offers = offers
+        count = len(offers)
+        self.price = np.full(count, np.inf)
+        # Unknown price or duration is inf, so it never wins on that column.
+        self.duration = np.full(count, np.inf)
+        self.stops = np.zeros(count, dtype=np.int16)
+        self.departure = np.zeros(count, dtype=np.int16)
+        for i, offer in enumerate(offers):
+            try:
+                self.price[i] = float(offer["price"]["grandTotal"])
+            except (KeyError, TypeError, ValueError):
+                pass
+            itineraries = offer.get("itineraries", [])
+            minutes = [duration_minutes(itinerary.get("duration")) for itinerary in itineraries]
+            if minutes and all(minutes):
+                self.duration[i] = sum(minutes)
+            self.stops[i] = sum(max(0, len(itinerary.get("segments", [])) - 1) for itinerary in itineraries)
+            segments = itineraries[0].get("segments", []) if itineraries else []
+            self.departure[i] = _minute_of_day(segments[0]["departure"].get("at")) if segments else 12 * 60
+
+    def __len__(self) -> int:
+        return len(self.offers)
+
+    def pareto_front(self) -> np.ndarray:
+        """Mask of offers no other offer beats on price, duration and stops at once."""
+        values = np.stack([self.price, self.duration, self.stops], axis=1)
+        no_worse = (values[:, None, :] <= values[None, :, :]).all(axis=2)
+        better = (values[:, None, :] < values[None, :, :]).any(axis=2)
+        # dominates[j, i]: offer j is at least as good everywhere and better somewhere.
+        dominates = no_worse & better
+        return ~dominates.any(axis=0)
+
+    def scores(self) -> np.ndarray:
+        """Weighted cost in [0, 1] per offer; lower is better."""
+
+        def scaled(column):
+            column = column.astype(float)
+            finite = np.isfinite(column)
+            if not finite.any():
+                return np.zeros(len(column))
+            low, high = column[finite].min(), column[finite].max()
+            span = high - low if high > low else 1.0
+            return np.where(finite, (column - low) / span, 1.0)
+
+        night = (self.departure < 6 * 60) | (self.departure >= 22 * 60)
+        return (
+            WEIGHTS["price"] * scaled(self.price)
+            + WEIGHTS["duration"] * scaled(self.duration)
+            + WEIGHTS["stops"] * scaled(self.stops)
+            + WEIGHTS["night"] * night
+        )
+
+    def winners(self) -> List[tuple]:
+        """(index, labels) for the cheapest, fastest and best-balanced offers."""
+        if not len(self):
+            return []
+        priced = np.flatnonzero(np.isfinite(self.price))
+        timed = np.flatnonzero(np.isfinite(self.duration))
+        # An offer missing its price or duration can still be the cheapest or
+        # the fastest on the column it has, but is never the balanced pick.
+        front = np.flatnonzero(self.pareto_front() & np.isfinite(self.price) & np.isfinite(self.duration))
+        scores = self.scores()
+        picks = []
+        # lexsort keys run last-to-first; ties fall to the original order.
+        if len(priced):
+            picks.append(("cheapest", priced[np.lexsort((self.duration[priced], self.price[priced]))[0]]))
+        if len(timed):
+            picks.append(("fastest", timed[np.lexsort((self.price[timed], self.duration[timed]))[0]]))
+        if len(front):
+            picks.append(("best_balanced", front[np.argmin(scores[front])]))
+        labels = {}
+        for label, index in picks:
+            labels.setdefault(int(index), []).append(label)
+        return sorted(labels.items(), key=lambda item: scores[item[0]])
+
+
+def summarise(offer: dict, labels: List[str], carriers: dict = None) -> FlightOffer:
+    """The parts of an offer the agent needs to describe it."""
+    carriers = carriers or {}
+    itineraries = []
+    for itinerary in offer.get("itineraries", []):
+        segments = itinerary.get("segments", [])
+        if not segments:
+            continue
+        itineraries.append(Itinerary(
+            origin=segments[0]["departure"].get("iataCode"),
+            destination=segments[-1]["arrival"].get("iataCode"),
+            departure=segments[0]["departure"].get("at"),
+            arrival=segments[-1]["arrival"].get("at"),
+            duration_minutes=duration_minutes(itinerary.get("duration")) or None,
+            stops=len(segments) - 1,
+            flights=[f"{segment.get('carrierCode', '')}{segment.get('number', '')}" for segment in segments],
+            airlines=sorted({carriers.get(segment.get("carrierCode"), segment.get("carrierCode")) for segment in segments}),
+        ))
+    price = offer.get("price", {})
+    return FlightOffer(labels=labels, price=price.get("grandTotal"), currency=price.get("currency"), itineraries=itineraries)
+
+
+def rank_offers(response: dict) -> str:
+    """Compact, ranked view of a /v2/shopping/flight-offers response."""
+    offers = response.get("data", [])
+    columns = OfferColumns(offers)
+    carriers = response.get("dictionaries", {}).get("carriers", {})
+    ranked = [summarise(offers[index], labels, carriers) for index, labels in columns.winners()]
+    return render("offers", ranked, candidates=len(offers))
+
+
+def cheapest_offer(response: dict) -> Optional[FlightOffer]:
+    """The cheapest offer in a flight-offers response (shortest on a tie)."""
+    offers = response.get("data", [])
+    if not offers:
+        return None
+    columns = OfferColumns(offers)
+    index = int(np.lexsort((columns.duration, columns.price))[0])
+    carriers = response.get("dictionaries", {}).get("carriers", {})
+    return summarise(offers[index], ["cheapest"], carriers)
@@ -1,26 +1,25 @@
-import os
+import logging
+from datetime import date, timedelta
+
 import requests
 from langchain.tools import tool
 
+from ai.agents.amadeus_client import get_client
+from ai.agents.amadeus_flight.ranking import cheapest_offer, rank_offers
+from ai.agents.amadeus_flight.watcher import STATUS_PATH, status_params
+from ai.agents.projections import Airline, CalendarDay, FlightStatus, Location, hotel_offers, render
+from ai.locations.tools import find_nearest_airports
 
-api_key = os.environ["AMADEUS_API_KEY"]
-api_secret = os.environ["AMADEUS_API_SECRET"]
-base_url = "https://test.api.amadeus.com"
+logger = logging.getLogger(__name__)
+
+# Offers fetched per search; ranking happens locally, so more is cheap.
+FLIGHT_CANDIDATES = 50
+# Flexible-date search: at most this many departure days, one request each
+# (run in parallel on the client's shared pool), and fewer offers per day
+# since only the cheapest is kept.
+FLEX_MAX_DAYS = 10
+FLEX_CANDIDATES_PER_DAY = 20
 
-def get_access_token():
-    """Retrieve an access token for authenticating API requests."""
-    url = f"{base_url}/v1/security/oauth2/token"
-    headers = {"Content-Type": "application/x-www-form-urlencoded"}
-    data = {
-        "grant_type": "client_credentials",
-        "client_id": api_key,
-        "client_secret": api_secret,
-    }
-    response = requests.post(url, headers=headers, data=data)
-    print(response)
-    response.raise_for_status()
-    return response.json()["access_token"]
-access_token = get_access_token()
 
 # @tool("search_flights")
 def search_flights(origin: str, destination: str, departure_date: str, return_date: str = None, nonStop: str="true", travelClass:str ="ECONOMY", adults: int = 1):
@@ -36,10 +35,8 @@ def search_flights(origin: str, destination: str, departure_date: str, return_da
         travelClass (str, optional): The travel class (e.g., ECONOMY, BUSINESS). Defaults to "ECONOMY".        
         
     Returns:
-        dict: A dictionary containing flight offers.
+        str: Compact JSON of the cheapest, fastest and best-balanced offers (labelled, possibly the same offer), out of `candidates` searched.
     """
-    url = f"{base_url}/v2/shopping/flight-offers"
-    headers = {"Authorization": f"Bearer {access_token}"}
     params = {
         "originLocationCode": origin,
         "destinationLocationCode": destination,
@@ -47,13 +44,117 @@ def search_flights(origin: str, destination: str, departure_date: str, return_da
         "adults": adults,
         "nonStop": nonStop,
         "travelClass": travelClass,
-        "max": 3,
+        "max": FLIGHT_CANDIDATES,
     }
     if return_date:
         params["returnDate"] = return_date
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
-    return response.json()
+    return rank_offers(get_client().get("/v2/shopping/flight-offers", params=params))
+
+
+def _cached_calendar(origin, destination, dates, stay_days, nonStop):
+    """Days from /v1/shopping/flight-dates, or None when it has no answer.
+
+    The endpoint serves cached one-adult economy fares and only knows some
+    routes; anything it cannot answer falls back to the live fan-out.
+    """
+    params = {
+        "origin": origin,
+        "destination": destination,
+        "departureDate": f"{dates[0].isoformat()},{dates[-1].isoformat()}",
+        "oneWay": "false" if stay_days else "true",
+        "nonStop": nonStop,
+        "viewBy": "DATE",
+    }
+    if stay_days:
+        params["duration"] = stay_days
+    try:
+        data = get_client().get("/v1/shopping/flight-dates", params=params)
+    except requests.RequestException as e:
+        logger.info(f"Cached flight dates unavailable for {origin}-{destination}: {e}")
+        return None
+    currency = data.get("meta", {}).get("currency")
+    prices = {item.get("departureDate"): item for item in data.get("data", [])}
+    if not prices:
+        return None
+    calendar = []
+    for day in dates:
+        item = prices.get(day.isoformat())
+        if item is None:
+            calendar.append(CalendarDay(date=day.isoformat(), note="no cached fare"))
+        else:
+            calendar.append(CalendarDay(
+                date=day.isoformat(),
+                return_date=item.get("returnDate"),
+                price=item.get("price", {}).get("total"),
+                currency=currency,
+            ))
+    return calendar
+
+
+def _live_calendar(origin, destination, dates, stay_days, nonStop, travelClass, adults):
+    calls = []
+    for day in dates:
+        params = {
+            "originLocationCode": origin,
+            "destinationLocationCode": destination,
+            "departureDate": day.isoformat(),
+            "adults": adults,
+            "nonStop": nonStop,
+            "travelClass": travelClass,
+            "max": FLEX_CANDIDATES_PER_DAY,
+        }
+        if stay_days:
+            params["returnDate"] = (day + timedelta(days=stay_days)).isoformat()
+        calls.append(("/v2/shopping/flight-offers", params))
+    calendar = []
+    for (_, params), result in zip(calls, get_client().get_many(calls)):
+        day, return_date = params["departureDate"], params.get("returnDate")
+        if isinstance(result, Exception):
+            logger.warning(f"Flight search for {origin}-{destination} on {day} failed: {result}")
+            calendar.append(CalendarDay(date=day, return_date=return_date, note="search failed"))
+            continue
+        offer = cheapest_offer(result)
+        if offer is None:
+            calendar.append(CalendarDay(date=day, return_date=return_date, note="no flights"))
+        else:
+            calendar.append(CalendarDay.from_offer(day, return_date, offer))
+    return calendar
+
+
+@tool("search_flexible_dates")
+def search_flexible_dates(origin: str, destination: str, earliest_date: str, latest_date: str, stay_days: int = None, nonStop: str = "true", travelClass: str = "ECONOMY", adults: int = 1) -> str:
+    """
+    Find the cheapest day to fly within a date window, e.g. "around the 25th" or "cheapest day next week".
+    Args:
+        origin (str): The IATA code of the origin airport.
+        destination (str): The IATA code of the destination airport.
+        earliest_date (str): First departure date to consider, in YYYY-MM-DD format.
+        latest_date (str): Last departure date to consider, in YYYY-MM-DD format. At most 10 days are searched.
+        stay_days (int, optional): For a return trip, nights between departure and return. Omit for one-way.
+        nonStop (str, optional): "true" for non-stop flights only. Defaults to "true".
+        travelClass (str, optional): The travel class (e.g., ECONOMY, BUSINESS). Defaults to "ECONOMY".
+        adults (int, optional): Number of adult passengers. Defaults to 1.
+    Returns:
+        str: Compact JSON price calendar: the cheapest offer per departure day and the cheapest_date overall.
+    """
+    try:
+        first, last = date.fromisoformat(earliest_date), date.fromisoformat(latest_date)
+    except ValueError as e:
+        # Same shape as a calendar, so the agent always gets a string.
+        return render("days", [], error=f"Invalid date: {e}")
+    if last < first:
+        first, last = last, first
+    dates = [first + timedelta(days=offset) for offset in range(min((last - first).days + 1, FLEX_MAX_DAYS))]
+
+    calendar, source = None, "live"
+    if travelClass.upper() == "ECONOMY" and int(adults) == 1:
+        calendar, source = _cached_calendar(origin, destination, dates, stay_days, nonStop), "cached"
+    if not calendar:
+        calendar, source = _live_calendar(origin, destination, dates, stay_days, nonStop, travelClass, adults), "live"
+
+    priced = [day for day in calendar if day.price]
+    cheapest = min(priced, key=lambda day: float(day.price)).date if priced else None
+    return render("days", calendar, source=source, cheapest_date=cheapest)
 @tool("search_hotels")
 def search_hotels( city_code: str, check_in_date: str, check_out_date: str, adults: int = 1):
     """
@@ -64,19 +165,15 @@ def search_hotels( city_code: str, check_in_date: str, check_out_date: str, adul
         check_out_date (str): The check-out date in YYYY-MM-DD format.
         adults (int, optional): Number of adult guests. Defaults to 1.
     Returns:
-        dict: A dictionary containing hotel offers.
+        str: Compact JSON of hotel offers.
     """
-    url = f"{base_url}/v2/shopping/hotel-offers"
-    headers = {"Authorization": f"Bearer {access_token}"}
     params = {
         "cityCode": city_code,
         "checkInDate": check_in_date,
         "checkOutDate": check_out_date,
         "adults": adults,
     }
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
-    return response.json()
+    return render("offers", hotel_offers(get_client().get("/v2/shopping/hotel-offers", params=params)))
 @tool("get_hotel_details")
 def get_hotel_details( hotel_id: str):
     """
@@ -84,14 +181,10 @@ def get_hotel_details( hotel_id: str):
     Args:
         hotel_id (str): The unique identifier of the hotel.
     Returns:
-        dict: A dictionary containing hotel details.
+        str: Compact JSON of the hotel's offers.
     """
-    url = f"{base_url}/v2/shopping/hotel-offers/by-hotel"
-    headers = {"Authorization": f"Bearer {access_token}"}
     params = {"hotelId": hotel_id}
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
-    return response.json()
+    return render("offers", hotel_offers(get_client().get("/v2/shopping/hotel-offers/by-hotel", params=params)))
 @tool("get_airport_and_city_search")
 def get_airport_and_city_search( keyword: str, sub_type: str = "AIRPORT,CITY"):
     """
@@ -100,14 +193,11 @@ def get_airport_and_city_search( keyword: str, sub_type: str = "AIRPORT,CITY"):
         keyword (str): The search keyword.
         sub_type (str, optional): The type of locations to search for (e.g., AIRPORT, CITY). Defaults to "AIRPORT,CITY".
     Returns:
-        dict: A dictionary containing matching airports and cities.
+        str: Compact JSON of matching airports and cities.
     """
-    url = f"{base_url}/v1/reference-data/locations"
-    headers = {"Authorization": f"Bearer {access_token}"}
     params = {"keyword": keyword, "subType": sub_type}
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
-    return response.json()
+    data = get_client().get("/v1/reference-data/locations", params=params)
+    return render("locations", [Location.from_amadeus(item) for item in data.get("data", [])])
 @tool("get_airline_details")
 def get_airline_details( airline_code: str):
     """
@@ -115,14 +205,11 @@ def get_airline_details( airline_code: str):
     Args:
         airline_code (str): The IATA code of the airline.
     Returns:
-        dict: A dictionary containing airline details.
+        str: Compact JSON of airline names.
     """
-    url = f"{base_url}/v1/reference-data/airlines"
-    headers = {"Authorization": f"Bearer {access_token}"}
     params = {"airlineCodes": airline_code}
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
-    return response.json()
+    data = get_client().get("/v1/reference-data/airlines", params=params)
+    return render("airlines", [Airline.from_amadeus(item) for item in data.get("data", [])])
 @tool("get_city_and_airport_codes")
 def get_city_and_airport_codes( latitude: float, longitude: float):
     """
@@ -133,28 +220,20 @@ def get_city_and_airport_codes( latitude: float, longitude: float):
     Returns:
         dict: A dictionary containing city and airport codes.
     """
-    url = f"{base_url}/v1/reference-data/locations/airports"
-    headers = {"Authorization": f"Bearer {access_token}"}
-    params = {"latitude": latitude, "longitude": longitude}
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
-    return response.json()
+    return find_nearest_airports(latitude, longitude)
 @tool("get_flight_status")
-def get_flight_status( flight_number: str, scheduled_departure_date: str):
+def get_flight_status( flight_number: str, scheduled_departure_date: str) -> str:
     """
     Get the status of a flight.
     Args:
-        flight_number (str): The flight number.
+        flight_number (str): The flight number including the airline code, e.g. "AI101" or "6E 2131".
         scheduled_departure_date (str): The scheduled departure date in YYYY-MM-DD format.
     Returns:
-        dict: A dictionary containing the flight status.
+        str: Compact JSON of the flight's schedule and delays.
     """
-    url = f"{base_url}/v2/schedule/flights"
-    headers = {"Authorization": f"Bearer {access_token}"}
-    params = {
-        "flightNumber": flight_number,
-        "scheduledDepartureDate": scheduled_departure_date,
-    }
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
-    return response.json()
\ No newline at end of file
+    try:
+        params = status_params(flight_number, scheduled_departure_date)
+    except ValueError as e:
+        return render("flights", [], error=str(e))
+    data = get_client().get(STATUS_PATH, params=params)
+    return render("flights", [FlightStatus.from_amadeus(item) for item in data.get("data", [])])
\ No newline at end of file
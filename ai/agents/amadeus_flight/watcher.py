@@ -0,0 +1,219 @@
+"""Shared flight-status polling for "tell me if my flight is delayed".
+
+One poller runs per (carrier, flight number, date), however many sessions
+watch that flight, so upstream calls grow with distinct flights rather than
+with users. The poll interval adapts to the schedule: hourly-ish days out,
+every couple of minutes around departure, and polling stops once the
+flight has landed. Each change is pushed to every subscriber's asyncio
+queue; subscriptions nobody reads any more expire on their own.
+"""
+import asyncio
+import logging
+import re
+import time
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from ai.agents.amadeus_client import get_client
+from ai.agents.projections import FlightStatus, to_dict
+from assistant_modules.metrics import FLIGHT_WATCH_POLLERS, FLIGHT_WATCH_POLLS, FLIGHT_WATCH_SUBSCRIPTIONS
+from config import FLIGHT_WATCH_IDLE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+STATUS_PATH = "/v2/schedule/flights"
+
+# (seconds until departure at least, poll interval), first match wins.
+POLL_SCHEDULE = (
+    (24 * 60 * 60, 60 * 60),
+    (6 * 60 * 60, 15 * 60),
+    (2 * 60 * 60, 5 * 60),
+    (0, 2 * 60),
+)
+# While airborne, and when the schedule has no times at all.
+AIRBORNE_INTERVAL = 5 * 60
+UNKNOWN_INTERVAL = 30 * 60
+# Stop this long after the scheduled (plus delayed) arrival.
+LANDED_GRACE_SECONDS = 60 * 60
+QUEUE_SIZE = 8
+
+_FLIGHT_NUMBER = re.compile(r"([A-Z0-9]{2}|[A-Z]{3})\s*-?\s*0*(\d{1,4})")
+
+
+def split_flight_number(flight: str) -> Tuple[str, str]:
+    """("6E", "2131") from "6E 2131"; Amadeus wants carrier and number apart."""
+    match = _FLIGHT_NUMBER.fullmatch(flight.strip().upper())
+    if not match:
+        raise ValueError(f"Not a flight number: {flight!r}")
+    return match.group(1), match.group(2)
+
+
+def status_params(flight: str, date: str) -> dict:
+    carrier, number = split_flight_number(flight)
+    return {"carrierCode": carrier, "flightNumber": number, "scheduledDepartureDate": date}
+
+
+def _timestamp(value: Optional[str], delay_minutes: Optional[int]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp() + (delay_minutes or 0) * 60
+
+
+def poll_interval(status: Optional[FlightStatus], now: float = None) -> Optional[float]:
+    """Seconds until the next poll, or None once the flight has landed."""
+    now = time.time() if now is None else now
+    if status is None:
+        return UNKNOWN_INTERVAL
+    departure = _timestamp(status.scheduled_departure, status.departure_delay_minutes)
+    arrival = _timestamp(status.scheduled_arrival, status.arrival_delay_minutes)
+    if arrival is not None and now > arrival + LANDED_GRACE_SECONDS:
+        return None
+    if departure is None:
+        return UNKNOWN_INTERVAL
+    if now >= departure:
+        return AIRBORNE_INTERVAL
+    for horizon, interval in POLL_SCHEDULE:
+        if departure - now >= horizon:
+            # Wake up about when the next, faster band starts.
+            return min(interval, max(departure - now - horizon, POLL_SCHEDULE[-1][1]))
+    return POLL_SCHEDULE[-1][1]
+
+
+class Subscription(object):
+    """One session's view of a watched flight.
+
+    next() returns the latest FlightStatus on every change (the current one
+    first), or None when the flight has landed or the watch expired. The
+    owner calls touch() whenever its session is in use; a reader parked in
+    next() is not activity, so a forgotten session's watch still expires.
+    """
+
+    def __init__(self, watcher: "FlightWatcher", key: tuple):
+        self.watcher = watcher
+        self.key = key
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+        self.last_active = time.monotonic()
+        self.closed = False
+
+    def touch(self):
+        self.last_active = time.monotonic()
+
+    def idle_for(self, now: float) -> float:
+        return now - self.last_active
+
+    def push(self, status: Optional[FlightStatus]):
+        if self.queue.full():
+            # A slow reader only needs the newest state.
+            self.queue.get_nowait()
+        self.queue.put_nowait(status)
+
+    async def next(self) -> Optional[FlightStatus]:
+        if self.closed and self.queue.empty():
+            return None
+        return await self.queue.get()
+
+    def close(self):
+        self.watcher.unsubscribe(self)
+
+
+class FlightWatcher(object):
+    """Flight-status pollers shared by every session on the event loop."""
+
+    def __init__(self, idle_seconds: float = FLIGHT_WATCH_IDLE_SECONDS):
+        self.idle_seconds = idle_seconds
+        self._subscribers = {}  # key -> set of Subscription
+        self._pollers = {}  # key -> asyncio.Task
+        self._latest = {}  # key -> FlightStatus
+
+    def subscribe(self, flight: str, date: str) -> Subscription:
+        carrier, number = split_flight_number(flight)
+        key = (carrier, number, date)
+        subscription = Subscription(self, key)
+        self._subscribers.setdefault(key, set()).add(subscription)
+        FLIGHT_WATCH_SUBSCRIPTIONS.inc()
+        if key in self._latest:
+            subscription.push(self._latest[key])
+        if key not in self._pollers:
+            self._pollers[key] = asyncio.create_task(self._poll(key))
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        if subscription.closed:
+            return
+        subscription.closed = True
+        FLIGHT_WATCH_SUBSCRIPTIONS.dec()
+        subscribers = self._subscribers.get(subscription.key)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            self._stop(subscription.key)
+
+    def _stop(self, key: tuple):
+        self._subscribers.pop(key, None)
+        self._latest.pop(key, None)
+        poller = self._pollers.pop(key, None)
+        if poller is not None and poller is not asyncio.current_task():
+            poller.cancel()
+
+    def _publish(self, key: tuple, status: Optional[FlightStatus]):
+        for subscription in self._subscribers.get(key, ()):
+            subscription.push(status)
+
+    def _expire_idle(self, key: tuple):
+        now = time.monotonic()
+        for subscription in list(self._subscribers.get(key, ())):
+            if subscription.idle_for(now) > self.idle_seconds:
+                logger.info(f"Flight watch {key} expired after {self.idle_seconds}s without session activity")
+                subscription.push(None)
+                self.unsubscribe(subscription)
+
+    async def _fetch(self, key: tuple) -> Optional[FlightStatus]:
+        carrier, number, date = key
+        params = {"carrierCode": carrier, "flightNumber": number, "scheduledDepartureDate": date}
+        try:
+            data = await asyncio.wrap_future(get_client().submit(STATUS_PATH, params))
+        except Exception as e:
+            logger.warning(f"Flight status poll for {carrier}{number} on {date} failed: {e}")
+            FLIGHT_WATCH_POLLS.labels("error").inc()
+            return None
+        FLIGHT_WATCH_POLLS.labels("ok").inc()
+        items = data.get("data", [])
+        return FlightStatus.from_amadeus(items[0]) if items else None
+
+    async def _poll(self, key: tuple):
+        status = None
+        try:
+            # A poller that was stopped (and maybe replaced) exits at once.
+            while self._pollers.get(key) is asyncio.current_task() and self._subscribers.get(key):
+                fetched = await self._fetch(key)
+                if fetched is not None:
+                    status = fetched
+                    previous = self._latest.get(key)
+                    if previous is None or to_dict(previous) != to_dict(status):
+                        self._latest[key] = status
+                        self._publish(key, status)
+                self._expire_idle(key)
+                if not self._subscribers.get(key):
+                    # The last subscriber expired; _stop() already dropped us.
+                    return
+                interval = poll_interval(status)
+                if interval is None:
+                    self._publish(key, None)
+                    break
+                await asyncio.sleep(interval)
+        finally:
+            if self._pollers.get(key) is asyncio.current_task():
+                for subscription in list(self._subscribers.get(key, ())):
+                    self.unsubscribe(subscription)
+                self._stop(key)
+
+
+flight_watcher = FlightWatcher()
+FLIGHT_WATCH_POLLERS.set_function(lambda: len(flight_watcher._pollers))
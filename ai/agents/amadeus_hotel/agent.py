@@ -1,16 +1,37 @@
+import logging
+from functools import lru_cache
 
-def get_as_openai_function(query: str) -> dict:
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def get_agent_executor():
+    # Built once and shared by every session; the compiled graph holds no
+    # per-conversation state.
     from ai.models.loader import Loader
     model = Loader.load_model("open_ai_chat_gpt_4o")
     from ai.agents.amadeus_hotel.tools import search_hotels
+    from ai.locations.tools import resolve_location
     
-    tools = [ search_hotels]
+    tools = [resolve_location, search_hotels]
     from langgraph.prebuilt import create_react_agent
     from ai.agents.amadeus_hotel.instruction import system_prompt
-    langgraph_agent_executor = create_react_agent(model, tools, prompt=system_prompt)
-    messages = langgraph_agent_executor.invoke({"messages": [("user", query)]})
+    return create_react_agent(model, tools, prompt=system_prompt)
+
+
+def get_as_openai_function(query: str) -> dict:
+    from ai.agents.llm_timing import LLMTimingCallback
+    from assistant_modules.log_utils import truncate_payload
+    from assistant_modules.tracing import tracer
+
+    langgraph_agent_executor = get_agent_executor()
+    with tracer.span("agent.hotel"):
+        messages = langgraph_agent_executor.invoke(
+            {"messages": [("user", query)]},
+            config={"callbacks": [LLMTimingCallback("hotel")]},
+        )
     response = messages["messages"][-1].content
-    print("response:", response)
+    logger.info("response: %s", truncate_payload(response))
     return response
 
 
@@ -1,53 +1,97 @@
-import os
+import logging
+
 import requests
 from langchain.tools import tool
-from typing import List, Dict, Any
-import requests
+from typing import List, Dict, Any, Union
+
+from ai.agents.amadeus_client import get_client
+# One implementation of the flight-status tool, shared with the flight agent.
+from ai.agents.amadeus_flight.tools import get_flight_status
+from ai.agents.projections import Airline, Hotel, Location, hotel_offers, render, text
+from ai.locations.tools import find_nearest_airports
+
+logger = logging.getLogger(__name__)
+
+# Hotels from the city listing that get priced, and hotel IDs per offers request.
+PRICING_CANDIDATES = 20
+PRICING_BATCH_SIZE = 10
+SHORTLIST_SIZE = 6
+MAX_AMENITIES = 8
+
+
+def price_hotels(hotel_ids: List[str], check_in_date: str = None, check_out_date: str = None, adults: int = 1) -> Dict[str, dict]:
+    """Cheapest offer per hotel, from batched multi-ID hotel-offers requests.
+
+    Batches run in parallel on the shared Amadeus pool. Amadeus rejects a
+    whole batch over one bad hotel ID, so a rejected batch is split in half
+    and retried until the offender is isolated; other failures only leave
+    their hotels unpriced. Hotels without availability are left out.
+    """
+    def call(batch):
+        params = {"hotelIds": ",".join(batch), "adults": adults, "bestRateOnly": "true"}
+        if check_in_date:
+            params["checkInDate"] = check_in_date
+        if check_out_date:
+            params["checkOutDate"] = check_out_date
+        return ("/v3/shopping/hotel-offers", params)
+
+    prices = {}
+    batches = [hotel_ids[i:i + PRICING_BATCH_SIZE] for i in range(0, len(hotel_ids), PRICING_BATCH_SIZE)]
+    while batches:
+        retry = []
+        for batch, result in zip(batches, get_client().get_many([call(batch) for batch in batches])):
+            if isinstance(result, Exception):
+                status = getattr(getattr(result, "response", None), "status_code", None)
+                if status == 400 and len(batch) > 1:
+                    middle = len(batch) // 2
+                    retry.extend([batch[:middle], batch[middle:]])
+                else:
+                    logger.warning(f"Hotel pricing failed for {','.join(batch)}: {result}")
+                continue
+            for entry in result.get("data", []):
+                hotel_id = entry.get("hotel", {}).get("hotelId")
+                best = None
+                for offer in entry.get("offers", []):
+                    try:
+                        total = float(offer["price"]["total"])
+                    except (KeyError, TypeError, ValueError):
+                        continue
+                    if best is None or total < best["price"]:
+                        best = {"price": total, "currency": offer["price"].get("currency")}
+                if hotel_id and best:
+                    prices[hotel_id] = best
+        batches = retry
+    return prices
 
-api_key = os.environ["AMADEUS_API_KEY"]
-api_secret = os.environ["AMADEUS_API_SECRET"]
-base_url = "https://test.api.amadeus.com"
-
-def get_access_token():
-    """Retrieve an access token for authenticating API requests."""
-    url = f"{base_url}/v1/security/oauth2/token"
-    headers = {"Content-Type": "application/x-www-form-urlencoded"}
-    data = {
-        "grant_type": "client_credentials",
-        "client_id": api_key,
-        "client_secret": api_secret,
-    }
-    response = requests.post(url, headers=headers, data=data)
-    print(response)
-    response.raise_for_status()
-    return response.json()["access_token"]
-access_token = get_access_token()
 
 # @tool("search_hotels")
 def search_hotels(
     city_code: str,
     amenities: List[str] = None,
     ratings: List[int] = None,
-) -> Dict[str, Any]:
+    check_in_date: str = None,
+    check_out_date: str = None,
+    adults: int = 1,
+) -> Union[str, Dict[str, Any]]:
     """
-    Get a list of hotels by city code with optional filters.
+    Get a priced shortlist of hotels by city code with optional filters.
 
     Args:
         city_code (str): The city IATA code (e.g., BLR for Bangalore).
         amenities (List[str], optional): List of amenities to filter hotels (e.g., ["SWIMMING_POOL", "SPA"]). Options available are: SWIMMING_POOL,SPA,RESTAURANT,GOLF,KITCHEN,BEACH,JACUZZI,SAUNA,MASSAGE
         ratings (List[int], optional): List of hotel star ratings (e.g., [3, 4]). range is from 1 to 5.
+        check_in_date (str, optional): The check-in date in YYYY-MM-DD format. Defaults to today.
+        check_out_date (str, optional): The check-out date in YYYY-MM-DD format. Defaults to the day after check-in.
+        adults (int, optional): Number of adult guests. Defaults to 1.
 
     Returns:
-        dict: A dictionary containing hotel information.
+        str: JSON hotels with name, rating, amenities and, where rooms are available, the lowest total price; cheapest first.
     """
     radius: int = 5,
     radius_unit: str = "KM",
     hotel_source: str = "ALL"
-    url = f"{base_url}/v1/reference-data/locations/hotels/by-city"
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "accept": "application/vnd.amadeus+json"
-    }
+    path = "/v1/reference-data/locations/hotels/by-city"
+    headers = {"accept": "application/vnd.amadeus+json"}
     params = {
         "cityCode": city_code,
         "radius": radius,
@@ -60,19 +104,25 @@ def search_hotels(
         params["ratings"] = ",".join(str(r) for r in ratings)
 
     try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = get_client().get(path, params=params, headers=headers)
+
+        candidates = [hotel for hotel in data.get("data", []) if hotel.get("hotelId")][:PRICING_CANDIDATES]
+        prices = price_hotels([hotel["hotelId"] for hotel in candidates], check_in_date, check_out_date, adults)
 
         hotels = []
-        for hotel in data.get("data", [])[0:6]:
-            hotels.append({
-                "name": hotel.get("name"),
-                "rating": hotel.get("rating"),
-                "amenities": hotel.get("amenities", [])
-            })
+        for hotel in candidates:
+            price = prices.get(hotel["hotelId"], {})
+            hotels.append(Hotel(
+                name=text(hotel.get("name")),
+                rating=hotel.get("rating"),
+                amenities=hotel.get("amenities", [])[:MAX_AMENITIES],
+                price=price.get("price"),
+                currency=price.get("currency"),
+            ))
+        # Priced hotels first, cheapest first; the listing order breaks ties.
+        hotels.sort(key=lambda hotel: hotel.price if hotel.price is not None else float("inf"))
 
-        return {"hotels": hotels}
+        return render("hotels", hotels[:SHORTLIST_SIZE])
 
     except requests.RequestException as e:
         return {"error": str(e)}
@@ -84,14 +134,10 @@ def get_hotel_details( hotel_id: str):
     Args:
         hotel_id (str): The unique identifier of the hotel.
     Returns:
-        dict: A dictionary containing hotel details.
+        str: Compact JSON of the hotel's offers.
     """
-    url = f"{base_url}/v2/shopping/hotel-offers/by-hotel"
-    headers = {"Authorization": f"Bearer {access_token}"}
     params = {"hotelId": hotel_id}
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
-    return response.json()
+    return render("offers", hotel_offers(get_client().get("/v2/shopping/hotel-offers/by-hotel", params=params)))
 @tool("get_airport_and_city_search")
 def get_airport_and_city_search( keyword: str, sub_type: str = "AIRPORT,CITY"):
     """
@@ -100,14 +146,11 @@ def get_airport_and_city_search( keyword: str, sub_type: str = "AIRPORT,CITY"):
         keyword (str): The search keyword.
         sub_type (str, optional): The type of locations to search for (e.g., AIRPORT, CITY). Defaults to "AIRPORT,CITY".
     Returns:
-        dict: A dictionary containing matching airports and cities.
+        str: Compact JSON of matching airports and cities.
     """
-    url = f"{base_url}/v1/reference-data/locations"
-    headers = {"Authorization": f"Bearer {access_token}"}
     params = {"keyword": keyword, "subType": sub_type}
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
-    return response.json()
+    data = get_client().get("/v1/reference-data/locations", params=params)
+    return render("locations", [Location.from_amadeus(item) for item in data.get("data", [])])
 @tool("get_airline_details")
 def get_airline_details( airline_code: str):
     """
@@ -115,14 +158,11 @@ def get_airline_details( airline_code: str):
     Args:
         airline_code (str): The IATA code of the airline.
     Returns:
-        dict: A dictionary containing airline details.
+        str: Compact JSON of airline names.
     """
-    url = f"{base_url}/v1/reference-data/airlines"
-    headers = {"Authorization": f"Bearer {access_token}"}
     params = {"airlineCodes": airline_code}
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
-    return response.json()
+    data = get_client().get("/v1/reference-data/airlines", params=params)
+    return render("airlines", [Airline.from_amadeus(item) for item in data.get("data", [])])
 @tool("get_city_and_airport_codes")
 def get_city_and_airport_codes( latitude: float, longitude: float):
     """
@@ -133,28 +173,4 @@ def get_city_and_airport_codes( latitude: float, longitude: float):
     Returns:
         dict: A dictionary containing city and airport codes.
     """
-    url = f"{base_url}/v1/reference-data/locations/airports"
-    headers = {"Authorization": f"Bearer {access_token}"}
-    params = {"latitude": latitude, "longitude": longitude}
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
-    return response.json()
-@tool("get_flight_status")
-def get_flight_status( flight_number: str, scheduled_departure_date: str):
-    """
-    Get the status of a flight.
-    Args:
-        flight_number (str): The flight number.
-        scheduled_departure_date (str): The scheduled departure date in YYYY-MM-DD format.
-    Returns:
-        dict: A dictionary containing the flight status.
-    """
-    url = f"{base_url}/v2/schedule/flights"
-    headers = {"Authorization": f"Bearer {access_token}"}
-    params = {
-        "flightNumber": flight_number,
-        "scheduledDepartureDate": scheduled_departure_date,
-    }
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
-    return response.json()
\ No newline at end of file
+    return find_nearest_airports(latitude, longitude)
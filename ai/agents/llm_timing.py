@@ -0,0 +1,22 @@
+from langchain_core.callbacks import BaseCallbackHandler
+
+from assistant_modules.tracing import tracer
+
+
+class LLMTimingCallback(BaseCallbackHandler):
+    """Feeds the time spent inside each LLM call of an agent run to the tracer."""
+
+    def __init__(self, agent_name: str):
+        self.stage = f"agent_llm.{agent_name}"
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        tracer.start(self.stage, run_id)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        tracer.start(self.stage, run_id)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        tracer.end(self.stage, run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        tracer.cancel(self.stage, run_id)
@@ -0,0 +1,242 @@
+"""Compact, typed views of Amadeus responses for the agent LLMs.
+
+Raw Amadeus JSON repeats dictionaries, segments and links the agents never
+mention, and every byte of it is tokenised. Each tool instead projects the
+response onto a slotted dataclass holding only what is worth saying aloud,
+and render() serialises the result compactly within a character budget,
+dropping trailing items (and saying so) rather than cutting JSON mid-way.
+"""
+import re
+from dataclasses import dataclass, field, fields, is_dataclass
+from typing import List, Optional
+
+from assistant_modules import codec
+
+# Longest free text kept per field, and the JSON size of one tool result.
+MAX_TEXT = 160
+OUTPUT_BUDGET = 2000
+
+_DURATION = re.compile(r"P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?")
+
+
+def duration_minutes(value: Optional[str]) -> int:
+    """Minutes in an ISO 8601 duration such as "PT14H5M" or "P1DT2H"."""
+    match = _DURATION.fullmatch(value or "")
+    if not match:
+        return 0
+    days, hours, minutes = (int(part or 0) for part in match.groups())
+    return (days * 24 + hours) * 60 + minutes
+
+
+def text(value, limit: int = MAX_TEXT) -> Optional[str]:
+    if value is None:
+        return None
+    value = " ".join(str(value).split())
+    return value if len(value) <= limit else value[:limit - 3] + "..."
+
+
+def to_dict(value):
+    """Dataclasses to plain dicts, leaving out empty fields."""
+    if is_dataclass(value):
+        out = {}
+        for item in fields(value):
+            converted = to_dict(getattr(value, item.name))
+            if converted not in (None, "", [], {}):
+                out[item.name] = converted
+        return out
+    if isinstance(value, (list, tuple)):
+        return [to_dict(item) for item in value]
+    return value
+
+
+def render(key: str, items: list, budget: int = OUTPUT_BUDGET, **extra) -> str:
+    """Compact JSON of {key: items, **extra}, trimmed to `budget` characters."""
+    payload = dict(extra)
+    payload[key] = [to_dict(item) for item in items]
+    output = codec.dumps(payload)
+    total = len(payload[key])
+    while len(output) > budget and payload[key]:
+        payload[key].pop()
+        payload["omitted"] = total - len(payload[key])
+        output = codec.dumps(payload)
+    return output
+
+
+def _minutes(duration: Optional[str]) -> Optional[int]:
+    return duration_minutes(duration) if duration else None
+
+
+@dataclass(slots=True)
+class Location:
+    type: str
+    iata: str
+    name: str
+    city: Optional[str] = None
+    city_code: Optional[str] = None
+    country: Optional[str] = None
+
+    @classmethod
+    def from_amadeus(cls, item: dict) -> "Location":
+        address = item.get("address", {})
+        return cls(
+            type=item.get("subType"),
+            iata=item.get("iataCode"),
+            name=text(item.get("name")),
+            city=address.get("cityName"),
+            city_code=address.get("cityCode"),
+            country=address.get("countryCode"),
+        )
+
+
+@dataclass(slots=True)
+class Airline:
+    code: str
+    name: str
+
+    @classmethod
+    def from_amadeus(cls, item: dict) -> "Airline":
+        return cls(code=item.get("iataCode"), name=item.get("commonName") or item.get("businessName"))
+
+
+@dataclass(slots=True)
+class FlightStatus:
+    flight: str
+    date: Optional[str] = None
+    departure: Optional[str] = None
+    scheduled_departure: Optional[str] = None
+    departure_delay_minutes: Optional[int] = None
+    arrival: Optional[str] = None
+    scheduled_arrival: Optional[str] = None
+    arrival_delay_minutes: Optional[int] = None
+    duration_minutes: Optional[int] = None
+    aircraft: Optional[str] = None
+
+    @classmethod
+    def from_amadeus(cls, item: dict) -> "FlightStatus":
+        designator = item.get("flightDesignator", {})
+        status = cls(flight=f"{designator.get('carrierCode', '')}{designator.get('flightNumber', '')}", date=item.get("scheduledDepartureDate"))
+        for point in item.get("flightPoints", []):
+            for side in ("departure", "arrival"):
+                timings = point.get(side, {}).get("timings", [])
+                if not timings:
+                    continue
+                setattr(status, side, point.get("iataCode"))
+                setattr(status, f"scheduled_{side}", timings[0].get("value"))
+                delays = timings[0].get("delays", [])
+                if delays:
+                    setattr(status, f"{side}_delay_minutes", _minutes(delays[0].get("duration")))
+        segments = item.get("segments", [])
+        if segments:
+            status.duration_minutes = _minutes(segments[0].get("scheduledSegmentDuration"))
+        legs = item.get("legs", [])
+        if legs:
+            status.aircraft = legs[0].get("aircraftEquipment", {}).get("aircraftType")
+        return status
+
+
+@dataclass(slots=True)
+class Hotel:
+    name: str
+    rating: Optional[str] = None
+    amenities: List[str] = field(default_factory=list)
+    price: Optional[float] = None
+    currency: Optional[str] = None
+
+
+@dataclass(slots=True)
+class HotelOffer:
+    hotel: str
+    check_in: Optional[str] = None
+    check_out: Optional[str] = None
+    room: Optional[str] = None
+    board: Optional[str] = None
+    price: Optional[str] = None
+    currency: Optional[str] = None
+    free_cancellation_until: Optional[str] = None
+
+    @classmethod
+    def from_amadeus(cls, hotel: dict, offer: dict) -> "HotelOffer":
+        room = offer.get("room", {})
+        estimated = room.get("typeEstimated", {})
+        description = room.get("description", {}).get("text") or " ".join(
+            str(part) for part in (estimated.get("category"), estimated.get("beds"), estimated.get("bedType")) if part
+        )
+        cancellations = offer.get("policies", {}).get("cancellations", [])
+        return cls(
+            hotel=text(hotel.get("name")),
+            check_in=offer.get("checkInDate"),
+            check_out=offer.get("checkOutDate"),
+            room=text(description, 100),
+            board=offer.get("boardType"),
+            price=offer.get("price", {}).get("total"),
+            currency=offer.get("price", {}).get("currency"),
+            free_cancellation_until=cancellations[0].get("deadline") if cancellations else None,
+        )
+
+
+def hotel_offers(data) -> List[HotelOffer]:
+    """HotelOffers from a hotel-offers response (one hotel or a list of them)."""
+    entries = data.get("data", [])
+    if isinstance(entries, dict):
+        entries = [entries]
+    return [HotelOffer.from_amadeus(entry.get("hotel", {}), offer) for entry in entries for offer in entry.get("offers", [])]
+
+
+@dataclass(slots=True)
+class Activity:
+    name: str
+    price: Optional[str] = None
+    currency: Optional[str] = None
+    description: Optional[str] = None
+    distance_km: Optional[float] = None
+
+
+@dataclass(slots=True)
+class Itinerary:
+    origin: str
+    destination: str
+    departure: str
+    arrival: str
+    duration_minutes: Optional[int]
+    stops: int
+    flights: List[str] = field(default_factory=list)
+    airlines: List[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class FlightOffer:
+    labels: List[str]
+    price: Optional[str]
+    currency: Optional[str]
+    itineraries: List[Itinerary] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class CalendarDay:
+    date: str
+    return_date: Optional[str] = None
+    price: Optional[str] = None
+    currency: Optional[str] = None
+    departure: Optional[str] = None
+    duration_minutes: Optional[int] = None
+    stops: Optional[int] = None
+    flights: List[str] = field(default_factory=list)
+    note: Optional[str] = None
+
+    @classmethod
+    def from_offer(cls, date: str, return_date: Optional[str], offer: FlightOffer) -> "CalendarDay":
+        itineraries = offer.itineraries
+        return cls(
+            date=date,
+            return_date=return_date,
+            price=offer.price,
+            currency=offer.currency,
+            departure=itineraries[0].departure if itineraries else None,
+            duration_minutes=(
+                sum(itinerary.duration_minutes for itinerary in itineraries)
+                if itineraries and all(itinerary.duration_minutes for itinerary in itineraries)
+                else None
+            ),
+            stops=sum(itinerary.stops for itinerary in itineraries),
+            flights=[flight for itinerary in itineraries for flight in itinerary.flights],
+        )
@@ -0,0 +1,97 @@
+"""Geohash cells and great-circle distances for spatial caches.
+
+A geohash of precision p names a lat/lon box; every extra character halves
+it two or three times. At precision 4 a cell is about 39 x 20 km at the
+equator, narrowing with latitude.
+"""
+import math
+from typing import List, Tuple
+
+from ai.locations.index import EARTH_RADIUS_KM
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {c: i for i, c in enumerate(_BASE32)}
+_KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def encode(lat: float, lon: float, precision: int = 4) -> str:
+    lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            value = value * 2 + (lon >= mid)
+            lon_lo, lon_hi = (mid, lon_hi) if lon >= mid else (lon_lo, mid)
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            value = value * 2 + (lat >= mid)
+            lat_lo, lat_hi = (mid, lat_hi) if lat >= mid else (lat_lo, mid)
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def bounds(cell: str) -> Tuple[float, float, float, float]:
+    """(lat_min, lat_max, lon_min, lon_max) of a cell."""
+    lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+    even = True
+    for char in cell:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                lon_lo, lon_hi = (mid, lon_hi) if bit else (lon_lo, mid)
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                lat_lo, lat_hi = (mid, lat_hi) if bit else (lat_lo, mid)
+            even = not even
+    return lat_lo, lat_hi, lon_lo, lon_hi
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """(height, width) of a cell in degrees."""
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+def distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Haversine great-circle distance."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((phi2 - phi1) / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def distance_to_cell_km(lat: float, lon: float, cell: str) -> float:
+    """Distance from a point to the nearest point of a cell (0 inside it)."""
+    lat_lo, lat_hi, lon_lo, lon_hi = bounds(cell)
+    # Compare longitudes on the side of the antimeridian the cell is on.
+    centre = (lon_lo + lon_hi) / 2
+    lon = (lon - centre + 180) % 360 - 180 + centre
+    return distance_km(lat, lon, min(max(lat, lat_lo), lat_hi), min(max(lon, lon_lo), lon_hi))
+
+
+def cells_covering(lat: float, lon: float, radius_km: float, precision: int = 4) -> List[str]:
+    """Cells that intersect the circle of `radius_km` around a point."""
+    height, width = cell_size(precision)
+    dlat = radius_km / _KM_PER_DEGREE
+    dlon = radius_km / (_KM_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+    lat_min, lat_max = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+    lon_span = min(360.0, 2 * dlon)
+    cells = []
+    seen = set()
+    row = lat_min
+    while row < lat_max + height:
+        column = lon - lon_span / 2
+        while column < lon - lon_span / 2 + lon_span + width:
+            cell = encode(min(row, 89.999999), (column + 180) % 360 - 180, precision)
+            if cell not in seen:
+                seen.add(cell)
+                if distance_to_cell_km(lat, lon, cell) <= radius_km:
+                    cells.append(cell)
+            column += width
+        row += height
+    return cells
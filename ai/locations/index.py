@@ -0,0 +1,357 @@
+"""Offline index of cities and airports for resolving spoken place names.
+
+The source of truth is data/airports.csv: one row per airport with its IATA
+code, the IATA code of the city it serves, the city centre and spoken
+aliases of the city ("Bangalore" for Bengaluru, "Bombay" for Mumbai). Every
+distinct city code also becomes a city record, which is what hotel searches
+need, located at the city centre rather than at an airport.
+
+build() turns the CSV into flat NumPy arrays under data/index/ which open()
+memory-maps, so loading costs a few page faults rather than a parse:
+
+    records   one row per city/airport (codes, names, coordinates)
+    keys      normalised search keys, sorted, each pointing at a record
+    grams     sorted trigram codes, with `starts` into `postings` (key ids)
+    key_grams trigram count per key, for the Dice score
+    kd_*      records as unit vectors laid out as an implicit k-d tree
+
+A lookup tries the exact key, then keys starting with the query, then
+trigram overlap, so "Gorakpur" still finds Gorakhpur and "Banglore" finds
+Bengaluru. nearest() walks the k-d tree for the closest airports or cities
+to a coordinate. Regenerate the arrays after editing the CSV:
+
+    python -m ai.locations.index
+"""
+import csv
+import heapq
+import logging
+import math
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+CSV_PATH = os.path.join(DATA_DIR, "airports.csv")
+INDEX_DIR = os.path.join(DATA_DIR, "index")
+
+AIRPORT, CITY = 0, 1
+KIND_NAMES = {AIRPORT: "AIRPORT", CITY: "CITY"}
+
+RECORD_DTYPE = np.dtype([
+    ("kind", "u1"),
+    ("iata", "S3"),
+    ("city_code", "S3"),
+    ("country", "S2"),
+    ("lat", "<f4"),
+    ("lon", "<f4"),
+    ("name", "S64"),
+    ("city", "S48"),
+])
+KEY_DTYPE = np.dtype([("key", "S64"), ("record", "<u4")])
+ARRAYS = ("records", "keys", "grams", "starts", "postings", "key_grams", "kd_records", "kd_points")
+EARTH_RADIUS_KM = 6371.0
+
+# Characters that survive normalise(), in trigram code order.
+_ALPHABET = " abcdefghijklmnopqrstuvwxyz0123456789"
+_CHAR_CODE = {c: i for i, c in enumerate(_ALPHABET)}
+_BASE = len(_ALPHABET)
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+# Spoken queries often carry these; they never distinguish one place from another.
+_NOISE_WORDS = re.compile(r"\b(airport|intl|international|city of|the)\b")
+
+
+def normalise(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+def query_key(text: str) -> str:
+    key = _NOISE_WORDS.sub(" ", normalise(text))
+    return " ".join(key.split()) or normalise(text)
+
+
+def trigrams(key: str) -> np.ndarray:
+    padded = f" {key} "
+    codes = {
+        (_CHAR_CODE[padded[i]] * _BASE + _CHAR_CODE[padded[i + 1]]) * _BASE + _CHAR_CODE[padded[i + 2]]
+        for i in range(len(padded) - 2)
+    }
+    return np.fromiter(codes, dtype="<u4", count=len(codes))
+
+
+def unit_vector(lat: float, lon: float) -> tuple:
+    lat, lon = math.radians(lat), math.radians(lon)
+    return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+
+def chord_to_km(chord: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+def km_to_chord(km: float) -> float:
+    return 2 * math.sin(min(math.pi / 2, km / (2 * EARTH_RADIUS_KM)))
+
+
+def _kd_layout(points: np.ndarray) -> np.ndarray:
+    """Order points so each range [lo, hi) has its splitting node at the middle.
+
+    The split axis cycles x, y, z with depth, so the tree needs no child
+    pointers and is stored as two flat arrays.
+    """
+    order = np.arange(len(points))
+    stack = [(0, len(points), 0)]
+    while stack:
+        lo, hi, depth = stack.pop()
+        if hi - lo <= 1:
+            continue
+        segment = order[lo:hi]
+        order[lo:hi] = segment[np.argsort(points[segment, depth % 3], kind="stable")]
+        mid = (lo + hi) // 2
+        stack.append((lo, mid, depth + 1))
+        stack.append((mid + 1, hi, depth + 1))
+    return order
+
+
+def _read_csv(path: str) -> list:
+    with open(path, newline="", encoding="utf-8") as file:
+        return list(csv.DictReader(file))
+
+
+def build(csv_path: str = CSV_PATH, out_dir: str = None) -> Dict[str, np.ndarray]:
+    """Build the index arrays from the CSV; write them to `out_dir` if given."""
+    rows = _read_csv(csv_path)
+    records = []
+    keys = {}
+
+    def add_key(text: str, record: int):
+        key = normalise(text)
+        if key:
+            keys.setdefault((key, record), None)
+
+    cities = {}
+    for row in rows:
+        code = row["city_code"]
+        if code not in cities:
+            cities[code] = len(records)
+            lat, lon = row["city_lat"] or row["lat"], row["city_lon"] or row["lon"]
+            records.append((CITY, code, code, row["country"], float(lat), float(lon), row["city"], row["city"]))
+            add_key(row["city"], cities[code])
+        for alias in filter(None, row["city_aliases"].split("|")):
+            add_key(alias, cities[code])
+
+    for row in rows:
+        index = len(records)
+        records.append((AIRPORT, row["iata"], row["city_code"], row["country"], float(row["lat"]), float(row["lon"]), row["airport"], row["city"]))
+        add_key(row["airport"], index)
+        add_key(f"{row['city']} {row['airport']}", index)
+
+    record_array = np.array(
+        [(kind, iata.encode(), city_code.encode(), country.encode(), lat, lon, name.encode("utf-8")[:64], city.encode("utf-8")[:48])
+         for kind, iata, city_code, country, lat, lon, name, city in records],
+        dtype=RECORD_DTYPE,
+    )
+    key_array = np.array(sorted((key.encode()[:64], record) for key, record in keys), dtype=KEY_DTYPE)
+
+    points = np.array([unit_vector(lat, lon) for _, _, _, _, lat, lon, _, _ in records])
+    kd_order = _kd_layout(points)
+
+    gram_lists = [trigrams(key.decode()) for key in key_array["key"]]
+    key_ids = np.concatenate([np.full(len(g), i, dtype="<u4") for i, g in enumerate(gram_lists)])
+    all_grams = np.concatenate(gram_lists)
+    order = np.lexsort((key_ids, all_grams))
+    grams, counts = np.unique(all_grams[order], return_counts=True)
+    arrays = {
+        "records": record_array,
+        "keys": key_array,
+        "grams": grams.astype("<u4"),
+        "starts": np.concatenate([[0], np.cumsum(counts)]).astype("<u4"),
+        "postings": key_ids[order],
+        "key_grams": np.array([len(g) for g in gram_lists], dtype="<u2"),
+        "kd_records": kd_order.astype("<u4"),
+        "kd_points": points[kd_order].astype("<f8"),
+    }
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+        for name in ARRAYS:
+            np.save(os.path.join(out_dir, f"{name}.npy"), arrays[name])
+        logger.info(f"Location index: {len(record_array)} records, {len(key_array)} keys, {len(grams)} trigrams -> {out_dir}")
+    return arrays
+
+
+def _stale(index_dir: str, csv_path: str) -> bool:
+    try:
+        built = min(os.path.getmtime(os.path.join(index_dir, f"{name}.npy")) for name in ARRAYS)
+    except OSError:
+        return True
+    return os.path.exists(csv_path) and os.path.getmtime(csv_path) > built
+
+
+class LocationIndex(object):
+    """Exact, prefix and trigram lookup over the prebuilt arrays."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        # Plain ndarray views of the mappings; np.memmap's per-index overhead
+        # dominates lookups this small.
+        (self.records, self.keys, self.grams, self.starts, self.postings, self.key_grams,
+         self.kd_records, self.kd_points) = (np.asarray(arrays[name]) for name in ARRAYS)
+        self._key_text = self.keys["key"]
+        self._key_record = self.keys["record"]
+        # Small per-record lookups; a few hundred entries built in well under a millisecond.
+        self._kinds = self.records["kind"].tolist()
+        self._codes = {}
+        self._airports = {}
+        self._city_codes = [code.decode() for code in self.records["city_code"].tolist()]
+        for i, code in enumerate(code.decode() for code in self.records["iata"].tolist()):
+            # City codes shadow airport codes ("LON" is the city, "LHR" the airport).
+            if self._kinds[i] == CITY or code not in self._codes:
+                self._codes[code] = i
+            if self._kinds[i] == AIRPORT:
+                self._airports.setdefault(self._city_codes[i], []).append(i)
+        self._described = {}
+        # The tree walk is scalar Python; lists beat per-element ndarray access.
+        self._kd_records = self.kd_records.tolist()
+        self._kd_points = self.kd_points.tolist()
+
+    @classmethod
+    def open(cls, index_dir: str = INDEX_DIR, csv_path: str = CSV_PATH) -> "LocationIndex":
+        """Memory-map the prebuilt arrays, rebuilding them if the CSV is newer."""
+        if _stale(index_dir, csv_path):
+            try:
+                build(csv_path, index_dir)
+            except OSError as e:
+                logger.warning(f"Location index not writable ({e}); building in memory")
+                return cls(build(csv_path))
+        return cls({name: np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r") for name in ARRAYS})
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _fuzzy(self, key: str, scores: Dict[int, float], min_score: float):
+        query = trigrams(key)
+        if not len(query):
+            return
+        lo = np.searchsorted(self.grams, query)
+        found = (lo < len(self.grams)) & (self.grams[np.minimum(lo, len(self.grams) - 1)] == query)
+        if not found.any():
+            return
+        lo = lo[found]
+        hits = np.concatenate([self.postings[self.starts[i]:self.starts[i + 1]] for i in lo])
+        common = np.bincount(hits, minlength=len(self.key_grams))
+        dice = 2.0 * common / (len(query) + self.key_grams)
+        for key_id in np.flatnonzero(dice >= min_score):
+            record = int(self._key_record[key_id])
+            # Below an exact or prefix hit on the same spelling.
+            scores[record] = max(scores.get(record, 0.0), 0.95 * float(dice[key_id]))
+
+    def search(self, text: str, kind: str = "any", limit: int = 5, min_score: float = 0.45) -> List[dict]:
+        """Best matches for a spoken city or airport name, highest score first.
+
+        `kind` is "city", "airport" or "any". A matching city also yields its
+        airports when airports are wanted, so "Bombay" resolves to BOM.
+        """
+        key = query_key(text)
+        scores: Dict[int, float] = {}
+        if not key:
+            return []
+
+        code = key.upper()
+        if len(code) == 3 and code in self._codes:
+            scores[self._codes[code]] = 1.0
+
+        encoded = key.encode()[:64]
+        lo = int(np.searchsorted(self._key_text, encoded, side="left"))
+        hi = int(np.searchsorted(self._key_text, encoded + b"\xff", side="left"))
+        for i in range(lo, min(hi, lo + 50)):
+            record = int(self._key_record[i])
+            full = self._key_text[i]
+            score = 1.0 if full == encoded else 0.7 + 0.25 * len(encoded) / len(full)
+            if score == 1.0 or len(encoded) >= 3:
+                scores[record] = max(scores.get(record, 0.0), score)
+
+        self._fuzzy(key, scores, min_score)
+
+        wanted = {"city": (CITY,), "airport": (AIRPORT,)}.get(kind.lower(), (CITY, AIRPORT))
+        kinds = self._kinds
+        for record, score in list(scores.items()):
+            if kinds[record] == CITY and AIRPORT in wanted:
+                related = self._airports.get(self._city_codes[record], ())
+            elif kinds[record] == AIRPORT and CITY in wanted:
+                related = (self._codes[self._city_codes[record]],)
+            else:
+                continue
+            for other in related:
+                scores[other] = max(scores.get(other, 0.0), 0.99 * score)
+
+        ranked = sorted(
+            (item for item in scores.items() if kinds[item[0]] in wanted),
+            key=lambda item: (-item[1], kinds[item[0]] != CITY),
+        )
+        return [self.describe(record, score=round(score, 3)) for record, score in ranked[:limit]]
+
+    def nearest(self, lat: float, lon: float, kind: str = "airport", k: int = 1, max_km: Optional[float] = None) -> List[dict]:
+        """The `k` closest records of `kind` to a coordinate, nearest first."""
+        wanted = {"city": (CITY,), "airport": (AIRPORT,)}.get(kind.lower(), (CITY, AIRPORT))
+        qx, qy, qz = query = unit_vector(lat, lon)
+        bound = km_to_chord(max_km) ** 2 if max_km is not None else 4.0
+        heap = []  # (-squared chord, record), the worst kept match on top
+        points, records, kinds = self._kd_points, self._kd_records, self._kinds
+
+        def visit(lo: int, hi: int, depth: int):
+            if lo >= hi:
+                return
+            mid = (lo + hi) // 2
+            px, py, pz = points[mid]
+            distance = (px - qx) ** 2 + (py - qy) ** 2 + (pz - qz) ** 2
+            record = records[mid]
+            if kinds[record] in wanted and distance <= bound:
+                if len(heap) < k:
+                    heapq.heappush(heap, (-distance, record))
+                elif distance < -heap[0][0]:
+                    heapq.heapreplace(heap, (-distance, record))
+            axis = depth % 3
+            diff = query[axis] - points[mid][axis]
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            visit(*near, depth + 1)
+            limit = -heap[0][0] if len(heap) == k else bound
+            if diff * diff <= limit:
+                visit(*far, depth + 1)
+
+        visit(0, len(records), 0)
+        return [
+            self.describe(record, distance_km=round(chord_to_km(math.sqrt(-d)), 1))
+            for d, record in sorted(heap, reverse=True)
+        ]
+
+    def describe(self, record: int, **extra) -> dict:
+        base = self._described.get(record)
+        if base is None:
+            row = self.records[record]
+            base = self._described[record] = {
+                "type": KIND_NAMES[int(row["kind"])],
+                "iata": row["iata"].decode(),
+                "city_code": row["city_code"].decode(),
+                "name": row["name"].decode("utf-8", "ignore"),
+                "city": row["city"].decode("utf-8", "ignore"),
+                "country": row["country"].decode(),
+                "lat": round(float(row["lat"]), 4),
+                "lon": round(float(row["lon"]), 4),
+            }
+        return dict(base, **extra)
+
+
+@lru_cache(maxsize=1)
+def get_index() -> LocationIndex:
+    """The shared index, opened on first use."""
+    return LocationIndex.open()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    build(CSV_PATH, INDEX_DIR)
@@ -0,0 +1,94 @@
+import logging
+from typing import Any, Dict
+
+import requests
+
+from ai.agents.amadeus_client import get_client
+from ai.locations.index import get_index
+from assistant_modules.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# Below this the offline match is a guess; ask Amadeus before using it.
+CONFIDENT_SCORE = 0.6
+
+_SUB_TYPES = {"city": "CITY", "airport": "AIRPORT"}
+
+
+def _from_amadeus(location: dict) -> dict:
+    address = location.get("address", {})
+    geo = location.get("geoCode", {})
+    return {
+        "type": location.get("subType"),
+        "iata": location.get("iataCode"),
+        "city_code": address.get("cityCode"),
+        "name": location.get("name"),
+        "city": address.get("cityName"),
+        "country": address.get("countryCode"),
+        "lat": geo.get("latitude"),
+        "lon": geo.get("longitude"),
+    }
+
+
+def resolve_location(name: str, kind: str = "any") -> Dict[str, Any]:
+    """
+    Resolve a spoken city or airport name to IATA codes. Call this before any search that needs a code.
+    Handles aliases and misspellings (e.g. Bangalore -> BLR, Bombay -> BOM, Gorakpur -> GOP).
+    Args:
+        name (str): The place name as the user said it.
+        kind (str, optional): "city" for hotel searches (city code), "airport" for a specific airport, or "any". Defaults to "any".
+    Returns:
+        dict: Best matches with type, iata, city_code, name, city and country. Use city_code for hotels and iata for flights.
+    """
+    matches = get_index().search(name, kind=kind, limit=5)
+    if matches and matches[0]["score"] >= CONFIDENT_SCORE:
+        CACHE_REQUESTS.labels("location_index", "hit").inc()
+        return {"source": "offline", "matches": matches}
+
+    CACHE_REQUESTS.labels("location_index", "miss").inc()
+    params = {
+        "keyword": name[:30],
+        "subType": _SUB_TYPES.get(kind.lower(), "CITY,AIRPORT"),
+        "page[limit]": 5,
+    }
+    try:
+        data = get_client().get("/v1/reference-data/locations", params=params)
+    except (requests.RequestException, KeyError) as e:
+        # KeyError: no Amadeus credentials configured; the offline guess still helps.
+        logger.warning(f"Amadeus location search failed for {name!r}: {e}")
+        if matches:
+            return {"source": "offline", "matches": matches}
+        return {"error": str(e)}
+    found = [_from_amadeus(location) for location in data.get("data", [])]
+    return {"source": "amadeus", "matches": found or matches}
+
+
+def find_nearest_airports(latitude: float, longitude: float, limit: int = 3, max_km: float = 150.0) -> Dict[str, Any]:
+    """
+    Find the airports closest to a coordinate, with their IATA and city codes.
+    Args:
+        latitude (float): The latitude of the location.
+        longitude (float): The longitude of the location.
+        limit (int, optional): How many airports to return. Defaults to 3.
+        max_km (float, optional): Ignore airports further away than this. Defaults to 150.
+    Returns:
+        dict: Airports nearest first, each with iata, city_code, name and distance_km.
+    """
+    airports = get_index().nearest(latitude, longitude, kind="airport", k=limit, max_km=max_km)
+    if airports:
+        CACHE_REQUESTS.labels("location_index", "hit").inc()
+        return {"source": "offline", "airports": airports}
+
+    CACHE_REQUESTS.labels("location_index", "miss").inc()
+    params = {"latitude": latitude, "longitude": longitude, "radius": int(max_km), "page[limit]": limit}
+    try:
+        data = get_client().get("/v1/reference-data/locations/airports", params=params)
+    except (requests.RequestException, KeyError) as e:
+        logger.warning(f"Amadeus airport search failed for {latitude},{longitude}: {e}")
+        return {"error": str(e)}
+    airports = []
+    for location in data.get("data", []):
+        airport = _from_amadeus(location)
+        airport["distance_km"] = location.get("distance", {}).get("value")
+        airports.append(airport)
+    return {"source": "amadeus", "airports": airports}
@@ -1,5 +1,9 @@
 from langchain_openai import ChatOpenAI
+import logging
 import os
+
+logger = logging.getLogger(__name__)
+
 class Loader(object):
     
     @classmethod
@@ -10,7 +14,7 @@ class Loader(object):
     
     @classmethod
     def load_model(this,model, **kwargs):
-        print("Loading model : " + str(model))
+        logger.info("Loading model : %s", model)
         model_method = getattr(this, "_" + model, None)
         if model_method is None:
             raise ValueError(f"Model {model} not found.")
@@ -4,17 +4,20 @@ import logging
 import pyaudio
 
 from config import CHANNELS, FORMAT, RATE
+from assistant_modules.audio_io import AudioSink
 
 logger = logging.getLogger(__name__)
 
 
-class AudioPlayer:
+class AudioPlayer(AudioSink):
+    """PyAudio output device."""
+
     def __init__(self):
+        super().__init__()
         self.p = pyaudio.PyAudio()
         self.stream = self.p.open(
             format=FORMAT, channels=CHANNELS, rate=RATE, output=True, start=False
         )
-        self.is_playing = False
 
     async def play_audio_chunk(self, audio_chunk: bytes, visual_interface):
         if not self.is_playing:
@@ -50,4 +53,12 @@ class AudioPlayer:
         self.p.terminate()
 
 
-audio_player = AudioPlayer()
+_audio_player = None
+
+
+def get_audio_player() -> AudioPlayer:
+    """Open the output device on first use rather than at import time."""
+    global _audio_player
+    if _audio_player is None:
+        _audio_player = AudioPlayer()
+    return _audio_player
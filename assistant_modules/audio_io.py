@@ -0,0 +1,300 @@
+import asyncio
+import logging
+import mmap
+import os
+import struct
+import time
+import wave
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import numpy as np
+
+from config import CHANNELS, RATE
+
+logger = logging.getLogger(__name__)
+
+BYTES_PER_SECOND = RATE * CHANNELS * 2
+
+
+class AudioSource(ABC):
+    """Where user audio comes from: a device, a file or a buffer.
+
+    Carries the recording/receiving state machine the event handler drives;
+    subclasses only decide how get_audio_data() produces PCM16 at RATE.
+    """
+
+    def __init__(self):
+        self.is_recording = False
+        self.is_receiving = False
+
+    def start_recording(self):
+        self.is_recording = True
+        logger.info("Started recording")
+
+    def stop_recording(self):
+        self.is_recording = False
+        logger.info("Stopped recording")
+
+    def start_receiving(self):
+        self.is_receiving = True
+        self.is_recording = False
+        logger.info("Started receiving assistant response")
+
+    def stop_receiving(self):
+        self.is_receiving = False
+        logger.info("Stopped receiving assistant response")
+
+    @property
+    def capturing(self) -> bool:
+        return self.is_recording and not self.is_receiving
+
+    @abstractmethod
+    def get_audio_data(self) -> Optional[bytes]:
+        """Return the PCM16 captured since the last call, or None."""
+
+    def queue_depth(self) -> int:
+        """Captured buffers not yet collected by get_audio_data()."""
+        return 0
+
+    def close(self):
+        pass
+
+
+class AudioSink(ABC):
+    """Where assistant audio goes: speakers, a file, a buffer or a client."""
+
+    def __init__(self):
+        self.is_playing = False
+
+    @abstractmethod
+    async def play_audio_chunk(self, audio_chunk: bytes, visual_interface):
+        ...
+
+    @abstractmethod
+    async def stop_playback(self, visual_interface):
+        ...
+
+    def close(self):
+        pass
+
+
+class BufferSource(AudioSource):
+    """Plays PCM16 from a buffer as if it were a microphone.
+
+    Frames are handed out as memoryview slices of the buffer, so a
+    memory-mapped file is never copied. Position advances with the clock
+    scaled by `speed` (0 means as fast as the caller reads) and only while
+    capturing, so an utterance is not lost while the assistant is speaking.
+    After the data, `trailing_silence` seconds of zeros let server VAD close
+    the turn.
+    """
+
+    def __init__(self, data, speed: float = 1.0, loop: bool = False, trailing_silence: float = 1.0, max_read_seconds: float = 0.5):
+        super().__init__()
+        self.data = memoryview(data).cast("B")
+        self.speed = speed
+        self.loop = loop
+        self.max_read = int(max_read_seconds * BYTES_PER_SECOND) & ~1
+        self.silence = memoryview(bytes(int(trailing_silence * BYTES_PER_SECOND) & ~1))
+        self.length = len(self.data) + len(self.silence)
+        self.position = 0
+        self._last_read = None
+        self._credit = 0.0
+
+    @property
+    def exhausted(self) -> bool:
+        return not self.loop and self.position >= self.length
+
+    def _due_bytes(self) -> int:
+        now = time.monotonic()
+        last, self._last_read = self._last_read, now
+        if self.speed <= 0:
+            return self.max_read
+        if last is not None:
+            # Fractional bytes carry over so the stream does not drift.
+            self._credit = min(self.max_read, self._credit + (now - last) * self.speed * BYTES_PER_SECOND)
+        return int(self._credit) & ~1
+
+    def _slice(self, start: int, size: int) -> memoryview:
+        data_len = len(self.data)
+        if start < data_len:
+            return self.data[start:min(start + size, data_len)]
+        offset = start - data_len
+        return self.silence[offset:offset + size]
+
+    def get_audio_data(self) -> Optional[memoryview]:
+        due = self._due_bytes()
+        if not self.capturing:
+            self._credit = 0.0
+            return None
+        if due <= 0:
+            return None
+        if self.position >= self.length:
+            if not self.loop:
+                return None
+            self.position = 0
+        # Never spans the data/silence boundary; the next read continues.
+        chunk = self._slice(self.position, min(due, self.length - self.position))
+        self.position += len(chunk)
+        self._credit = max(0.0, self._credit - len(chunk))
+        return chunk if len(chunk) else None
+
+    def close(self):
+        self.data.release()
+
+
+class FileSource(BufferSource):
+    """A WAV or raw PCM16 file, memory-mapped.
+
+    Mono 16-bit WAVs at RATE are served straight from the mapping. Other
+    rates or channel counts are converted once into memory at open time.
+    Files without a RIFF header are read as raw PCM16 at RATE.
+    """
+
+    def __init__(self, path: str, **kwargs):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        if view[:4] == b"RIFF" and view[8:12] == b"WAVE":
+            data = self._wav_data(view)
+        else:
+            data = view[: len(view) & ~1]
+        super().__init__(data, **kwargs)
+        logger.info(f"Audio source: {path} ({len(self.data) / BYTES_PER_SECOND:.1f}s)")
+
+    def _wav_data(self, view: memoryview):
+        offset, fmt = 12, None
+        while offset + 8 <= len(view):
+            chunk_id = bytes(view[offset:offset + 4])
+            (size,) = struct.unpack_from("<I", view, offset + 4)
+            body = offset + 8
+            if chunk_id == b"fmt ":
+                fmt = struct.unpack_from("<HHIIHH", view, body)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    break
+                audio_format, channels, rate, _, _, bits = fmt
+                if audio_format != 1 or bits != 16:
+                    raise ValueError(f"{self.path}: only 16-bit PCM WAV is supported")
+                data = view[body:min(body + size, len(view))]
+                data = data[: len(data) & ~1]
+                if channels == CHANNELS and rate == RATE:
+                    return data
+                return self._convert(data, channels, rate)
+            offset = body + size + (size & 1)
+        raise ValueError(f"{self.path}: no fmt/data chunk found")
+
+    def _convert(self, data, channels: int, rate: int) -> bytes:
+        from assistant_modules.transport import Resampler
+
+        logger.info(f"{self.path}: converting {channels} ch @ {rate} Hz to {CHANNELS} ch @ {RATE} Hz")
+        samples = np.frombuffer(data, dtype=np.int16)
+        if channels > 1:
+            samples = samples[: len(samples) // channels * channels]
+            samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+        if rate != RATE:
+            return Resampler(rate, RATE).process_pcm16(samples.tobytes())
+        return samples.tobytes()
+
+    def close(self):
+        super().close()
+        try:
+            self._map.close()
+        except BufferError:
+            # A caller still holds a slice; the mapping goes with the file.
+            pass
+        self._file.close()
+
+
+class MemorySink(AudioSink):
+    """Collects assistant audio in memory.
+
+    With `realtime` set, each chunk waits its playback duration (divided by
+    `speed`) so turn timing matches a real speaker.
+    """
+
+    def __init__(self, keep: bool = True, realtime: bool = False, speed: float = 1.0):
+        super().__init__()
+        self.keep = keep
+        self.realtime = realtime
+        self.speed = speed
+        self.buffer = bytearray()
+        self.bytes_played = 0
+
+    async def play_audio_chunk(self, audio_chunk: bytes, visual_interface):
+        if not self.is_playing:
+            self.is_playing = True
+            visual_interface.set_assistant_speaking(True)
+        self.bytes_played += len(audio_chunk)
+        if self.keep:
+            self.buffer += audio_chunk
+        visual_interface.process_audio_data(audio_chunk)
+        if self.realtime:
+            await asyncio.sleep(len(audio_chunk) / BYTES_PER_SECOND / self.speed)
+        else:
+            await asyncio.sleep(0)
+
+    async def stop_playback(self, visual_interface):
+        if self.is_playing:
+            self.is_playing = False
+            visual_interface.set_assistant_speaking(False)
+
+
+class WavFileSink(MemorySink):
+    """Writes assistant audio to a WAV file as it arrives."""
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(keep=False, **kwargs)
+        self.path = path
+        self._wav = wave.open(path, "wb")
+        self._wav.setnchannels(CHANNELS)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(RATE)
+
+    async def play_audio_chunk(self, audio_chunk: bytes, visual_interface):
+        self._wav.writeframesraw(audio_chunk)
+        await super().play_audio_chunk(audio_chunk, visual_interface)
+
+    def close(self):
+        self._wav.close()
+
+
+def _parse_spec(spec: str):
+    kind, _, arg = spec.partition(":")
+    return kind.strip().lower(), arg
+
+
+def get_audio_source(spec: str = None, speed: float = 1.0) -> AudioSource:
+    """Build an input from a spec: "pyaudio", "null" or "file:<path>"."""
+    from config import AUDIO_INPUT
+
+    kind, arg = _parse_spec(spec or AUDIO_INPUT)
+    if kind == "pyaudio":
+        from assistant_modules.microphone import AsyncMicrophone
+
+        return AsyncMicrophone()
+    if kind == "file":
+        return FileSource(os.path.expanduser(arg), speed=speed)
+    if kind == "null":
+        return BufferSource(b"", trailing_silence=0)
+    raise ValueError(f"Unknown audio input {spec!r}; expected pyaudio, null or file:<path>")
+
+
+def get_audio_sink(spec: str = None, speed: float = 1.0) -> AudioSink:
+    """Build an output from a spec: "pyaudio", "null", "memory" or "file:<path>.wav"."""
+    from config import AUDIO_OUTPUT
+
+    kind, arg = _parse_spec(spec or AUDIO_OUTPUT)
+    if kind == "pyaudio":
+        from assistant_modules.audio import get_audio_player
+
+        return get_audio_player()
+    if kind == "file":
+        return WavFileSink(os.path.expanduser(arg), realtime=speed > 0, speed=speed or 1.0)
+    if kind == "memory":
+        return MemorySink(realtime=speed > 0, speed=speed or 1.0)
+    if kind == "null":
+        return MemorySink(keep=False)
+    raise ValueError(f"Unknown audio output {spec!r}; expected pyaudio, null, memory or file:<path>")
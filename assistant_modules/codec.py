@@ -0,0 +1,64 @@
+import binascii
+import json
+from typing import Optional
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to the stdlib json module
+    orjson = None
+
+_APPEND_PREFIX = '{"type":"input_audio_buffer.append","audio":"'
+_APPEND_SUFFIX = '"}'
+_AUDIO_DELTA_TYPE = '"response.audio.delta"'
+_DELTA_KEY = '"delta"'
+
+
+if orjson is not None:
+
+    def dumps(obj) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+    loads = orjson.loads
+else:
+
+    def dumps(obj) -> str:
+        return json.dumps(obj, separators=(",", ":"))
+
+    loads = json.loads
+
+
+def encode_audio_append(audio_bytes: bytes) -> str:
+    """Frame an input_audio_buffer.append event without building a dict.
+
+    Base64 output never needs JSON escaping, so it can be spliced directly
+    into a pre-rendered template.
+    """
+    audio = binascii.b2a_base64(audio_bytes, newline=False).decode("ascii")
+    return _APPEND_PREFIX + audio + _APPEND_SUFFIX
+
+
+def decode_audio_delta(message) -> Optional[bytes]:
+    """Return the PCM payload of a response.audio.delta message, or None.
+
+    Only looks at the raw text, so the (large) delta never passes through the
+    JSON parser. Anything unexpected returns None and the caller falls back
+    to the full parse.
+    """
+    if not isinstance(message, str) or _AUDIO_DELTA_TYPE not in message[:64]:
+        return None
+    start = message.find(_DELTA_KEY)
+    if start < 0:
+        return None
+    start = message.find('"', start + len(_DELTA_KEY)) + 1
+    if not start or message[start - 2 : start - 1] not in (":", " "):
+        return None
+    end = message.find('"', start)
+    if end < 0:
+        return None
+    payload = message[start:end]
+    if "\\" in payload:
+        return None
+    try:
+        return binascii.a2b_base64(payload)
+    except (binascii.Error, ValueError):
+        return None
@@ -0,0 +1,243 @@
+import asyncio
+import logging
+import random
+import time
+from collections import OrderedDict
+
+import websockets
+from websockets.exceptions import ConnectionClosed, InvalidStatusCode
+
+from config import (
+    RECONNECT_BASE_DELAY,
+    RECONNECT_MAX_ATTEMPTS,
+    RECONNECT_MAX_DELAY,
+    STANDBY_MAX_AGE_SECONDS,
+)
+from assistant_modules import codec
+from assistant_modules.metrics import REALTIME_CONNECTS
+
+logger = logging.getLogger(__name__)
+
+# Going away, abnormal closure, internal error, service restart, try again
+# later, bad gateway. Keepalive ping timeouts surface as 1011.
+RETRYABLE_CLOSE_CODES = {1001, 1006, 1011, 1012, 1013, 1014}
+RETRYABLE_HTTP_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+def close_code(exc: ConnectionClosed) -> int:
+    return exc.rcvd.code if exc.rcvd is not None else 1006
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, ConnectionClosed):
+        return close_code(exc) in RETRYABLE_CLOSE_CODES
+    if isinstance(exc, InvalidStatusCode):
+        return exc.status_code in RETRYABLE_HTTP_STATUS
+    return isinstance(exc, (OSError, asyncio.TimeoutError))
+
+
+class ConversationLog:
+    """Local copy of the conversation, used to prime a replacement session.
+
+    Items are kept in server order. User audio is kept as its transcript and
+    assistant audio as its transcript, since audio cannot be replayed through
+    conversation.item.create.
+    """
+
+    def __init__(self, max_items: int = 200):
+        self.max_items = max_items
+        self.items = OrderedDict()
+
+    def record_event(self, event: dict):
+        event_type = event.get("type")
+        if event_type == "conversation.item.created":
+            item = event.get("item", {})
+            if item.get("id"):
+                self.items[item["id"]] = item
+                previous = event.get("previous_item_id")
+                if (previous == "root" or previous in self.items) and len(self.items) > 1:
+                    self._move_after(item["id"], previous)
+                while len(self.items) > self.max_items:
+                    self.items.popitem(last=False)
+        elif event_type == "conversation.item.input_audio_transcription.completed":
+            item = self.items.get(event.get("item_id"))
+            if item is not None:
+                item["content"] = [
+                    {"type": "input_text", "text": event.get("transcript", "")}
+                ]
+        elif event_type == "response.output_item.done":
+            item = event.get("item", {})
+            if item.get("id") in self.items:
+                self.items[item["id"]] = item
+        elif event_type == "conversation.item.deleted":
+            self.items.pop(event.get("item_id"), None)
+
+    def _move_after(self, item_id: str, previous: str):
+        # Items created in the middle (e.g. a pruned tool result's digest).
+        keys = list(self.items)
+        if keys[-2] == previous:
+            return
+        keys.remove(item_id)
+        keys.insert(0 if previous == "root" else keys.index(previous) + 1, item_id)
+        for key in keys[keys.index(item_id):]:
+            self.items.move_to_end(key)
+
+    def _replayable(self, item: dict):
+        # Original ids are reused so the new session's conversation.item.created
+        # echoes land on the same log entries.
+        item_type = item.get("type")
+        if item_type in ("function_call", "function_call_output"):
+            keys = ("id", "type", "call_id", "name", "arguments", "output")
+            return {k: item[k] for k in keys if k in item}
+        if item_type != "message":
+            return None
+
+        role = item.get("role")
+        texts = []
+        for part in item.get("content") or []:
+            text = part.get("text") or part.get("transcript")
+            if text:
+                texts.append(text)
+        if not texts:
+            return None
+        part_type = "input_text" if role in ("user", "system") else "text"
+        return {
+            "id": item["id"],
+            "type": "message",
+            "role": role,
+            "content": [{"type": part_type, "text": " ".join(texts)}],
+        }
+
+    def replay_events(self) -> list:
+        events = []
+        for item in self.items.values():
+            replayable = self._replayable(item)
+            if replayable is not None:
+                events.append({"type": "conversation.item.create", "item": replayable})
+        return events
+
+
+class RealtimeConnectionManager:
+    """Opens realtime sessions, retries with jittered backoff and replays context.
+
+    With `standby` enabled a second, already authenticated and configured
+    websocket is kept open in the background, so failover is a swap instead of
+    a TLS handshake plus session setup.
+    """
+
+    def __init__(self, url: str, headers: dict, session_update, conversation_log: ConversationLog = None, standby: bool = False):
+        self.url = url
+        self.headers = headers
+        self.session_update = session_update
+        self.conversation_log = conversation_log
+        self.use_standby = standby
+        self._standby = None
+        self._standby_opened_at = 0.0
+        self._standby_drain = None
+        self._standby_task = None
+
+    async def _open(self):
+        websocket = await websockets.connect(
+            self.url, extra_headers=self.headers, ping_timeout=120
+        )
+        await websocket.send(codec.dumps(self.session_update()))
+        return websocket
+
+    async def _open_with_backoff(self):
+        attempt = 0
+        while True:
+            try:
+                return await self._open()
+            except Exception as e:
+                attempt += 1
+                if not is_retryable(e) or attempt >= RECONNECT_MAX_ATTEMPTS:
+                    raise
+                # Full jitter keeps many clients from reconnecting in lockstep.
+                delay = random.uniform(0, min(RECONNECT_MAX_DELAY, RECONNECT_BASE_DELAY * 2 ** attempt))
+                logger.warning(f"Connect attempt {attempt} failed ({e}); retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def _drain(self, websocket):
+        # Nobody reads a standby socket until it is taken; discard its events
+        # (session.created/updated) so they do not pile up in the recv queue.
+        try:
+            async for _ in websocket:
+                pass
+        except ConnectionClosed:
+            pass
+
+    async def _release_standby(self):
+        """Detach the standby socket: stop draining it and return it, if any."""
+        websocket, self._standby = self._standby, None
+        drain, self._standby_drain = self._standby_drain, None
+        if drain is not None:
+            drain.cancel()
+            try:
+                await drain
+            except asyncio.CancelledError:
+                pass
+        return websocket
+
+    async def _close_quietly(self, websocket):
+        try:
+            await websocket.close()
+        except Exception as e:
+            logger.debug(f"Closing standby connection failed: {e}")
+
+    async def _take_standby(self):
+        websocket = await self._release_standby()
+        if websocket is None:
+            return None
+        if websocket.closed or time.monotonic() - self._standby_opened_at > STANDBY_MAX_AGE_SECONDS:
+            await self._close_quietly(websocket)
+            return None
+        return websocket
+
+    async def _keep_standby(self):
+        while True:
+            if self._standby is None or self._standby.closed:
+                try:
+                    self._standby = await self._open_with_backoff()
+                    self._standby_opened_at = time.monotonic()
+                    self._standby_drain = asyncio.create_task(self._drain(self._standby))
+                    logger.info("Standby realtime connection ready")
+                except Exception as e:
+                    logger.warning(f"Could not open standby connection: {e}")
+            elif time.monotonic() - self._standby_opened_at > STANDBY_MAX_AGE_SECONDS:
+                await self._close_quietly(await self._release_standby())
+                continue
+            await asyncio.sleep(5)
+
+    async def _replay(self, websocket):
+        if self.conversation_log is None:
+            return
+        events = self.conversation_log.replay_events()
+        for event in events:
+            await websocket.send(codec.dumps(event))
+        if events:
+            logger.info(f"Replayed {len(events)} conversation items into the new session")
+
+    async def connect(self, replay: bool = False):
+        """Return a configured websocket, primed with the conversation when replaying."""
+        started = time.perf_counter()
+        websocket = await self._take_standby() if self.use_standby else None
+        source = "standby" if websocket is not None else "fresh"
+        if websocket is None:
+            websocket = await self._open_with_backoff()
+        REALTIME_CONNECTS.labels(source).inc()
+        if replay:
+            await self._replay(websocket)
+        if self.use_standby and self._standby_task is None:
+            self._standby_task = asyncio.create_task(self._keep_standby())
+        logger.info(
+            f"Realtime session ready via {source} connection in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        return websocket
+
+    async def close(self):
+        if self._standby_task is not None:
+            self._standby_task.cancel()
+            self._standby_task = None
+        websocket = await self._release_standby()
+        if websocket is not None:
+            await self._close_quietly(websocket)
@@ -0,0 +1,175 @@
+"""Keeps the realtime conversation under a token budget.
+
+Every item stays in the server-side conversation and is billed, and adds
+latency, on every later response. Tool results are by far the bulkiest. After
+each response the server reports how many input tokens it used; past
+CONTEXT_TOKEN_BUDGET the pruner works on items outside the most recent
+CONTEXT_KEEP_RECENT_ITEMS until its estimate falls below the target:
+
+1. bulky old function_call_output items are replaced, in place, by a short
+   digest (the first entry of each list and how many there were);
+2. then the oldest items are deleted outright, a tool call always together
+   with its output.
+
+Item sizes come from the ConversationLog's copy of the conversation.
+"""
+import itertools
+import json
+import logging
+import uuid
+
+from assistant_modules import codec
+from assistant_modules.connection import ConversationLog
+from assistant_modules.metrics import CONTEXT_ITEMS_PRUNED
+from config import (
+    CONTEXT_DIGEST_CHARS,
+    CONTEXT_KEEP_RECENT_ITEMS,
+    CONTEXT_TARGET_RATIO,
+    CONTEXT_TOKEN_BUDGET,
+)
+
+logger = logging.getLogger(__name__)
+
+DIGEST_PREFIX = "[earlier result, shortened] "
+# Pruning events carry event ids with this prefix, so an error caused by one
+# (say, deleting an item the server already dropped) is not fatal.
+EVENT_ID_PREFIX = "prune_"
+CHARS_PER_TOKEN = 4
+# Audio is billed well above its transcript's text tokens.
+AUDIO_TOKEN_FACTOR = 3
+
+
+def estimate_tokens(item: dict) -> int:
+    """Rough token count of a conversation item."""
+    item_type = item.get("type")
+    if item_type == "function_call_output":
+        return len(item.get("output") or "") // CHARS_PER_TOKEN + 4
+    if item_type == "function_call":
+        return (len(item.get("arguments") or "") + len(item.get("name") or "")) // CHARS_PER_TOKEN + 4
+    tokens = 4
+    for part in item.get("content") or []:
+        text = part.get("text") or part.get("transcript") or ""
+        factor = AUDIO_TOKEN_FACTOR if part.get("type") in ("audio", "input_audio") else 1
+        tokens += len(text) * factor // CHARS_PER_TOKEN
+    return tokens
+
+
+def digest(output: str, limit: int = CONTEXT_DIGEST_CHARS) -> str:
+    """A short stand-in for a tool result: lists cut to their first entry."""
+    try:
+        data = json.loads(output)
+    except (TypeError, ValueError):
+        data = None
+    if isinstance(data, dict):
+        short = {}
+        for key, value in data.items():
+            if isinstance(value, list) and len(value) > 1:
+                short[key] = value[:1]
+                short[f"{key}_total"] = len(value)
+            else:
+                short[key] = value
+        output = codec.dumps(short)
+    output = " ".join(output.split())
+    if len(output) > limit:
+        output = output[:limit - 3] + "..."
+    return DIGEST_PREFIX + output
+
+
+class ContextPruner(object):
+    def __init__(
+        self,
+        log: ConversationLog,
+        budget: int = CONTEXT_TOKEN_BUDGET,
+        keep_recent: int = CONTEXT_KEEP_RECENT_ITEMS,
+        digest_chars: int = CONTEXT_DIGEST_CHARS,
+    ):
+        self.log = log
+        self.budget = budget
+        self.keep_recent = keep_recent
+        self.digest_chars = digest_chars
+        # Items already asked to be deleted; the log drops them on the echo.
+        self._deleting = set()
+        self._session = uuid.uuid4().hex[:8]
+        self._sequence = itertools.count()
+
+    def _event(self, event: dict) -> dict:
+        event["event_id"] = f"{EVENT_ID_PREFIX}{self._session}_{next(self._sequence)}"
+        return event
+
+    def prune(self, response_done: dict) -> list:
+        """Client events that bring the conversation back under budget, if needed."""
+        usage = response_done.get("response", {}).get("usage") or {}
+        input_tokens = usage.get("input_tokens", 0)
+        if input_tokens <= self.budget:
+            return []
+        excess = input_tokens - int(self.budget * CONTEXT_TARGET_RATIO)
+        self._deleting &= set(self.log.items)
+        items = [item for item in self.log.items.values() if item.get("id") not in self._deleting]
+        old = items[:-self.keep_recent] if self.keep_recent else items
+
+        # Plan first: digests oldest first, then whole items oldest first if
+        # digests alone do not free enough.
+        digests = {}
+        for item in old:
+            if excess <= 0:
+                break
+            output = item.get("output") or ""
+            if item.get("type") != "function_call_output" or output.startswith(DIGEST_PREFIX):
+                continue
+            short = digest(output, self.digest_chars)
+            if len(short) < len(output):
+                digests[item["id"]] = short
+                excess -= (len(output) - len(short)) // CHARS_PER_TOKEN
+
+        outputs = {item.get("call_id"): item for item in old if item.get("type") == "function_call_output"}
+        deletes = set()
+        for item in old:
+            if excess <= 0:
+                break
+            item_type = item.get("type")
+            if item_type == "function_call_output":
+                # Goes with its call, or stays if the call is newer.
+                continue
+            group = [item]
+            if item_type == "function_call":
+                output = outputs.get(item.get("call_id"))
+                if output is None:
+                    continue
+                group.append(output)
+            for member in group:
+                short = digests.pop(member["id"], None)
+                excess -= len(short) // CHARS_PER_TOKEN if short is not None else estimate_tokens(member)
+                deletes.add(member["id"])
+
+        events = []
+        previous = "root"
+        for item in old:
+            if item["id"] in deletes:
+                events.append(self._delete(item))
+                CONTEXT_ITEMS_PRUNED.labels("delete").inc()
+            elif item["id"] in digests:
+                # Same place in the conversation, under an id of our own so
+                # a following replacement can be positioned after this one.
+                replacement = {
+                    "id": f"{self._session}_digest_{next(self._sequence)}",
+                    "type": "function_call_output",
+                    "call_id": item.get("call_id"),
+                    "output": digests[item["id"]],
+                }
+                events.append(self._delete(item))
+                events.append(self._event({"type": "conversation.item.create", "previous_item_id": previous, "item": replacement}))
+                previous = replacement["id"]
+                CONTEXT_ITEMS_PRUNED.labels("digest").inc()
+            else:
+                previous = item["id"]
+
+        if events:
+            logger.info(
+                f"Context at {input_tokens} input tokens (budget {self.budget}); "
+                f"sending {len(events)} pruning events"
+            )
+        return events
+
+    def _delete(self, item: dict) -> dict:
+        self._deleting.add(item["id"])
+        return self._event({"type": "conversation.item.delete", "item_id": item["id"]})
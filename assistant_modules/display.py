@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import subprocess
+import sys
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DISPLAY_BACKENDS = ("pygame", "process", "headless")
+
+# Shared-memory layout for ProcessDisplay:
+#   int64[8] control block: write sequence, state flags, text sequence,
+#            text length, closed flag
+#   float32[RING_SIZE] energy ring
+#   bytes[TEXT_BYTES] latest display text (utf-8)
+_CTRL_SLOTS = 8
+_SEQ, _FLAGS, _TEXT_SEQ, _TEXT_LEN, _CLOSED = range(5)
+_FLAG_ACTIVE = 1
+_FLAG_SPEAKING = 2
+RING_SIZE = 256
+TEXT_BYTES = 1024
+
+
+class HeadlessDisplay:
+    """No-op display for servers and containers; never touches pygame."""
+
+    def __init__(self):
+        self.is_active = False
+        self.is_assistant_speaking = False
+        self._closed = asyncio.Event()
+
+    def set_active(self, is_active):
+        self.is_active = is_active
+
+    def set_assistant_speaking(self, is_speaking):
+        self.is_assistant_speaking = is_speaking
+
+    def update_energy(self, energy):
+        pass
+
+    def process_audio_data(self, audio_data: bytes):
+        pass
+
+    def display_text(self, text: str):
+        pass
+
+    async def run(self):
+        await self._closed.wait()
+
+    def close(self):
+        self._closed.set()
+
+
+class _SharedState:
+    def __init__(self, name=None):
+        size = _CTRL_SLOTS * 8 + RING_SIZE * 4 + TEXT_BYTES
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            # The creating process owns the segment; stop this process's
+            # tracker from unlinking it when the renderer exits.
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        buf = self.shm.buf
+        self.ctrl = np.ndarray((_CTRL_SLOTS,), dtype=np.int64, buffer=buf)
+        self.ring = np.ndarray(
+            (RING_SIZE,), dtype=np.float32, buffer=buf, offset=_CTRL_SLOTS * 8
+        )
+        self.text_offset = _CTRL_SLOTS * 8 + RING_SIZE * 4
+        if name is None:
+            self.ctrl[:] = 0
+
+    def read_text(self) -> str:
+        length = int(self.ctrl[_TEXT_LEN])
+        raw = bytes(self.shm.buf[self.text_offset:self.text_offset + length])
+        return raw.decode("utf-8", errors="ignore")
+
+    def release(self):
+        # Views must be dropped before the mapping can be closed.
+        del self.ctrl, self.ring
+        self.shm.close()
+
+
+def _renderer_main(shm_name: str):
+    from assistant_modules.visual_interface import VisualInterface
+
+    state = _SharedState(shm_name)
+    interface = VisualInterface()
+
+    async def render_loop():
+        last_seq = 0
+        last_text_seq = 0
+        while not state.ctrl[_CLOSED]:
+            seq = int(state.ctrl[_SEQ])
+            for i in range(max(last_seq, seq - RING_SIZE), seq):
+                interface.update_energy(float(state.ring[i % RING_SIZE]))
+            last_seq = seq
+
+            flags = int(state.ctrl[_FLAGS])
+            interface.set_active(bool(flags & _FLAG_ACTIVE))
+            interface.set_assistant_speaking(bool(flags & _FLAG_SPEAKING))
+
+            text_seq = int(state.ctrl[_TEXT_SEQ])
+            if text_seq != last_text_seq:
+                interface.display_text(state.read_text())
+                last_text_seq = text_seq
+
+            if not await interface.update():
+                break
+
+    try:
+        asyncio.run(render_loop())
+    finally:
+        interface.close()
+        state.release()
+
+
+class ProcessDisplay:
+    """Runs the pygame renderer in a child process.
+
+    The voice loop only writes energy samples and state flags into a small
+    shared-memory ring; it never imports pygame or waits on rendering.
+    """
+
+    def __init__(self):
+        self.is_active = False
+        self.is_assistant_speaking = False
+        self._state = _SharedState()
+        self._seq = 0
+        self._text_seq = 0
+        # Launched as a module rather than via multiprocessing so the child
+        # does not re-import the parent's __main__ and its audio stack.
+        self._process = subprocess.Popen(
+            [sys.executable, "-m", "assistant_modules.display", self._state.shm.name]
+        )
+        logger.info(f"Renderer process started (pid {self._process.pid})")
+
+    def _write_flags(self):
+        flags = (_FLAG_ACTIVE if self.is_active else 0) | (
+            _FLAG_SPEAKING if self.is_assistant_speaking else 0
+        )
+        if self._state is not None:
+            self._state.ctrl[_FLAGS] = flags
+
+    def set_active(self, is_active):
+        self.is_active = is_active
+        self._write_flags()
+
+    def set_assistant_speaking(self, is_speaking):
+        self.is_assistant_speaking = is_speaking
+        self._write_flags()
+
+    def update_energy(self, energy):
+        if self._state is None:
+            return
+        self._state.ring[self._seq % RING_SIZE] = energy
+        self._seq += 1
+        self._state.ctrl[_SEQ] = self._seq
+
+    def process_audio_data(self, audio_data: bytes):
+        audio_frame = np.frombuffer(audio_data, dtype=np.int16)
+        self.update_energy(np.abs(audio_frame).mean())
+
+    def display_text(self, text: str):
+        if self._state is None:
+            return
+        raw = text.encode("utf-8")[:TEXT_BYTES]
+        offset = self._state.text_offset
+        self._state.shm.buf[offset:offset + len(raw)] = raw
+        self._state.ctrl[_TEXT_LEN] = len(raw)
+        self._text_seq += 1
+        self._state.ctrl[_TEXT_SEQ] = self._text_seq
+
+    async def run(self):
+        while self._state is not None and self._process.poll() is None:
+            await asyncio.sleep(0.5)
+
+    def close(self):
+        if self._state is None:
+            return
+        self._state.ctrl[_CLOSED] = 1
+        try:
+            self._process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            self._process.terminate()
+        self._state.release()
+        self._state.shm.unlink()
+        self._state = None
+
+
+def get_display(backend: str = None):
+    from config import DISPLAY_BACKEND
+
+    backend = backend or DISPLAY_BACKEND
+    if backend == "headless":
+        return HeadlessDisplay()
+    if backend == "process":
+        return ProcessDisplay()
+    if backend == "pygame":
+        from assistant_modules.visual_interface import VisualInterface
+
+        return VisualInterface()
+    raise ValueError(f"Unknown display backend: {backend}")
+
+
+if __name__ == "__main__":
+    _renderer_main(sys.argv[1])
@@ -0,0 +1,149 @@
+"""Pre-rendered filler clips that cover the silence of a tool call.
+
+Between response.function_call_arguments.done and the audio of the answer
+the user hears nothing unless the model happened to say "let me check"
+first. The handler plays one of these short clips the moment it dispatches
+a tool, paced at real time so it can be cut short, and fades it out as soon
+as real response audio arrives.
+
+Clips are mono PCM16 WAVs in data/fillers/, read once into memory. Render
+them in the session voice (needs OPENAI_API_KEY) with:
+
+    python -m assistant_modules.fillers
+"""
+import asyncio
+import glob
+import logging
+import os
+import random
+import time
+import wave
+from functools import lru_cache
+from typing import List, Optional
+
+import numpy as np
+
+from assistant_modules.audio_io import BYTES_PER_SECOND, FileSource
+from config import CHANNELS, FILLER_AUDIO_DIR, RATE
+
+logger = logging.getLogger(__name__)
+
+# Casual, like the persona in SESSION_INSTRUCTIONS; none promises a result.
+FILLER_PHRASES = [
+    "Umm, give me a sec...",
+    "Okay, let me check that for you.",
+    "Hmm, one moment...",
+    "Sure, just pulling that up.",
+    "Ah, let me have a look.",
+    "Alright, give me a second...",
+]
+FILLER_VOICE = "ash"
+CHUNK_SECONDS = 0.05
+# Stay this far ahead of real time so the output device never underruns.
+LEAD_SECONDS = 0.1
+FADE_SECONDS = 0.08
+
+
+class FillerClips(object):
+    """Filler clips as int16 arrays at RATE, loaded once."""
+
+    def __init__(self, clips: List[np.ndarray]):
+        self.clips = clips
+        self._last = None
+
+    @classmethod
+    def load(cls, directory: str) -> "FillerClips":
+        clips = []
+        for path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+            try:
+                source = FileSource(path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping filler clip {path}: {e}")
+                continue
+            clips.append(np.frombuffer(source.data, dtype=np.int16).copy())
+            source.close()
+        logger.info(f"Loaded {len(clips)} filler clips from {directory}")
+        return cls(clips)
+
+    def pick(self) -> Optional[np.ndarray]:
+        """A random clip, never the same one twice in a row."""
+        if not self.clips:
+            return None
+        choices = [i for i in range(len(self.clips)) if i != self._last] or [0]
+        self._last = random.choice(choices)
+        return self.clips[self._last]
+
+
+@lru_cache(maxsize=1)
+def get_filler_clips() -> FillerClips:
+    return FillerClips.load(FILLER_AUDIO_DIR)
+
+
+class FillerPlayback(object):
+    """One clip playing through an AudioSink until it ends or fades out."""
+
+    def __init__(self, samples: np.ndarray, player, visual_interface):
+        self.samples = samples
+        self.player = player
+        self.visual_interface = visual_interface
+        self.position = 0
+        self._fading = False
+        self._task = asyncio.create_task(self._play())
+
+    def done(self) -> bool:
+        return self._task.done()
+
+    async def _play(self):
+        chunk = int(CHUNK_SECONDS * RATE) * CHANNELS
+        started = time.monotonic()
+        played = 0
+        while self.position < len(self.samples):
+            if self._fading:
+                tail = self.samples[self.position:self.position + int(FADE_SECONDS * RATE) * CHANNELS]
+                self.position = len(self.samples)
+                ramp = np.linspace(1.0, 0.0, len(tail), endpoint=False, dtype=np.float32)
+                await self.player.play_audio_chunk((tail * ramp).astype(np.int16).tobytes(), self.visual_interface)
+                return
+            piece = self.samples[self.position:self.position + chunk]
+            self.position += len(piece)
+            await self.player.play_audio_chunk(piece.tobytes(), self.visual_interface)
+            played += piece.nbytes
+            # Sinks that do not block (the gateway client, memory) would
+            # otherwise take the whole clip at once and it could not be cut.
+            await asyncio.sleep(max(0.0, started + played / BYTES_PER_SECOND - LEAD_SECONDS - time.monotonic()))
+
+    async def fade_out(self):
+        """Ramp the rest of the clip down to silence and wait for it."""
+        self._fading = True
+        await self._task
+
+    def cancel(self):
+        self._task.cancel()
+
+
+def render_clips(directory: str = FILLER_AUDIO_DIR, phrases: List[str] = FILLER_PHRASES, voice: str = FILLER_VOICE):
+    """Synthesize each phrase with OpenAI TTS into a WAV in `directory`."""
+    import requests
+
+    os.makedirs(directory, exist_ok=True)
+    session = requests.Session()
+    session.headers["Authorization"] = f"Bearer {os.environ['OPENAI_API_KEY']}"
+    for number, phrase in enumerate(phrases):
+        response = session.post(
+            "https://api.openai.com/v1/audio/speech",
+            json={"model": "tts-1", "voice": voice, "input": phrase, "response_format": "pcm"},
+        )
+        response.raise_for_status()
+        # "pcm" is raw 24 kHz mono PCM16, which is RATE.
+        path = os.path.join(directory, f"filler_{number:02d}.wav")
+        with wave.open(path, "wb") as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(24000)
+            out.writeframes(response.content)
+        logger.info(f"{path}: {phrase!r} ({len(response.content) / BYTES_PER_SECOND:.1f}s)")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    render_clips()
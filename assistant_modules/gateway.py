@@ -0,0 +1,242 @@
+import asyncio
+import itertools
+import logging
+import os
+import time
+
+import websockets
+
+from config import (
+    CHANNELS,
+    GATEWAY_IDLE_TIMEOUT_SECONDS,
+    GATEWAY_MAX_AUDIO_RATE,
+    GATEWAY_MAX_MESSAGE_BYTES,
+    GATEWAY_MAX_SESSION_SECONDS,
+    GATEWAY_MAX_SESSIONS,
+    RATE,
+    REALTIME_URL,
+)
+from assistant_modules import codec
+from assistant_modules.audio_io import AudioSink, AudioSource
+from assistant_modules.display import HeadlessDisplay
+from assistant_modules.metrics import (
+    ACTIVE_SESSIONS,
+    AUDIO_BYTES_UP,
+    AUDIO_FRAMES_DROPPED,
+    AUDIO_FRAMES_SENT,
+)
+from assistant_modules.session import build_session_update
+from assistant_modules.transport import get_transport
+from assistant_modules.websocket_handler import process_ws_messages
+
+logger = logging.getLogger(__name__)
+
+# websockets close code 1013: "try again later".
+CLOSE_SERVER_BUSY = 1013
+
+
+class ClientMic(AudioSource):
+    """Microphone controls for a remote client.
+
+    Audio arrives from the client websocket and is pushed upstream by
+    GatewaySession, so there is nothing to poll.
+    """
+
+    def get_audio_data(self):
+        return None
+
+
+class ClientAudioSink(AudioSink):
+    """Plays assistant audio by streaming it back to the client as binary frames."""
+
+    def __init__(self, client_ws):
+        super().__init__()
+        self.client_ws = client_ws
+
+    async def play_audio_chunk(self, audio_chunk: bytes, visual_interface):
+        if not self.is_playing:
+            self.is_playing = True
+            visual_interface.set_assistant_speaking(True)
+        await self.client_ws.send(audio_chunk)
+
+    async def stop_playback(self, visual_interface):
+        if self.is_playing:
+            self.is_playing = False
+            visual_interface.set_assistant_speaking(False)
+            await self.client_ws.send(codec.dumps({"type": "playback.done"}))
+
+
+class SessionLimits:
+    def __init__(
+        self,
+        max_session_seconds: float = GATEWAY_MAX_SESSION_SECONDS,
+        idle_timeout_seconds: float = GATEWAY_IDLE_TIMEOUT_SECONDS,
+        max_audio_rate: float = GATEWAY_MAX_AUDIO_RATE,
+        max_message_bytes: int = GATEWAY_MAX_MESSAGE_BYTES,
+    ):
+        self.max_session_seconds = max_session_seconds
+        self.idle_timeout_seconds = idle_timeout_seconds
+        # Upstream audio budget as a multiple of real time; a client cannot
+        # push audio faster than this no matter how fast it sends.
+        self.max_audio_rate = max_audio_rate
+        self.max_message_bytes = max_message_bytes
+
+
+class GatewaySession:
+    """Bridges one client websocket to its own realtime API connection."""
+
+    def __init__(self, session_id: int, client_ws, limits: SessionLimits, tool_functions: dict = None):
+        self.session_id = session_id
+        self.client_ws = client_ws
+        self.limits = limits
+        self.tool_functions = tool_functions
+        self.mic = ClientMic()
+        self.sink = ClientAudioSink(client_ws)
+        self.display = HeadlessDisplay()
+        self.transport = get_transport()
+        self.started_at = time.monotonic()
+        self.last_activity = self.started_at
+        self.bytes_per_second = RATE * CHANNELS * 2
+        self.audio_allowance = self.bytes_per_second * limits.max_audio_rate
+        self.allowance_time = self.started_at
+        self.frames_dropped = 0
+
+    def _admit_audio(self, size: int) -> bool:
+        # Token bucket refilled at max_audio_rate x real time, capped at one second.
+        now = time.monotonic()
+        budget = self.bytes_per_second * self.limits.max_audio_rate
+        self.audio_allowance = min(
+            budget, self.audio_allowance + (now - self.allowance_time) * budget
+        )
+        self.allowance_time = now
+        if size > self.audio_allowance:
+            return False
+        self.audio_allowance -= size
+        return True
+
+    async def pump_client_audio(self, upstream):
+        rate_limited = AUDIO_FRAMES_DROPPED.labels("rate_limit")
+        malformed = AUDIO_FRAMES_DROPPED.labels("malformed")
+        async for message in self.client_ws:
+            self.last_activity = time.monotonic()
+            if isinstance(message, str):
+                # A bad control frame from one client must not end its session.
+                try:
+                    event = codec.loads(message)
+                except ValueError:
+                    event = None
+                if not isinstance(event, dict):
+                    self.frames_dropped += 1
+                    malformed.inc()
+                    continue
+                if event.get("type") == "session.close":
+                    return
+                continue
+            if self.mic.is_receiving:
+                continue
+            if not self._admit_audio(len(message)):
+                self.frames_dropped += 1
+                rate_limited.inc()
+                continue
+            wire_audio = self.transport.encode(message)
+            await upstream.send(codec.encode_audio_append(wire_audio))
+            AUDIO_FRAMES_SENT.inc()
+            AUDIO_BYTES_UP.inc(len(wire_audio))
+
+    async def watchdog(self):
+        while True:
+            await asyncio.sleep(1)
+            now = time.monotonic()
+            if now - self.started_at > self.limits.max_session_seconds:
+                logger.info(f"Session {self.session_id}: max duration reached")
+                return
+            if now - self.last_activity > self.limits.idle_timeout_seconds:
+                logger.info(f"Session {self.session_id}: idle timeout")
+                return
+
+    async def run(self, url: str, headers: dict):
+        async with websockets.connect(url, extra_headers=headers, ping_timeout=120) as upstream:
+            await upstream.send(codec.dumps(build_session_update(self.transport)))
+            self.mic.start_recording()
+            tasks = [
+                asyncio.create_task(self.pump_client_audio(upstream)),
+                asyncio.create_task(
+                    process_ws_messages(
+                        upstream, self.mic, self.display, self.transport,
+                        player=self.sink, tool_functions=self.tool_functions,
+                    )
+                ),
+                asyncio.create_task(self.watchdog()),
+            ]
+            try:
+                await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                self.display.close()
+
+
+class GatewayServer:
+    """Serves many concurrent voice sessions from one process.
+
+    Agent executors, the Amadeus token and its HTTP connection pool are module
+    level singletons, so every session shares them; each client only gets its
+    own realtime connection and a few small state objects.
+    """
+
+    def __init__(self, host: str, port: int, max_sessions: int = GATEWAY_MAX_SESSIONS, limits: SessionLimits = None):
+        self.host = host
+        self.port = port
+        self.max_sessions = max_sessions
+        self.limits = limits or SessionLimits()
+        self.active_sessions = 0
+        self._ids = itertools.count(1)
+
+    async def handle_client(self, client_ws):
+        if self.active_sessions >= self.max_sessions:
+            logger.warning("Rejecting client: session limit reached")
+            await client_ws.close(CLOSE_SERVER_BUSY, "server busy")
+            return
+
+        api_key = os.getenv("OPENAI_API_KEY")
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "OpenAI-Beta": "realtime=v1",
+        }
+        session = GatewaySession(next(self._ids), client_ws, self.limits)
+        self.active_sessions += 1
+        ACTIVE_SESSIONS.inc()
+        logger.info(
+            f"Session {session.session_id} started ({self.active_sessions}/{self.max_sessions} active)"
+        )
+        try:
+            await session.run(REALTIME_URL, headers)
+        except websockets.ConnectionClosed as e:
+            logger.info(f"Session {session.session_id} closed: {e}")
+        except Exception as e:
+            logger.exception(f"Session {session.session_id} failed: {e}")
+        finally:
+            self.active_sessions -= 1
+            ACTIVE_SESSIONS.dec()
+            if session.frames_dropped:
+                logger.info(
+                    f"Session {session.session_id} dropped {session.frames_dropped} frames over the audio rate limit"
+                )
+            await client_ws.close()
+            logger.info(f"Session {session.session_id} ended")
+
+    async def serve_forever(self):
+        if not os.getenv("OPENAI_API_KEY"):
+            logger.error("Please set the OPENAI_API_KEY in your .env file.")
+            return
+        async with websockets.serve(
+            self.handle_client,
+            self.host,
+            self.port,
+            max_size=self.limits.max_message_bytes,
+        ):
+            logger.info(
+                f"Gateway listening on ws://{self.host}:{self.port} (max {self.max_sessions} sessions)"
+            )
+            await asyncio.Future()
@@ -1,26 +1,147 @@
 import json
 import logging
-from datetime import datetime
+import logging.handlers
+import queue
+import sys
+from collections import defaultdict
 
-from config import RUN_TIME_TABLE_LOG_JSON
+from config import LOG_FORMAT, LOG_PAYLOAD_LIMIT, LOG_QUEUE_SIZE, LOG_SAMPLE_EVERY
+from assistant_modules.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
+TEXT_FORMAT = "%(asctime)s.%(msecs)03d - %(levelname)s - %(message)s"
+TEXT_DATEFMT = "%H:%M:%S"
+
+# Attributes every LogRecord has; anything else came in through `extra=`.
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class _Payload:
+    """Defers rendering of a large object to the log listener thread."""
+
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value, limit: int):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self):
+        value = self.value
+        if not isinstance(value, str):
+            try:
+                value = json.dumps(value, default=str, ensure_ascii=False)
+            except (TypeError, ValueError):
+                value = repr(value)
+        if len(value) > self.limit:
+            return f"{value[:self.limit]}... [+{len(value) - self.limit} chars]"
+        return value
+
+
+def truncate_payload(value, limit: int = None) -> _Payload:
+    """Wrap a payload for lazy, size-capped logging: logger.info("result: %s", truncate_payload(r))."""
+    return _Payload(value, LOG_PAYLOAD_LIMIT if limit is None else limit)
+
+
+class StructuredFormatter(logging.Formatter):
+    """One JSON object per line, including any `extra=` fields."""
+
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record, TEXT_DATEFMT) + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the listener thread untouched.
+
+    The stock QueueHandler formats the message in prepare(), i.e. on the
+    calling thread; here message interpolation, payload rendering and I/O all
+    happen on the listener. When the queue is full the record is dropped
+    rather than blocking the event loop.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener = None
+
+
+def setup_logging(level: int = logging.INFO, log_format: str = LOG_FORMAT):
+    """Route all logging through a queue drained by a background thread."""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    if log_format == "json":
+        stream_handler.setFormatter(StructuredFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT, TEXT_DATEFMT))
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_NonBlockingQueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 
 def log_runtime(function_or_name: str, duration: float):
-    time_record = {
-        "timestamp": datetime.now().isoformat(),
-        "function": function_or_name,
-        "duration": f"{duration:.4f}",
-    }
-    with open(RUN_TIME_TABLE_LOG_JSON, "a") as file:
-        json.dump(time_record, file)
-        file.write("\n")
+    # Recorded in memory; tracer.flush_forever() appends to the runtime
+    # table in the background instead of writing on the event loop.
+    tracer.record(function_or_name, duration)
+
+    logger.info("⏰ %s() took %.4f seconds", function_or_name, duration)
+
+
+_event_counts = defaultdict(int)
+
 
-    logger.info(f"⏰ {function_or_name}() took {duration:.4f} seconds")
+def should_log_event(event_type: str) -> bool:
+    """Per-type sampling: high-frequency events are logged 1 in LOG_SAMPLE_EVERY[type]."""
+    every = LOG_SAMPLE_EVERY.get(event_type, 1)
+    if every <= 1:
+        return True
+    _event_counts[event_type] += 1
+    return _event_counts[event_type] % every == 1
 
 
-def log_ws_event(direction: str, event: dict):
-    event_type = event.get("type", "Unknown")
+def log_ws_event(direction: str, event_type: str):
+    """Log one websocket event by type; cheap enough for every frame."""
+    if not should_log_event(event_type):
+        return
     icon = "⬆️ - Out" if direction.lower() == "outgoing" else "⬇️ - In"
-    logger.info(f"{icon} {event_type}")
+    logger.info("%s %s", icon, event_type, extra={"event_type": event_type, "direction": direction})
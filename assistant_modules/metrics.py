@@ -0,0 +1,281 @@
+import asyncio
+import bisect
+import logging
+import math
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers tool calls (hundreds of ms to tens of seconds) as well as
+# sub-millisecond work.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Child:
+    """One labelled series.
+
+    Series are updated from the event loop and from worker threads (Amadeus
+    requests, tool calls), so read-modify-write updates hold a per-series
+    lock. Uncontended, that keeps an update well under a microsecond.
+    """
+
+    __slots__ = ("value", "function", "lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self.function = None
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self.lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+    def get(self) -> float:
+        return self.function() if self.function is not None else self.value
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count", "lock")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def _new_child(self):
+        return _Child()
+
+    def labels(self, *values):
+        """Return the series for these label values; callers on hot paths keep it."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            yield self.name, _format_labels(self.labelnames, values), child.get()
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for name, labels, value in self._samples():
+            lines.append(f"{name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def set_function(self, function, *values):
+        """Read the series from `function` at scrape time (e.g. lru_cache stats)."""
+        self.labels(*values).function = function
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0):
+        self._default.dec(amount)
+
+    def set(self, value: float):
+        self._default.set(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), child.counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket", _format_labels(self.labelnames, values, le), cumulative
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum", labels, child.sum
+            yield f"{self.name}_count", labels, child.count
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} already registered with a different shape")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """Prometheus text exposition format, version 0.0.4."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# Voice pipeline metrics. Defined here so the whole catalogue is in one place;
+# hot paths bind the labelled series once and keep them.
+AUDIO_FRAMES_SENT = registry.counter(
+    "voice_audio_frames_sent_total", "Audio append events sent to the realtime API."
+)
+AUDIO_FRAMES_DROPPED = registry.counter(
+    "voice_audio_frames_dropped_total", "Client frames dropped before upload (rate_limit, or malformed control frames).", ("reason",)
+)
+AUDIO_BYTES_UP = registry.counter(
+    "voice_audio_bytes_up_total", "Wire audio bytes sent to the realtime API."
+)
+AUDIO_BYTES_DOWN = registry.counter(
+    "voice_audio_bytes_down_total", "Wire audio bytes received from the realtime API."
+)
+AUDIO_INPUT_QUEUE_DEPTH = registry.gauge(
+    "voice_audio_input_queue_depth", "Microphone buffers waiting to be sent."
+)
+REALTIME_EVENTS = registry.counter(
+    "voice_realtime_events_total", "Realtime API server events received.", ("type",)
+)
+REALTIME_CONNECTS = registry.counter(
+    "voice_realtime_connects_total", "Realtime sessions opened.", ("source",)
+)
+TOOL_CALLS = registry.counter(
+    "voice_tool_calls_total", "Agent tool calls.", ("tool", "outcome")
+)
+TOOL_CALL_SECONDS = registry.histogram(
+    "voice_tool_call_seconds", "Agent tool call latency.", ("tool",)
+)
+TOOL_QUEUE_SECONDS = registry.histogram(
+    "voice_tool_queue_seconds", "Time tool calls waited for a worker.", ("tool",)
+)
+TOOL_DEADLINE_MISSES = registry.counter(
+    "voice_tool_deadline_misses_total", "Tool calls abandoned at their deadline, by stage (queued or running).", ("tool", "stage")
+)
+CONTEXT_ITEMS_PRUNED = registry.counter(
+    "voice_context_items_pruned_total", "Conversation items shortened (digest) or deleted to stay under the token budget.", ("action",)
+)
+AMADEUS_RATE_LIMITED = registry.counter(
+    "voice_amadeus_rate_limited_total", "Amadeus 429 responses, by what followed (retried or gave_up).", ("outcome",)
+)
+CACHE_REQUESTS = registry.counter(
+    "voice_cache_requests_total", "Cache lookups by cache and result (hit or miss).", ("cache", "result")
+)
+ACTIVE_SESSIONS = registry.gauge(
+    "voice_active_sessions", "Voice sessions currently connected."
+)
+FLIGHT_WATCH_SUBSCRIPTIONS = registry.gauge(
+    "voice_flight_watch_subscriptions", "Sessions watching a flight's status."
+)
+FLIGHT_WATCH_POLLERS = registry.gauge(
+    "voice_flight_watch_pollers", "Distinct flights being polled for status."
+)
+FLIGHT_WATCH_POLLS = registry.counter(
+    "voice_flight_watch_polls_total", "Flight status polls sent upstream.", ("outcome",)
+)
+
+
+async def _handle_scrape(reader, writer):
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+        # Drain the headers; the body of a GET is empty.
+        while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+            pass
+        parts = request_line.decode("latin-1").split()
+        if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+            status, content_type = "200 OK", "text/plain; version=0.0.4; charset=utf-8"
+            body = registry.render().encode()
+        else:
+            status, content_type, body = "404 Not Found", "text/plain", b"not found\n"
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+    except (asyncio.TimeoutError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(host: str, port: int):
+    """Serve GET /metrics on host:port; returns the asyncio server."""
+    server = await asyncio.start_server(_handle_scrape, host, port)
+    logger.info(f"Metrics available at http://{host}:{port}/metrics")
+    return server
@@ -6,12 +6,16 @@ from typing import Optional
 import pyaudio
 
 from config import CHANNELS, CHUNK, FORMAT, RATE
+from assistant_modules.audio_io import AudioSource
 
 logger = logging.getLogger(__name__)
 
 
-class AsyncMicrophone:
+class AsyncMicrophone(AudioSource):
+    """PyAudio input device; the callback queues frames while capturing."""
+
     def __init__(self):
+        super().__init__()
         self.p = pyaudio.PyAudio()
         self.stream = self.p.open(
             format=FORMAT,
@@ -22,8 +26,6 @@ class AsyncMicrophone:
             stream_callback=self.callback,
         )
         self.queue = queue.Queue()
-        self.is_recording = False
-        self.is_receiving = False
         logger.info("AsyncMicrophone initialized")
 
     def callback(self, in_data, frame_count, time_info, status):
@@ -31,28 +33,17 @@ class AsyncMicrophone:
             self.queue.put(in_data)
         return (None, pyaudio.paContinue)
 
-    def start_recording(self):
-        self.is_recording = True
-        logger.info("Started recording")
-
-    def stop_recording(self):
-        self.is_recording = False
-        logger.info("Stopped recording")
-
-    def start_receiving(self):
-        self.is_receiving = True
-        self.is_recording = False
-        logger.info("Started receiving assistant response")
-
-    def stop_receiving(self):
-        self.is_receiving = False
-        logger.info("Stopped receiving assistant response")
-
     def get_audio_data(self) -> Optional[bytes]:
-        data = b""
-        while not self.queue.empty():
-            data += self.queue.get()
-        return data if data else None
+        chunks = []
+        while True:
+            try:
+                chunks.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return b"".join(chunks) if chunks else None
+
+    def queue_depth(self) -> int:
+        return self.queue.qsize()
 
     def close(self):
         self.stream.stop_stream()
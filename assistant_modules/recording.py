@@ -0,0 +1,57 @@
+import json
+import time
+
+# Outbound microphone frames are not needed for replay and would dominate
+# the file, so only their count is kept.
+_SKIPPED_OUTGOING = '"input_audio_buffer.append"'
+
+
+class EventRecorder:
+    """Writes realtime traffic to a JSONL file for benchmarks/bench_e2e.py.
+
+    Each line is {"t": seconds since start, "dir": "in" | "out", "message": raw}.
+    Writes go to a buffered file object, so recording adds no syscall per event.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, "w", buffering=1 << 20)
+        self.started = time.perf_counter()
+        self.skipped_audio_frames = 0
+
+    def write(self, direction: str, message):
+        if isinstance(message, bytes):
+            return
+        if direction == "out" and _SKIPPED_OUTGOING in message[:64]:
+            self.skipped_audio_frames += 1
+            return
+        self.file.write(
+            json.dumps({"t": round(time.perf_counter() - self.started, 4), "dir": direction, "message": message})
+        )
+        self.file.write("\n")
+
+    def wrap(self, websocket):
+        return RecordingWebSocket(websocket, self)
+
+    def close(self):
+        self.file.close()
+
+
+class RecordingWebSocket:
+    """Pass-through websocket that copies every text frame to an EventRecorder."""
+
+    def __init__(self, websocket, recorder: EventRecorder):
+        self._websocket = websocket
+        self._recorder = recorder
+
+    async def recv(self):
+        message = await self._websocket.recv()
+        self._recorder.write("in", message)
+        return message
+
+    async def send(self, message):
+        self._recorder.write("out", message)
+        await self._websocket.send(message)
+
+    def __getattr__(self, name):
+        return getattr(self._websocket, name)
@@ -0,0 +1,135 @@
+"""Deadline- and priority-aware execution of agent tool calls.
+
+Agents block on LLM and HTTP calls, so they run on worker threads. Every
+session on the event loop shares one ToolScheduler and its TOOL_WORKERS
+threads. Once they are all busy, queued calls start in priority order, then
+earliest deadline first, so a quick flight-status question is not stuck
+behind a slow activities search.
+
+Each call's deadline is its tool's conversational latency budget. Past
+that, the answer is no longer worth waiting for. A call whose deadline
+passes in the queue never starts; one that overruns while running is
+abandoned, and the caller gets ToolDeadlineExceeded. A session cancels its
+calls when they are superseded, for example when the user starts speaking
+again. A worker thread cannot be interrupted, so an abandoned call keeps
+its worker until the agent returns, and its result is discarded.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from assistant_modules.metrics import TOOL_DEADLINE_MISSES, TOOL_QUEUE_SECONDS
+from config import (
+    TOOL_DEADLINE_SECONDS,
+    TOOL_DEFAULT_DEADLINE_SECONDS,
+    TOOL_DEFAULT_PRIORITY,
+    TOOL_PRIORITIES,
+    TOOL_WORKERS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ToolCancelled(Exception):
+    pass
+
+
+class ToolDeadlineExceeded(Exception):
+    pass
+
+
+class ToolJob(object):
+    """One scheduled call; await result() for its outcome."""
+
+    __slots__ = ("tool", "function", "argument", "priority", "deadline", "submitted", "started", "future")
+
+    def __init__(self, tool: str, function, argument, priority: int, deadline: float):
+        self.tool = tool
+        self.function = function
+        self.argument = argument
+        self.priority = priority
+        self.deadline = deadline  # event-loop time
+        self.submitted = time.perf_counter()
+        self.started = None
+        self.future = asyncio.get_running_loop().create_future()
+
+    def cancel(self, reason: str):
+        if not self.future.done():
+            self.future.set_exception(ToolCancelled(reason))
+
+    def _miss(self, stage: str):
+        TOOL_DEADLINE_MISSES.labels(self.tool, stage).inc()
+        if not self.future.done():
+            self.future.set_exception(ToolDeadlineExceeded(f"{self.tool} missed its deadline while {stage}"))
+
+    async def result(self):
+        """The tool's return value; raises its exception, ToolCancelled or ToolDeadlineExceeded."""
+        remaining = self.deadline - asyncio.get_running_loop().time()
+        try:
+            return await asyncio.wait_for(asyncio.shield(self.future), max(0.0, remaining))
+        except asyncio.TimeoutError:
+            self._miss("running" if self.started is not None else "queued")
+            return self.future.result()
+
+
+class ToolScheduler(object):
+    def __init__(self, workers: int = TOOL_WORKERS):
+        self.workers = workers
+        self.running = 0
+        self._queue = []  # heap of (priority, deadline, sequence, job)
+        self._sequence = itertools.count()
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="tool")
+
+    def submit(self, tool: str, function, argument) -> ToolJob:
+        """Queue function(argument) with the tool's priority and deadline."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + TOOL_DEADLINE_SECONDS.get(tool, TOOL_DEFAULT_DEADLINE_SECONDS)
+        job = ToolJob(tool, function, argument, TOOL_PRIORITIES.get(tool, TOOL_DEFAULT_PRIORITY), deadline)
+        heapq.heappush(self._queue, (job.priority, job.deadline, next(self._sequence), job))
+        self._dispatch()
+        return job
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while self.running < self.workers and self._queue:
+            _, deadline, _, job = heapq.heappop(self._queue)
+            if job.future.done():
+                # Cancelled (or otherwise settled) while it waited.
+                continue
+            TOOL_QUEUE_SECONDS.labels(job.tool).observe(time.perf_counter() - job.submitted)
+            if loop.time() >= deadline:
+                job._miss("queued")
+                continue
+            job.started = time.perf_counter()
+            self.running += 1
+            work = asyncio.wrap_future(self._executor.submit(job.function, job.argument))
+            work.add_done_callback(lambda work, job=job: self._finished(job, work))
+
+    def _finished(self, job: ToolJob, work: asyncio.Future):
+        self.running -= 1
+        error = work.exception()
+        if not job.future.done():
+            if error is not None:
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(work.result())
+        else:
+            logger.info(f"Discarded the result of abandoned {job.tool} call")
+        self._dispatch()
+
+
+_scheduler = None
+
+
+def get_scheduler() -> ToolScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = ToolScheduler()
+    return _scheduler
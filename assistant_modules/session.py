@@ -0,0 +1,117 @@
+from config import (
+    BROWSER_TOOL,
+    CONVERSATION_REPLAY,
+    PREFIX_PADDING_MS,
+    SESSION_INSTRUCTIONS,
+    SILENCE_DURATION_MS,
+    SILENCE_THRESHOLD,
+)
+
+SESSION_TOOLS = [
+    {
+      "name": "amadeus_hotel_agent",
+      "type": "function",
+      "description": "Handles any Hotel related request such as searching, or checking status of booking on a freeform user query.",
+      "parameters": {
+        "type": "object",
+        "properties": {
+          "query": {
+            "type": "string",
+            "description": "A natural language query related to travel, such as hotel search. The query should have city name, ammenities(optional) required and rating(optional) of hotel. Example: 'I want to book a hotel in Bengaluru (BLR city code), with swimming pool, and atleast 4 star rating. What options are available?'"
+          }
+        },
+        "required": ["query"]
+      }
+    },
+    {
+      "name": "amadeus_flight_agent",
+      "type": "function",
+      "description": "Handles any flight related request such as searching, or checking status of flights on a freeform user query.",
+      "parameters": {
+        "type": "object",
+        "properties": {
+          "query": {
+            "type": "string",
+            "description": "A natural language query related to travel, such as flight search, or status check. Example: 'I want to book a flight from Gorakhpur to Bengaluru for 25-05-2025. What options are available?'"
+          }
+        },
+        "required": ["query"]
+      }
+    },
+    {
+      "name": "amadeus_activities_agent",
+      "type": "function",
+      "description": "Handles any query related to searching for activities in a city or country on a freeform user query.",
+      "parameters": {
+        "type": "object",
+        "properties": {
+          "query": {
+            "type": "string",
+            "description": "A natural language query related to activity search in a city or country. Example: 'Suggest me some activities to do in Paris.'"
+          }
+        },
+        "required": ["query"]
+      }
+    },
+    {
+      "name": "watch_flight_status",
+      "type": "function",
+      "description": "Keep an eye on a flight for the rest of the conversation when the user asks to be told about delays or changes. Returns the current status; later changes arrive as system messages that you should tell the user about.",
+      "parameters": {
+        "type": "object",
+        "properties": {
+          "flight_number": {
+            "type": "string",
+            "description": "Airline code and flight number, e.g. 'AI101' or '6E 2131'."
+          },
+          "date": {
+            "type": "string",
+            "description": "Scheduled departure date in YYYY-MM-DD format."
+          }
+        },
+        "required": ["flight_number", "date"]
+      }
+    }
+]
+
+if BROWSER_TOOL:
+    SESSION_TOOLS.append({
+      "name": "browser_lookup",
+      "type": "function",
+      "description": "Fallback web search for travel questions the other tools cannot answer, such as visa rules, opening hours or local events. Returns the text of a search results page.",
+      "parameters": {
+        "type": "object",
+        "properties": {
+          "query": {
+            "type": "string",
+            "description": "A short web search query. Example: 'Louvre opening hours Tuesday'"
+          }
+        },
+        "required": ["query"]
+      }
+    })
+
+
+def build_session_update(transport) -> dict:
+    """Initialize the session with voice capabilities and tools."""
+    session_update = {
+        "type": "session.update",
+        "session": {
+            "modalities": ["text", "audio"],
+            "instructions": SESSION_INSTRUCTIONS,
+            "voice": "ash",
+            "input_audio_format": transport.format,
+            "output_audio_format": transport.format,
+            "turn_detection": {
+                "type": "server_vad",
+                "threshold": SILENCE_THRESHOLD,
+                "prefix_padding_ms": PREFIX_PADDING_MS,
+                "silence_duration_ms": SILENCE_DURATION_MS,
+            },
+            "tools": SESSION_TOOLS,
+        },
+    }
+    if CONVERSATION_REPLAY:
+        # User turns are replayed as text, so they need a transcript.
+        session_update["session"]["input_audio_transcription"] = {"model": "whisper-1"}
+    return session_update
@@ -0,0 +1,67 @@
+import asyncio
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfiler:
+    """Records per-phase timings from process start to the first "Listening".
+
+    Phases may overlap; each one keeps its own start and end offsets so the
+    report shows what actually ran in parallel.
+    """
+
+    def __init__(self, origin: float = None):
+        self.origin = origin if origin is not None else time.perf_counter()
+        self.phases = []
+        self.ready_at = None
+
+    def record(self, name: str, start: float, end: float, thread: str = None):
+        self.phases.append(
+            (name, start - self.origin, end - self.origin, thread or threading.current_thread().name)
+        )
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    async def run(self, name: str, awaitable):
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    async def run_in_thread(self, name: str, fn, *args):
+        def timed():
+            start = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self.record(name, start, time.perf_counter())
+
+        return await asyncio.to_thread(timed)
+
+    def mark_ready(self):
+        self.ready_at = time.perf_counter() - self.origin
+
+    def report(self) -> str:
+        lines = [f"{'phase':24s} {'start ms':>9s} {'end ms':>9s} {'took ms':>9s}  thread"]
+        for name, start, end, thread in sorted(self.phases, key=lambda p: p[1]):
+            lines.append(
+                f"{name:24s} {start * 1000:9.1f} {end * 1000:9.1f} {(end - start) * 1000:9.1f}  {thread}"
+            )
+        if self.ready_at is not None:
+            serial = sum(end - start for _, start, end, _ in self.phases)
+            lines.append(
+                f"time to first 'Listening': {self.ready_at * 1000:.1f} ms "
+                f"(phases would take {serial * 1000:.1f} ms serially)"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,177 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import RUN_TIME_TABLE_LOG_JSON
+
+logger = logging.getLogger(__name__)
+
+
+class Histogram:
+    """Log-linear (HDR-style) latency histogram over integer microseconds.
+
+    Values below 2**sub_bits are exact; above that every power-of-two range
+    is split into 2**(sub_bits - 1) buckets, so relative error stays under
+    1% with the default 7 bits while memory stays a few KB per stage.
+    """
+
+    def __init__(self, sub_bits: int = 7, max_magnitude: int = 36):
+        self.sub_bits = sub_bits
+        self.sub_count = 1 << sub_bits
+        self.half = self.sub_count >> 1
+        self.counts = [0] * (self.sub_count + max_magnitude * self.half)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        if value < self.sub_count:
+            return value
+        shift = value.bit_length() - self.sub_bits
+        return self.sub_count + (shift - 1) * self.half + ((value >> shift) - self.half)
+
+    def _value_at(self, index: int) -> int:
+        if index < self.sub_count:
+            return index
+        shift = (index - self.sub_count) // self.half + 1
+        low = ((index - self.sub_count) % self.half + self.half) << shift
+        return low + (1 << shift) // 2
+
+    def record(self, value_us: int):
+        value_us = max(0, int(value_us))
+        index = min(self._index(value_us), len(self.counts) - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value_us
+        self.max = max(self.max, value_us)
+        self.min = value_us if self.min is None else min(self.min, value_us)
+
+    def percentile(self, p: float) -> int:
+        if not self.count:
+            return 0
+        target = max(1, int(round(self.count * p / 100.0)))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(self._value_at(index), self.max)
+        return self.max
+
+
+class Tracer:
+    """Collects per-stage latency spans for the voice pipeline.
+
+    Recording is a lock plus a histogram update, safe from worker threads.
+    Raw records are buffered in memory and written to disk by flush_forever()
+    in a background thread, never on the event loop.
+    """
+
+    def __init__(self, path: str = RUN_TIME_TABLE_LOG_JSON, buffer_size: int = 10000):
+        self.path = path
+        self.histograms = {}
+        self.pending = deque(maxlen=buffer_size)
+        self._open_spans = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.record(seconds * 1e6)
+            self.pending.append((time.time(), stage, seconds))
+
+    @contextmanager
+    def span(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def start(self, stage: str, key=None):
+        self._open_spans[(stage, key)] = time.perf_counter()
+
+    def end(self, stage: str, key=None):
+        """Close a span opened with start(); returns its duration or None."""
+        start = self._open_spans.pop((stage, key), None)
+        if start is None:
+            return None
+        duration = time.perf_counter() - start
+        self.record(stage, duration)
+        return duration
+
+    def cancel(self, stage: str, key=None):
+        self._open_spans.pop((stage, key), None)
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.pending.clear()
+            self._open_spans.clear()
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                stage: {
+                    "count": h.count,
+                    "p50_ms": h.percentile(50) / 1000,
+                    "p95_ms": h.percentile(95) / 1000,
+                    "p99_ms": h.percentile(99) / 1000,
+                    "max_ms": h.max / 1000,
+                    "mean_ms": h.total / h.count / 1000 if h.count else 0.0,
+                }
+                for stage, h in sorted(self.histograms.items())
+            }
+
+    def format_summary(self) -> str:
+        lines = [f"{'stage':40s} {'count':>6s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'max ms':>9s}"]
+        for stage, s in self.summary().items():
+            lines.append(
+                f"{stage:40s} {s['count']:6d} {s['p50_ms']:9.1f} {s['p95_ms']:9.1f} {s['p99_ms']:9.1f} {s['max_ms']:9.1f}"
+            )
+        return "\n".join(lines)
+
+    def _drain(self) -> list:
+        with self._lock:
+            records = list(self.pending)
+            self.pending.clear()
+        return records
+
+    def _write(self, records: list):
+        with open(self.path, "a") as file:
+            for timestamp, stage, seconds in records:
+                json.dump(
+                    {
+                        "timestamp": datetime.fromtimestamp(timestamp).isoformat(),
+                        "function": stage,
+                        "duration": f"{seconds:.4f}",
+                    },
+                    file,
+                )
+                file.write("\n")
+
+    async def flush(self):
+        records = self._drain()
+        if records:
+            await asyncio.to_thread(self._write, records)
+
+    async def flush_forever(self, interval: float = 5.0):
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                await self.flush()
+        finally:
+            # Final flush on cancellation; synchronous because the loop is stopping.
+            records = self._drain()
+            if records:
+                self._write(records)
+
+
+tracer = Tracer()
@@ -0,0 +1,161 @@
+import logging
+from math import gcd
+
+import numpy as np
+
+from config import G711_RATE, RATE
+
+logger = logging.getLogger(__name__)
+
+TRANSPORT_FORMATS = ("pcm16", "g711_ulaw", "g711_alaw")
+
+
+def _build_ulaw_tables():
+    # Vectorized port of the reference G.711 (Sun g711.c) mu-law routines.
+    pcm = np.arange(-32768, 32768, dtype=np.int32) >> 2
+    mask = np.where(pcm < 0, 0x7F, 0xFF)
+    mag = np.minimum(np.abs(pcm), 8159) + 0x21
+    seg = np.searchsorted(
+        np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF]), mag
+    )
+    uval = (seg << 4) | ((mag >> (seg + 1)) & 0xF)
+    uval = np.where(seg >= 8, 0x7F, uval)
+    encode = ((uval ^ mask) & 0xFF).astype(np.uint8)
+    # Index the table with the uint16 view of the samples.
+    encode = np.roll(encode, -32768)
+
+    u = ~np.arange(256, dtype=np.int32) & 0xFF
+    t = (((u & 0xF) << 3) + 0x84) << ((u & 0x70) >> 4)
+    decode = np.where(u & 0x80, 0x84 - t, t - 0x84).astype(np.int16)
+    return encode, decode
+
+
+def _build_alaw_tables():
+    # Vectorized port of the reference G.711 (Sun g711.c) A-law routines.
+    pcm = np.arange(-32768, 32768, dtype=np.int32) >> 3
+    mask = np.where(pcm >= 0, 0xD5, 0x55)
+    mag = np.where(pcm >= 0, pcm, -pcm - 1)
+    seg = np.searchsorted(
+        np.array([0x1F, 0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF]), mag
+    )
+    shift = np.where(seg < 2, 1, seg)
+    aval = (np.minimum(seg, 7) << 4) | ((mag >> shift) & 0xF)
+    aval = np.where(seg >= 8, 0x7F, aval)
+    encode = ((aval ^ mask) & 0xFF).astype(np.uint8)
+    encode = np.roll(encode, -32768)
+
+    a = np.arange(256, dtype=np.int32) ^ 0x55
+    seg = (a & 0x70) >> 4
+    t = (a & 0xF) << 4
+    t = np.where(seg == 0, t + 8, t + 0x108)
+    t = np.where(seg > 1, t << np.maximum(seg - 1, 0), t)
+    decode = np.where(a & 0x80, t, -t).astype(np.int16)
+    return encode, decode
+
+
+_TABLES = {}
+
+
+def _tables(name: str):
+    if name not in _TABLES:
+        builder = _build_ulaw_tables if name == "g711_ulaw" else _build_alaw_tables
+        _TABLES[name] = builder()
+    return _TABLES[name]
+
+
+def g711_encode(pcm16: bytes, law: str = "g711_ulaw") -> bytes:
+    encode, _ = _tables(law)
+    samples = np.frombuffer(pcm16, dtype=np.uint16)
+    return encode[samples].tobytes()
+
+
+def g711_decode(data: bytes, law: str = "g711_ulaw") -> bytes:
+    _, decode = _tables(law)
+    codes = np.frombuffer(data, dtype=np.uint8)
+    return decode[codes].tobytes()
+
+
+class Resampler:
+    """Streaming polyphase resampler with a Kaiser-windowed sinc filter.
+
+    Keeps the filter history and output phase between calls, so a stream can
+    be fed in arbitrary chunk sizes without clicks at chunk boundaries.
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int, taps_per_phase: int = 16, beta: float = 8.0):
+        g = gcd(src_rate, dst_rate)
+        self.up = dst_rate // g
+        self.down = src_rate // g
+        # Decimating filters need proportionally more taps for the same stopband.
+        taps_per_phase *= max(1, -(-self.down // self.up))
+        self.taps = taps_per_phase
+
+        n = taps_per_phase * self.up
+        cutoff = 0.95 / max(self.up, self.down)
+        t = np.arange(n) - (n - 1) / 2
+        h = cutoff * np.sinc(cutoff * t) * np.kaiser(n, beta) * self.up
+        # phases[p, k] = h[p + k * up]; taps are reversed so a row can be
+        # dotted directly with the matching window of input samples.
+        self._phases = h.reshape(taps_per_phase, self.up).T[:, ::-1].astype(np.float32)
+        self._offsets = np.arange(-(taps_per_phase - 1), 1)
+        self._history = np.zeros(taps_per_phase - 1, dtype=np.float32)
+        self._pos = (taps_per_phase - 1) * self.up
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        if self.up == self.down:
+            return samples
+        buf = np.concatenate((self._history, samples.astype(np.float32)))
+        limit = len(buf) * self.up - 1
+        count = max(0, (limit - self._pos) // self.down + 1)
+        positions = self._pos + self.down * np.arange(count)
+        bases = positions // self.up
+        windows = buf[bases[:, None] + self._offsets]
+        out = np.einsum("ij,ij->i", windows, self._phases[positions % self.up])
+
+        self._pos += count * self.down - len(samples) * self.up
+        self._history = buf[len(buf) - (self.taps - 1):]
+        return out
+
+    def process_pcm16(self, pcm16: bytes) -> bytes:
+        if self.up == self.down:
+            return pcm16
+        out = self.process(np.frombuffer(pcm16, dtype=np.int16))
+        return np.clip(np.rint(out), -32768, 32767).astype(np.int16).tobytes()
+
+
+class AudioTransport:
+    """Converts device PCM16 audio to and from the realtime wire format."""
+
+    def __init__(self, fmt: str = "pcm16", device_rate: int = RATE):
+        if fmt not in TRANSPORT_FORMATS:
+            raise ValueError(f"Unsupported audio transport format: {fmt}")
+        self.format = fmt
+        self.device_rate = device_rate
+        self.wire_rate = device_rate if fmt == "pcm16" else G711_RATE
+        self._upstream = Resampler(device_rate, self.wire_rate)
+        self._downstream = Resampler(self.wire_rate, device_rate)
+
+    @property
+    def bytes_per_second(self) -> int:
+        return self.wire_rate * (2 if self.format == "pcm16" else 1)
+
+    def encode(self, pcm16: bytes) -> bytes:
+        if self.format == "pcm16":
+            return pcm16
+        return g711_encode(self._upstream.process_pcm16(pcm16), self.format)
+
+    def decode(self, data: bytes) -> bytes:
+        if self.format == "pcm16":
+            return data
+        return self._downstream.process_pcm16(g711_decode(data, self.format))
+
+
+def get_transport(fmt: str = None) -> AudioTransport:
+    from config import AUDIO_TRANSPORT
+
+    transport = AudioTransport(fmt or AUDIO_TRANSPORT)
+    logger.info(
+        f"Audio transport: {transport.format} @ {transport.wire_rate} Hz "
+        f"({transport.bytes_per_second // 1000} KB/s upstream)"
+    )
+    return transport
@@ -12,7 +12,7 @@ class VisualInterface:
         self.height = height
         self.screen = pygame.display.set_mode((width, height))
         pygame.display.set_caption("My Operator")
-        self.clock = pygame.time.Clock()
+        self.background = (0, 0, 0)
 
         self.draw_color = (255, 255, 255)  # White
 
@@ -23,15 +23,34 @@ class VisualInterface:
         self.current_radius = self.base_radius
 
         self.energy_queue = deque(maxlen=50)
+        self.energy_sum = 0.0
         self.update_interval = 0.05
         self.max_energy = 1.0
 
         self.wave_phase = 0.0
         self.transition_factor = 0.0
+        self.current_scale = 1.0
+        self.pulse_phase = 0
 
         self.icon_image = pygame.image.load("assistant_modules/icon.png").convert_alpha()
         self.icon_size = (96, 96)  # Smaller base size
-        self.icon_image = pygame.transform.smoothscale(self.icon_image, self.icon_size)
+
+        # Sprite cache: the icon pre-scaled once per quantized scale step, so
+        # no smoothscale happens on the render path.
+        self.scale_step = 0.01
+        self.max_scale = 1.2
+        self.icon_frames = [
+            self._scale_icon(1.0 + i * self.scale_step)
+            for i in range(int(round((self.max_scale - 1.0) / self.scale_step)) + 1)
+        ]
+        self.icon_image = self.icon_frames[0]
+
+        # One reusable alpha surface, just large enough for the biggest pulse ring.
+        max_pulse_radius = self.icon_size[0] * 2
+        self.pulse_surface = pygame.Surface(
+            (2 * max_pulse_radius + 4, 2 * max_pulse_radius + 4), pygame.SRCALPHA
+        )
+        self.pulse_center = (max_pulse_radius + 2, max_pulse_radius + 2)
 
         # Text related
         self.font = pygame.font.SysFont(None, 24)
@@ -39,19 +58,82 @@ class VisualInterface:
         self.displayed_text = ""
         self.text_display_progress = 0
         self.text_animation_speed = 10  # characters per frame
-        
-
-    async def update(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                return False
+        self.text_surface = None
+        self.rendered_text = None
+
+        # Screen regions drawn in the previous frame; only these plus the
+        # regions drawn this frame are pushed to the display.
+        self.dirty_rects = []
+        self.needs_full_redraw = True
+        self.next_frame_time = None
+        self.running = True
+
+    def _scale_icon(self, scale):
+        size = (
+            min(int(self.icon_size[0] * scale), self.width),
+            min(int(self.icon_size[1] * scale), self.height),
+        )
+        return pygame.transform.smoothscale(self.icon_image, size)
+
+    def _icon_frame(self, scale):
+        index = int(round((scale - 1.0) / self.scale_step))
+        return self.icon_frames[max(0, min(index, len(self.icon_frames) - 1))]
+
+    def _draw_icon(self):
+        frame = self._icon_frame(self.current_scale)
+        rect = frame.get_rect(center=(self.width // 2, self.height // 2))
+        self.screen.blit(frame, rect)
+        return rect
+
+    def _draw_pulse(self):
+        self.pulse_phase += 1
+
+        pulse_radius = int(self.icon_size[0] * (1.5 + 0.5 * np.sin(self.pulse_phase * 0.2)))
+        pulse_alpha = max(0, 180 - self.pulse_phase * 4)
+
+        if pulse_alpha <= 0:
+            self.pulse_phase = 0  # Restart pulse
+            return None
+
+        ring = pygame.Rect(0, 0, 2 * pulse_radius + 2, 2 * pulse_radius + 2)
+        ring.center = self.pulse_center
+        self.pulse_surface.fill((0, 0, 0, 0), ring)
+        pygame.draw.circle(
+            self.pulse_surface,
+            (255, 255, 255, pulse_alpha),
+            self.pulse_center,
+            pulse_radius,
+            width=2
+        )
+        target = ring.copy()
+        target.center = (self.width // 2, self.height // 2)
+        self.screen.blit(self.pulse_surface, target, area=ring)
+        return target
 
-        self.screen.fill((0, 0, 0))
+    def _draw_text(self):
+        # Text animation (typewriter effect)
+        self.text_display_progress += self.text_animation_speed
+        chars_to_show = min(int(self.text_display_progress), len(self.full_text))
+        self.displayed_text = self.full_text[:chars_to_show]
+
+        if self.displayed_text != self.rendered_text:
+            self.text_surface = self.font.render(self.displayed_text, True, (255, 255, 255))
+            self.rendered_text = self.displayed_text
+        text_rect = self.text_surface.get_rect(center=(self.width // 2, self.height - 30))
+        self.screen.blit(self.text_surface, text_rect)
+        return text_rect
+
+    def render(self):
+        """Draw one frame, pushing only the regions that changed."""
+        previous_rects = self.dirty_rects
+        for rect in previous_rects:
+            self.screen.fill(self.background, rect)
+        if self.needs_full_redraw:
+            self.screen.fill(self.background)
 
         # Energy smoothing
         normalized_energy = (
-            np.mean(self.energy_queue) / (self.max_energy or 1.0)
+            (self.energy_sum / len(self.energy_queue)) / (self.max_energy or 1.0)
             if self.energy_queue else 0.0
         )
 
@@ -60,62 +142,54 @@ class VisualInterface:
             target_scale = 1.0 + 0.2 * normalized_energy  # Bounce
         else:
             target_scale = 1.0 + 0.05 * normalized_energy  # Gentle pulse
-
-        self.current_scale = getattr(self, "current_scale", 1.0)
         self.current_scale += (target_scale - self.current_scale) * 0.3
 
-        # Scaled icon
-        scaled_size = (
-            int(self.icon_size[0] * self.current_scale),
-            int(self.icon_size[1] * self.current_scale),
-        )
-        scaled_size = (
-            min(scaled_size[0], self.width),
-            min(scaled_size[1], self.height),
-        )
-        scaled_icon = pygame.transform.smoothscale(self.icon_image, scaled_size)
-        icon_x = self.width // 2 - scaled_size[0] // 2
-        icon_y = self.height // 2 - scaled_size[1] // 2
-        self.screen.blit(scaled_icon, (icon_x, icon_y))
+        drawn = [self._draw_icon()]
 
         # Pulse effect when not speaking
         if not self.is_assistant_speaking:
-            self.pulse_phase = getattr(self, "pulse_phase", 0)
-            self.pulse_phase += 1
-
-            pulse_radius = int(self.icon_size[0] * (1.5 + 0.5 * np.sin(self.pulse_phase * 0.2)))
-            pulse_alpha = max(0, 180 - self.pulse_phase * 4)
-
-            if pulse_alpha > 0:
-                pulse_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-                pygame.draw.circle(
-                    pulse_surface,
-                    (255, 255, 255, pulse_alpha),
-                    (self.width // 2, self.height // 2),
-                    pulse_radius,
-                    width=2
-                )
-                self.screen.blit(pulse_surface, (0, 0))
-            else:
-                self.pulse_phase = 0  # Restart pulse
+            drawn.append(self._draw_pulse())
 
-        # Text animation (typewriter effect)
         if self.full_text:
-            self.text_display_progress += self.text_animation_speed
-            chars_to_show = int(self.text_display_progress)
-            if chars_to_show > len(self.full_text):
-                chars_to_show = len(self.full_text)
-            self.displayed_text = self.full_text[:chars_to_show]
-
-            text_surface = self.font.render(self.displayed_text, True, (255, 255, 255))
-            text_rect = text_surface.get_rect(center=(self.width // 2, self.height - 30))
-            self.screen.blit(text_surface, text_rect)
-
-        pygame.display.flip()
-        self.clock.tick(60)
-        await asyncio.sleep(self.update_interval)
+            drawn.append(self._draw_text())
+
+        self.dirty_rects = [rect for rect in drawn if rect is not None]
+        if self.needs_full_redraw:
+            pygame.display.flip()
+            self.needs_full_redraw = False
+        else:
+            pygame.display.update(previous_rects + self.dirty_rects)
+
+    async def update(self):
+        if not self.running:
+            return False
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.close()
+                return False
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.needs_full_redraw = True
+
+        self.render()
+
+        # Pace frames against the loop clock instead of clock.tick(), which
+        # sleeps the whole thread and would stall audio and websocket tasks.
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if self.next_frame_time is None or now - self.next_frame_time > self.update_interval:
+            self.next_frame_time = now
+        self.next_frame_time += self.update_interval
+        await asyncio.sleep(max(0.0, self.next_frame_time - now))
         return True
 
+    async def run(self):
+        await run_visual_interface(self)
+
+    def close(self):
+        if self.running:
+            self.running = False
+            pygame.quit()
+
     def set_active(self, is_active):
         self.is_active = is_active
 
@@ -125,11 +199,14 @@ class VisualInterface:
     def update_energy(self, energy):
         if isinstance(energy, np.ndarray):
             energy = np.mean(np.abs(energy))
+        energy = float(energy)
+        if len(self.energy_queue) == self.energy_queue.maxlen:
+            self.energy_sum -= self.energy_queue[0]
         self.energy_queue.append(energy)
+        self.energy_sum += energy
 
-        current_max = max(self.energy_queue)
-        if current_max > self.max_energy:
-            self.max_energy = current_max
+        if energy > self.max_energy:
+            self.max_energy = energy
         elif len(self.energy_queue) == self.energy_queue.maxlen:
             self.max_energy = max(self.energy_queue)
 
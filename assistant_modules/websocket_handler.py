@@ -1,171 +1,506 @@
+import asyncio
 import base64
+import importlib
 import json
 import logging
+import sys
 import time
 
 import websockets
 
-from assistant_modules.audio import audio_player
-from assistant_modules.log_utils import log_runtime, log_ws_event
-# from browser_tool.agent import use_browser, get_current_time
-from ai.agents.amadeus_flight.agent import get_as_openai_function as get_flights
-from ai.agents.amadeus_hotel.agent import get_as_openai_function as get_hotels
-from ai.agents.amadeus_activities.agent import get_as_openai_function as get_activities
+from assistant_modules import codec
+from assistant_modules.connection import ConversationLog
+from assistant_modules.context import EVENT_ID_PREFIX, ContextPruner
+from assistant_modules.log_utils import log_runtime, log_ws_event, truncate_payload
+from assistant_modules.metrics import (
+    AUDIO_BYTES_DOWN,
+    CACHE_REQUESTS,
+    REALTIME_EVENTS,
+    TOOL_CALL_SECONDS,
+    TOOL_CALLS,
+)
+from assistant_modules.scheduler import ToolCancelled, ToolDeadlineExceeded, get_scheduler
+from assistant_modules.tracing import tracer
+from config import BROWSER_TOOL, CONTEXT_TOKEN_BUDGET, FILLER_AUDIO
 
 
 logger = logging.getLogger(__name__)
 
-TOOLS = ["amadeus_flight_agent", "amadeus_hotel_agent", "amadeus_activities_agent"]
+# Agent modules pull in LangChain/LangGraph, so they are imported on first use
+# (or by warm_agents() in the background) instead of at startup.
+AGENT_MODULES = {
+    "amadeus_flight_agent": "ai.agents.amadeus_flight.agent",
+    "amadeus_hotel_agent": "ai.agents.amadeus_hotel.agent",
+    "amadeus_activities_agent": "ai.agents.amadeus_activities.agent",
+}
+TOOL_MODULES = dict(AGENT_MODULES)
+if BROWSER_TOOL:
+    TOOL_MODULES["browser_lookup"] = "browser_tool.agent"
 
+TOOLS = list(TOOL_MODULES)
 
-async def process_ws_messages(websocket, mic, visual_interface):
-    assistant_reply = ""
-    function_call = None
-    function_call_args = ""
-    response_start_time = None
+# Handled in-process by the shared flight watcher rather than by an agent.
+FLIGHT_WATCH_TOOL = "watch_flight_status"
+# How long the tool call waits for the watcher's first status.
+FLIGHT_WATCH_FIRST_STATUS_SECONDS = 5.0
 
-    while True:
+
+def get_tool_function(name: str):
+    return importlib.import_module(TOOL_MODULES[name]).get_as_openai_function
+
+
+def warm_agents():
+    """Import every agent and build its executor ahead of the first tool call.
+
+    Also loads the filler clips and launches the browser pool, when enabled.
+    """
+    if FILLER_AUDIO:
+        from assistant_modules.fillers import get_filler_clips
+
+        get_filler_clips()
+    for name, module_name in AGENT_MODULES.items():
+        try:
+            importlib.import_module(module_name).get_agent_executor()
+        except Exception as e:
+            logger.warning(f"Could not warm up {name}: {e}")
+    if BROWSER_TOOL:
+        try:
+            from browser_tool.agent import get_pool
+
+            get_pool()
+        except Exception as e:
+            logger.warning(f"Could not launch the browser pool: {e}")
+
+
+def _agent_cache_stat(field: str):
+    def read():
+        total = 0
+        for module_name in AGENT_MODULES.values():
+            module = sys.modules.get(module_name)
+            if module is not None:
+                total += getattr(module.get_agent_executor.cache_info(), field)
+        return total
+
+    return read
+
+
+CACHE_REQUESTS.set_function(_agent_cache_stat("hits"), "agent_executor", "hit")
+CACHE_REQUESTS.set_function(_agent_cache_stat("misses"), "agent_executor", "miss")
+
+
+class _StopProcessing(Exception):
+    pass
+
+
+class RealtimeEventHandler:
+    """Per-connection state and handlers for realtime API server events.
+
+    Events are routed through a dispatch table keyed by event type instead of
+    an if/elif chain, and audio deltas take a fast path that skips the JSON
+    parser entirely.
+
+    `mic` only needs the start/stop recording and receiving controls and
+    `player` anything with play_audio_chunk/stop_playback/close, so the same
+    handler drives a local microphone and speakers or a remote client.
+    `tool_functions` overrides the agent behind each tool name (benchmarks
+    and load tests use stubs); by default agents are imported on first use.
+    """
+
+    def __init__(self, websocket, mic, visual_interface, transport=None, player=None, conversation_log=None, tool_functions=None):
+        if player is None:
+            from assistant_modules.audio import get_audio_player
+
+            player = get_audio_player()
+        self.websocket = websocket
+        self.mic = mic
+        self.visual_interface = visual_interface
+        self.transport = transport
+        self.player = player
+        self.context_pruner = None
+        if CONTEXT_TOKEN_BUDGET:
+            # Pruning needs the item list even when replay is off.
+            if conversation_log is None:
+                conversation_log = ConversationLog()
+            self.context_pruner = ContextPruner(conversation_log)
+        self.conversation_log = conversation_log
+        self.tool_functions = tool_functions
+
+        self.assistant_reply = ""
+        self.function_call = None
+        self.function_call_args = ""
+        self.response_start_time = None
+        self.speech_stopped_at = None
+        self.awaiting_first_audio = False
+        self.awaiting_response_created = False
+        self.audio_delta_events = REALTIME_EVENTS.labels("response.audio.delta")
+        self.flight_watches = {}  # Subscription -> relay task
+        self.filler = None
+        self.response_had_audio = False
+        self.tool_calls = {}  # call_id -> (ToolJob, completion task)
+
+        self.handlers = {
+            "response.created": self.on_response_created,
+            "response.output_item.added": self.on_output_item_added,
+            "response.function_call_arguments.delta": self.on_function_call_arguments_delta,
+            "response.function_call_arguments.done": self.on_function_call_arguments_done,
+            "response.text.delta": self.on_text_delta,
+            "response.audio.delta": self.on_audio_delta,
+            "response.done": self.on_response_done,
+            "rate_limits.updated": self.on_rate_limits_updated,
+            "error": self.on_error,
+            "input_audio_buffer.speech_started": self.on_speech_started,
+            "input_audio_buffer.speech_stopped": self.on_speech_stopped,
+        }
+
+    async def handle_message(self, message):
+        audio_chunk = codec.decode_audio_delta(message)
+        if audio_chunk is not None:
+            self.audio_delta_events.inc()
+            log_ws_event("incoming", "response.audio.delta")
+            await self.play_audio(audio_chunk)
+            return
+
+        event = codec.loads(message)
+        event_type = event.get("type", "unknown")
+        log_ws_event("incoming", event_type)
+        REALTIME_EVENTS.labels(event_type).inc()
+        if self.conversation_log is not None:
+            self.conversation_log.record_event(event)
+        handler = self.handlers.get(event_type)
+        if handler is not None:
+            await handler(event)
+
+    def get_tool_function(self, tool: str):
+        if self.tool_functions is not None:
+            return self.tool_functions[tool]
+        return get_tool_function(tool)
+
+    async def send(self, event: dict):
+        log_ws_event("outgoing", event.get("type", "unknown"))
+        await self.websocket.send(codec.dumps(event))
+
+    async def play_audio(self, audio_chunk: bytes):
+        self.response_had_audio = True
+        if self.filler is not None:
+            await self.filler.fade_out()
+            self.filler = None
+        if self.awaiting_first_audio:
+            self.awaiting_first_audio = False
+            tracer.record(
+                "speech_stopped_to_first_audio",
+                time.perf_counter() - self.speech_stopped_at,
+            )
+        AUDIO_BYTES_DOWN.inc(len(audio_chunk))
+        if self.transport is not None:
+            audio_chunk = self.transport.decode(audio_chunk)
+        await self.player.play_audio_chunk(audio_chunk, self.visual_interface)
+
+    async def on_response_created(self, event):
+        self.response_had_audio = False
+        if self.awaiting_response_created:
+            self.awaiting_response_created = False
+            tracer.record(
+                "speech_stopped_to_response_created",
+                time.perf_counter() - self.speech_stopped_at,
+            )
+        self.mic.start_receiving()
+        self.visual_interface.set_active(True)
+
+    async def on_output_item_added(self, event):
+        item = event.get("item", {})
+        if item.get("type") == "function_call":
+            self.function_call = item
+            self.function_call_args = ""
+
+    async def on_function_call_arguments_delta(self, event):
+        self.function_call_args += event.get("delta", "")
+
+    async def on_function_call_arguments_done(self, event):
+        if not self.function_call:
+            return
+        function_name = self.function_call.get("name")
+        call_id = self.function_call.get("call_id")
         try:
-            message = await websocket.recv()
-            event = json.loads(message)
-            # log_ws_event("incoming", event)
-
-            event_type = event.get("type")
-
-            if event_type == "response.created":
-                mic.start_receiving()
-                visual_interface.set_active(True)
-            elif event_type == "response.output_item.added":
-                item = event.get("item", {})
-                if item.get("type") == "function_call":
-                    function_call = item
-                    function_call_args = ""
-            elif event_type == "response.function_call_arguments.delta":
-                function_call_args += event.get("delta", "")
-            elif event_type == "response.function_call_arguments.done":
-                if function_call:
-                    function_name = function_call.get("name")
-                    call_id = function_call.get("call_id")
-                    try:
-                        args = (
-                            json.loads(function_call_args) if function_call_args else {}
-                        )
-                    except json.JSONDecodeError:
-                        logger.error(
-                            f"Failed to parse function arguments: {function_call_args}"
-                        )
-                        args = {}
-
-                    print(f"Calling function: {function_name} with args: {args}")
-
-                    print("all tools:", TOOLS)
-
-                    tool = next(
-                        (t for t in TOOLS if t.lower() == function_name.lower()),
-                        None,
-                    )
-
-                    print("tool:", tool)
-
-                    if tool:
-                        logger.info(
-                            f" ---- Calling Agent: {function_name} with query : {args} ----"
-                        )
-                        try:
-                            print(args)
-                            
-                            if tool == "amadeus_flight_agent":
-                                result = get_flights(args["query"])
-                                # visual_interface.display_text(result)
-                            elif tool == "amadeus_hotel_agent":
-                                result = get_hotels(args["query"])
-                                # visual_interface.display_text(result)
-                            elif tool == "amadeus_activities_agent":
-                                result = get_activities(args["query"])
-                                # visual_interface.display_text(result)
-
-                            logger.info(
-                                f"Function {function_name} call result: {result}"
-                            )
-                        except Exception as e:
-                            logger.error(
-                                f"Error calling function {function_name}: {str(e)}"
-                            )
-                            result = {
-                                "error": f"Function '{function_name}' failed: {str(e)}"
-                            }
-                    else:
-                        logger.warning(f"Function '{function_name}' not found in TOOLS")
-                        result = {"error": f"Function '{function_name}' not found."}
-
-                    function_call_output = {
+            args = (
+                json.loads(self.function_call_args) if self.function_call_args else {}
+            )
+        except json.JSONDecodeError:
+            logger.error(
+                "Failed to parse function arguments: %s",
+                truncate_payload(self.function_call_args),
+            )
+            args = {}
+
+        tool = next(
+            (t for t in TOOLS if t.lower() == function_name.lower()),
+            None,
+        )
+
+        self.function_call = None
+        self.function_call_args = ""
+
+        if function_name == FLIGHT_WATCH_TOOL:
+            await self.watch_flight_status(call_id, args)
+            return
+        elif tool:
+            logger.info(
+                " ---- Calling Agent: %s with query : %s ----",
+                function_name,
+                truncate_payload(args),
+                extra={"tool": tool, "call_id": call_id},
+            )
+            self.start_filler()
+            try:
+                job = get_scheduler().submit(tool, self.get_tool_function(tool), args["query"])
+            except KeyError as e:
+                result = {"error": f"Function '{function_name}' failed: missing argument {e}"}
+                TOOL_CALLS.labels(tool, "error").inc()
+            else:
+                # Awaited in the background so server events (and the user
+                # interrupting) keep being handled while the agent works.
+                task = asyncio.create_task(self.complete_tool_call(tool, call_id, job))
+                self.tool_calls[call_id] = (job, task)
+                return
+        else:
+            logger.warning(f"Function '{function_name}' not found in TOOLS")
+            TOOL_CALLS.labels("unknown", "not_found").inc()
+            result = {"error": f"Function '{function_name}' not found."}
+        await self.send_tool_output(call_id, result)
+
+    async def send_tool_output(self, call_id: str, result, respond: bool = True):
+        await self.send(
+            {
+                "type": "conversation.item.create",
+                "item": {
+                    "type": "function_call_output",
+                    "call_id": call_id,
+                    # Tools that render their own compact JSON return it as a string.
+                    "output": result if isinstance(result, str) else codec.dumps(result),
+                },
+            }
+        )
+        if respond:
+            await self.send({"type": "response.create"})
+
+    async def complete_tool_call(self, tool: str, call_id: str, job):
+        respond = True
+        try:
+            result = await job.result()
+            # visual_interface.display_text(result)
+            logger.info(
+                "Function %s call result: %s",
+                tool,
+                truncate_payload(result),
+                extra={"tool": tool, "call_id": call_id},
+            )
+            outcome = "ok"
+        except ToolCancelled as e:
+            logger.info(f"Tool call {tool} cancelled: {e}")
+            # The call still needs an output, but the user has moved on.
+            result = {"error": f"Cancelled: {e}"}
+            outcome, respond = "cancelled", False
+            self.stop_filler()
+        except ToolDeadlineExceeded as e:
+            logger.warning(str(e))
+            result = {"error": f"Function '{tool}' took too long; tell the user it is unavailable right now."}
+            outcome = "deadline"
+        except Exception as e:
+            logger.error("Error calling function %s: %s", tool, e)
+            result = {"error": f"Function '{tool}' failed: {str(e)}"}
+            outcome = "error"
+        finally:
+            self.tool_calls.pop(call_id, None)
+        if job.started is not None:
+            elapsed = time.perf_counter() - job.started
+            tracer.record(f"tool_call.{tool}", elapsed)
+            TOOL_CALL_SECONDS.labels(tool).observe(elapsed)
+        TOOL_CALLS.labels(tool, outcome).inc()
+        await self.send_tool_output(call_id, result, respond)
+
+    def cancel_tool_calls(self, reason: str):
+        for job, _ in list(self.tool_calls.values()):
+            job.cancel(reason)
+
+    def start_filler(self):
+        """Cover a tool call with a filler clip, unless the model already spoke."""
+        if not FILLER_AUDIO or self.response_had_audio:
+            return
+        if self.filler is not None and not self.filler.done():
+            return
+        from assistant_modules.fillers import FillerPlayback, get_filler_clips
+
+        clip = get_filler_clips().pick()
+        if clip is None:
+            return
+        if self.awaiting_first_audio:
+            tracer.record("speech_stopped_to_filler", time.perf_counter() - self.speech_stopped_at)
+        self.filler = FillerPlayback(clip, self.player, self.visual_interface)
+
+    def stop_filler(self):
+        if self.filler is not None:
+            self.filler.cancel()
+            self.filler = None
+
+    async def watch_flight_status(self, call_id: str, args: dict):
+        """Subscribe this session to a flight; changes are relayed as system messages."""
+        from ai.agents.amadeus_flight.watcher import flight_watcher
+
+        try:
+            subscription = flight_watcher.subscribe(args["flight_number"], args["date"])
+        except (KeyError, ValueError) as e:
+            TOOL_CALLS.labels(FLIGHT_WATCH_TOOL, "error").inc()
+            await self.send_tool_output(call_id, {"error": f"Cannot watch flight: {e}"})
+            return
+        TOOL_CALLS.labels(FLIGHT_WATCH_TOOL, "ok").inc()
+        # The first status can take a poll; wait for it off the recv loop.
+        self.flight_watches[subscription] = asyncio.create_task(self.relay_flight_updates(call_id, subscription))
+
+    async def relay_flight_updates(self, call_id: str, subscription):
+        from ai.agents.projections import render
+
+        try:
+            try:
+                status = await asyncio.wait_for(subscription.next(), FLIGHT_WATCH_FIRST_STATUS_SECONDS)
+                finished = status is None
+            except asyncio.TimeoutError:
+                status, finished = None, False
+            await self.send_tool_output(call_id, render("flights", [status] if status else [], watching=not finished))
+            if finished:
+                return
+            while True:
+                status = await subscription.next()
+                if status is None:
+                    return
+                logger.info("Flight status changed: %s", status.flight)
+                await self.send(
+                    {
                         "type": "conversation.item.create",
                         "item": {
-                            "type": "function_call_output",
-                            "call_id": call_id,
-                            "output": json.dumps(result),
+                            "type": "message",
+                            "role": "system",
+                            "content": [
+                                {
+                                    "type": "input_text",
+                                    "text": "Flight status update for the user: " + render("flights", [status]),
+                                }
+                            ],
                         },
                     }
-                    # log_ws_event("outgoing", function_call_output)
-                    await websocket.send(json.dumps(function_call_output))
-                    await websocket.send(json.dumps({"type": "response.create"}))
-                    function_call = None
-                    function_call_args = ""
-            elif event_type == "response.text.delta":
-                assistant_reply += event.get("delta", "")
-                print(
-                    f"Assistant: {event.get('delta', '')}",
-                    end="",
-                    flush=True,
                 )
-            elif event_type == "response.audio.delta":
-                audio_chunk = base64.b64decode(event["delta"])
-                await audio_player.play_audio_chunk(audio_chunk, visual_interface)
-            elif event_type == "response.done":
-                if response_start_time is not None:
-                    response_duration = time.perf_counter() - response_start_time
-                    log_runtime("realtime_api_response", response_duration)
-                    response_start_time = None
-
-                logger.info("Assistant response complete.")
-                await audio_player.stop_playback(visual_interface)
-                assistant_reply = ""
-                logger.info("Calling stop_receiving()")
-                mic.stop_receiving()
-                visual_interface.set_active(False)
-                mic.start_recording()
-                logger.info("Started recording for next user input")
-            elif event_type == "rate_limits.updated":
-                mic.start_recording()
-                logger.info("Resumed recording after rate_limits.updated")
-            elif event_type == "error":
-                error_message = event.get("error", {}).get("message", "")
-                if "buffer is empty" in error_message:
-                    logger.info("Received 'buffer is empty' error, no audio data sent.")
-                    continue
-                elif "Conversation already has an active response" in error_message:
-                    logger.info(
-                        "Received 'active response' error, adjusting response flow."
-                    )
-                    continue
-                else:
-                    logger.error(f"Unhandled error: {error_message}")
-                    break
-            elif event_type == "input_audio_buffer.speech_started":
-                logger.info("Speech detected, listening...")
-                visual_interface.set_active(True)
-            elif event_type == "input_audio_buffer.speech_stopped":
-                mic.stop_recording()
-                logger.info("Speech ended, processing...")
-                visual_interface.set_active(False)
-
-                response_start_time = time.perf_counter()
-        except websockets.ConnectionClosed as e:
-            logger.error(
-                f"WebSocket connection closed with code {e.code} and reason: {e.reason}"
-            )
-            logger.error(e)
-            logger.warning("WebSocket connection closed")
-            break
+                await self.send({"type": "response.create"})
+        finally:
+            subscription.close()
+            self.flight_watches.pop(subscription, None)
+
+    def close(self):
+        """Drop this connection's tool calls, filler and flight watches."""
+        for job, task in list(self.tool_calls.values()):
+            job.cancel("connection closed")
+            task.cancel()
+        self.tool_calls.clear()
+        self.stop_filler()
+        for subscription, task in list(self.flight_watches.items()):
+            task.cancel()
+            subscription.close()
+        self.flight_watches.clear()
+
+    async def on_text_delta(self, event):
+        # Logged once per response in on_response_done, not per delta.
+        self.assistant_reply += event.get("delta", "")
+
+    async def on_audio_delta(self, event):
+        # Only reached when the fast path in handle_message declined the frame.
+        await self.play_audio(base64.b64decode(event["delta"]))
+
+    async def on_response_done(self, event):
+        if event.get("response", {}).get("status") == "cancelled":
+            self.cancel_tool_calls("the response was cancelled")
+        if self.context_pruner is not None:
+            for prune_event in self.context_pruner.prune(event):
+                await self.send(prune_event)
+        if self.response_start_time is not None:
+            response_duration = time.perf_counter() - self.response_start_time
+            log_runtime("realtime_api_response", response_duration)
+            self.response_start_time = None
+
+        if self.assistant_reply:
+            logger.info("Assistant: %s", truncate_payload(self.assistant_reply))
+        logger.info("Assistant response complete.")
+        self.awaiting_response_created = False
+        if self.filler is None or self.filler.done():
+            with tracer.span("playback_drain"):
+                await self.player.stop_playback(self.visual_interface)
+        # Otherwise a filler is covering the wait for the tool's answer; the
+        # next response fades it out and stops playback when it is done.
+        self.assistant_reply = ""
+        logger.info("Calling stop_receiving()")
+        self.mic.stop_receiving()
+        self.visual_interface.set_active(False)
+        self.mic.start_recording()
+        logger.info("Started recording for next user input")
+
+    async def on_rate_limits_updated(self, event):
+        self.mic.start_recording()
+        logger.info("Resumed recording after rate_limits.updated")
 
-    audio_player.close()
+    async def on_error(self, event):
+        error = event.get("error", {})
+        error_message = error.get("message", "")
+        if (error.get("event_id") or "").startswith(EVENT_ID_PREFIX):
+            logger.warning(f"Context pruning event rejected: {error_message}")
+        elif "buffer is empty" in error_message:
+            logger.info("Received 'buffer is empty' error, no audio data sent.")
+        elif "Conversation already has an active response" in error_message:
+            logger.info("Received 'active response' error, adjusting response flow.")
+        else:
+            logger.error(f"Unhandled error: {error_message}")
+            raise _StopProcessing()
+
+    async def on_speech_started(self, event):
+        self.stop_filler()
+        self.cancel_tool_calls("the user started speaking again")
+        logger.info("Speech detected, listening...")
+        self.visual_interface.set_active(True)
+
+    async def on_speech_stopped(self, event):
+        for subscription in self.flight_watches:
+            # A user turn keeps this session's flight watches alive.
+            subscription.touch()
+        self.mic.stop_recording()
+        logger.info("Speech ended, processing...")
+        self.visual_interface.set_active(False)
+
+        self.response_start_time = time.perf_counter()
+        # Measured from here to the first audio, even when a tool call sits
+        # in between; that is the silence the user actually hears.
+        self.speech_stopped_at = self.response_start_time
+        self.awaiting_first_audio = True
+        self.awaiting_response_created = True
+
+
+async def process_ws_messages(websocket, mic, visual_interface, transport=None, player=None, conversation_log=None, tool_functions=None):
+    """Handle server events until the connection ends.
+
+    Returns the ConnectionClosed exception when the socket dropped, so the
+    caller can decide whether to reconnect, or None after a fatal error event.
+    """
+    handler = RealtimeEventHandler(
+        websocket, mic, visual_interface, transport, player, conversation_log, tool_functions
+    )
+
+    try:
+        while True:
+            try:
+                message = await websocket.recv()
+                await handler.handle_message(message)
+            except _StopProcessing:
+                return None
+            except websockets.ConnectionClosed as e:
+                logger.error(
+                    f"WebSocket connection closed with code {e.code} and reason: {e.reason}"
+                )
+                logger.error(e)
+                logger.warning("WebSocket connection closed")
+                return e
+    finally:
+        handler.close()
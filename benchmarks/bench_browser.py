@@ -0,0 +1,147 @@
+"""Benchmark for the pooled browser lookup against a local static site.
+
+Serves a generated page with images and a web font from 127.0.0.1 and
+fetches its text repeatedly three ways: launching Chromium per lookup (what
+an unpooled browser tool does), through BrowserPool without resource
+blocking, and through BrowserPool as configured. Reports setup time and
+lookup latency percentiles as JSON. Needs `playwright install chromium`.
+
+    python -m benchmarks.bench_browser --lookups 20 --concurrency 2
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def build_page(images: int) -> bytes:
+    tags = "".join(f'<img src="/img/{i}.png" width="64" height="64">' for i in range(images))
+    paragraphs = "".join(f"<p>Museum {i} is open from 09:00 to 18:00, closed on Mondays.</p>" for i in range(40))
+    return (
+        "<!doctype html><html><head><title>Static travel page</title><style>"
+        "@font-face{font-family:Slow;src:url(/font.woff2)} body{font-family:Slow}</style></head>"
+        f"<body><h1>Opening hours</h1>{paragraphs}{tags}</body></html>"
+    ).encode()
+
+
+def start_server(images: int, asset_delay: float) -> ThreadingHTTPServer:
+    page = build_page(images)
+    asset = bytes(16 * 1024)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path in ("/", "/index.html"):
+                body, content_type = page, "text/html"
+            else:
+                # Images and fonts are slow, like a third-party CDN.
+                time.sleep(asset_delay)
+                body, content_type = asset, "application/octet-stream"
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def percentiles(samples: list) -> dict:
+    ordered = sorted(samples)
+
+    def at(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {"p50_ms": round(at(0.5), 1), "p95_ms": round(at(0.95), 1), "max_ms": round(ordered[-1] * 1000, 1)}
+
+
+def cold_lookup(url: str) -> float:
+    from playwright.sync_api import sync_playwright
+
+    started = time.perf_counter()
+    with sync_playwright() as playwright:
+        browser = playwright.chromium.launch()
+        page = browser.new_page()
+        page.goto(url, wait_until="domcontentloaded")
+        page.evaluate("() => document.body.innerText")
+        browser.close()
+    return time.perf_counter() - started
+
+
+def run_cold(url: str, lookups: int, concurrency: int) -> dict:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        latencies = list(executor.map(cold_lookup, [url] * lookups))
+    return {"setup_ms": 0.0, "lookups_per_second": round(lookups / (time.perf_counter() - started), 2), **percentiles(latencies)}
+
+
+def run_pooled(url: str, lookups: int, concurrency: int, blocked) -> dict:
+    from browser_tool.agent import read_page
+    from browser_tool.pool import BrowserPool
+
+    pool = BrowserPool(size=concurrency, blocked_resources=blocked)
+    started = time.perf_counter()
+    pool.start()
+    setup = time.perf_counter() - started
+
+    def lookup(_):
+        begun = time.perf_counter()
+        pool.run(partial(read_page, url))
+        return time.perf_counter() - begun
+
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            latencies = list(executor.map(lookup, range(lookups)))
+        elapsed = time.perf_counter() - started
+    finally:
+        pool.close()
+    return {
+        "setup_ms": round(setup * 1000, 1),
+        "lookups_per_second": round(lookups / elapsed, 2),
+        "slot_wait_ms": round(pool.wait_seconds * 1000, 1),
+        **percentiles(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lookups", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=2, help="Pool size and parallel lookups.")
+    parser.add_argument("--images", type=int, default=30)
+    parser.add_argument("--asset-delay", type=float, default=0.05, help="Seconds each image or font takes to serve.")
+    parser.add_argument("--cold-lookups", type=int, default=5, help="Lookups for the launch-per-query baseline (0 skips it).")
+    parser.add_argument("--output", metavar="PATH", help="Write JSON here instead of stdout.")
+    args = parser.parse_args()
+
+    from config import BROWSER_BLOCKED_RESOURCES
+
+    server = start_server(args.images, args.asset_delay)
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    report = {"url": url, "lookups": args.lookups, "concurrency": args.concurrency}
+    try:
+        if args.cold_lookups:
+            report["launch_per_lookup"] = run_cold(url, args.cold_lookups, args.concurrency)
+        report["pooled_unblocked"] = run_pooled(url, args.lookups, args.concurrency, ())
+        report["pooled"] = run_pooled(url, args.lookups, args.concurrency, BROWSER_BLOCKED_RESOURCES)
+    finally:
+        server.shutdown()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
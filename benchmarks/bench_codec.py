@@ -0,0 +1,121 @@
+"""Micro-benchmark for the realtime websocket codec.
+
+Compares the original json/base64 path against assistant_modules.codec for
+outbound input_audio_buffer.append frames and inbound server events.
+
+    python -m benchmarks.bench_codec --seconds 2
+"""
+import argparse
+import base64
+import json
+import os
+import time
+
+from assistant_modules import codec
+
+# One 1024-sample PCM16 chunk, the size AsyncMicrophone delivers.
+AUDIO_FRAME = os.urandom(2048)
+# Server audio deltas are typically ~100ms of 24 kHz PCM16.
+AUDIO_DELTA = json.dumps(
+    {
+        "type": "response.audio.delta",
+        "event_id": "event_AbCdEfGhIjKlMnOp",
+        "response_id": "resp_AbCdEfGhIjKlMnOp",
+        "item_id": "item_AbCdEfGhIjKlMnOp",
+        "output_index": 0,
+        "content_index": 0,
+        "delta": base64.b64encode(os.urandom(4800)).decode("ascii"),
+    }
+)
+CONTROL_EVENT = json.dumps(
+    {
+        "type": "response.function_call_arguments.delta",
+        "event_id": "event_AbCdEfGhIjKlMnOp",
+        "response_id": "resp_AbCdEfGhIjKlMnOp",
+        "item_id": "item_AbCdEfGhIjKlMnOp",
+        "output_index": 0,
+        "call_id": "call_AbCdEfGhIjKlMnOp",
+        "delta": '{"query": "flights',
+    }
+)
+
+LEGACY_EVENT_TYPES = [
+    "response.created",
+    "response.output_item.added",
+    "response.function_call_arguments.delta",
+    "response.function_call_arguments.done",
+    "response.text.delta",
+    "response.audio.delta",
+    "response.done",
+    "rate_limits.updated",
+    "error",
+    "input_audio_buffer.speech_started",
+    "input_audio_buffer.speech_stopped",
+]
+
+
+def legacy_encode(frame):
+    audio = base64.b64encode(frame).decode("utf-8")
+    return json.dumps({"type": "input_audio_buffer.append", "audio": audio})
+
+
+def legacy_decode(message):
+    event = json.loads(message)
+    event_type = event.get("type")
+    # Walk the if/elif chain the way the original handler did.
+    for candidate in LEGACY_EVENT_TYPES:
+        if event_type == candidate:
+            break
+    if event_type == "response.audio.delta":
+        return base64.b64decode(event["delta"])
+    return event
+
+
+def fast_decode(message, handlers={t: None for t in LEGACY_EVENT_TYPES}):
+    chunk = codec.decode_audio_delta(message)
+    if chunk is not None:
+        return chunk
+    event = codec.loads(message)
+    handlers.get(event.get("type"))
+    return event
+
+
+def measure(fn, arg, seconds):
+    count = 0
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        for _ in range(200):
+            fn(arg)
+        count += 200
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    assert codec.decode_audio_delta(AUDIO_DELTA) == legacy_decode(AUDIO_DELTA)
+    assert json.loads(codec.encode_audio_append(AUDIO_FRAME)) == json.loads(
+        legacy_encode(AUDIO_FRAME)
+    )
+
+    backend = "orjson" if codec.orjson is not None else "json"
+    print(f"codec backend: {backend}")
+    cases = [
+        ("encode input_audio_buffer.append", legacy_encode, codec.encode_audio_append, AUDIO_FRAME),
+        ("decode response.audio.delta", legacy_decode, fast_decode, AUDIO_DELTA),
+        ("decode control event", legacy_decode, fast_decode, CONTROL_EVENT),
+    ]
+    for name, legacy, fast, arg in cases:
+        before = measure(legacy, arg, args.seconds)
+        after = measure(fast, arg, args.seconds)
+        print(
+            f"{name:36s} legacy {before:>10,.0f} ev/s   "
+            f"codec {after:>10,.0f} ev/s   x{after / before:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
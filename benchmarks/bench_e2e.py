@@ -0,0 +1,204 @@
+"""End-to-end benchmark for the realtime event loop.
+
+Feeds a synthetic conversation, or a stream captured with
+`python runner.py --record-events PATH`, through process_ws_messages with a
+scripted websocket, null audio player, headless display and stub agents.
+Results are printed as JSON so runs on different branches can be diffed.
+
+    python -m benchmarks.bench_e2e --turns 50 --tool-latency 0.2
+    python -m benchmarks.bench_e2e --replay events.jsonl --paced --output run.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from config import CHANNELS, RATE
+from assistant_modules import codec
+from assistant_modules.connection import ConversationLog
+from assistant_modules.display import HeadlessDisplay
+from assistant_modules.gateway import ClientMic
+from assistant_modules.log_utils import setup_logging, stop_logging
+from assistant_modules.tracing import Histogram, tracer
+from assistant_modules.transport import get_transport
+from assistant_modules.websocket_handler import process_ws_messages
+from benchmarks.fakes import (
+    NullPlayer,
+    ScenarioBuilder,
+    ScriptedRealtimeSocket,
+    load_recording,
+    stub_tool_functions,
+)
+
+
+class LoopLagMonitor:
+    """Measures how late a periodic timer fires, i.e. how long the loop was blocked."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.histogram = Histogram()
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.histogram.record((loop.time() - expected) * 1e6)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> dict:
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        h = self.histogram
+        return {
+            "samples": h.count,
+            "p50_ms": h.percentile(50) / 1000,
+            "p99_ms": h.percentile(99) / 1000,
+            "max_ms": h.max / 1000,
+        }
+
+
+def build_steps(args, transport):
+    if args.replay:
+        return load_recording(args.replay)
+    builder = ScenarioBuilder(transport.bytes_per_second, server_delay=args.server_delay)
+    return builder.conversation(
+        args.turns,
+        tool_every=args.tool_every,
+        error_every=args.error_every,
+        speech_seconds=args.speech_seconds,
+        reply_seconds=args.reply_seconds,
+    )
+
+
+async def run_once(args, steps, trace_allocations: bool = False) -> dict:
+    transport = get_transport(args.transport)
+    socket = ScriptedRealtimeSocket(steps, paced=args.paced)
+    player = NullPlayer()
+    display = HeadlessDisplay()
+    tools = stub_tool_functions(args.tool_latency, args.tool_response_chars)
+    tracer.reset()
+
+    monitor = LoopLagMonitor()
+    monitor.start()
+    if trace_allocations:
+        tracemalloc.start(10)
+        before = tracemalloc.take_snapshot()
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    await process_ws_messages(
+        socket, ClientMic(), display, transport,
+        player=player, conversation_log=ConversationLog(), tool_functions=tools,
+    )
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+    result = {"loop_lag": await monitor.stop()}
+
+    if trace_allocations:
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        diff = after.compare_to(before, "lineno")
+        allocated = sum(stat.size_diff for stat in diff if stat.size_diff > 0)
+        blocks = sum(stat.count_diff for stat in diff if stat.count_diff > 0)
+        result["allocations"] = {
+            "peak_bytes": peak,
+            "retained_bytes": current,
+            "net_new_bytes": allocated,
+            "net_new_blocks": blocks,
+            "top": [
+                {"site": str(stat.traceback[0]), "size_diff": stat.size_diff, "count_diff": stat.count_diff}
+                for stat in diff[:args.top]
+            ],
+        }
+        return result
+
+    events = sum(1 for step in steps if step.kind == "recv")
+    # The player always receives 24 kHz PCM16, whatever the wire format.
+    audio_seconds = player.bytes_played / (RATE * CHANNELS * 2)
+    result.update({
+        "wall_seconds": elapsed,
+        "cpu_seconds": cpu,
+        "events": events,
+        "events_per_second": events / elapsed if elapsed else 0.0,
+        "audio_chunks": player.chunks,
+        "audio_seconds_played": audio_seconds,
+        "realtime_factor": audio_seconds / elapsed if elapsed else 0.0,
+        "tool_calls": socket.sent_types.get("conversation.item.create", 0),
+        "latency_ms": tracer.summary(),
+    })
+    return result
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--replay", metavar="PATH", help="JSONL recorded with runner.py --record-events.")
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--tool-every", type=int, default=3, help="Every Nth turn calls a tool (0 disables).")
+    parser.add_argument("--error-every", type=int, default=0, help="Every Nth turn starts with a non-fatal error event.")
+    parser.add_argument("--speech-seconds", type=float, default=2.0)
+    parser.add_argument("--reply-seconds", type=float, default=3.0)
+    parser.add_argument("--server-delay", type=float, default=0.3, help="Simulated model latency before response.created.")
+    parser.add_argument("--tool-latency", type=float, default=0.0, help="Seconds each stub agent blocks.")
+    parser.add_argument("--tool-response-chars", type=int, default=800)
+    parser.add_argument("--transport", default="pcm16", choices=["pcm16", "g711_ulaw", "g711_alaw"])
+    parser.add_argument("--paced", action="store_true", help="Honour the recorded/synthetic inter-event delays.")
+    parser.add_argument("--no-allocations", action="store_true", help="Skip the tracemalloc pass.")
+    parser.add_argument("--top", type=int, default=10, help="Allocation sites to report.")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", metavar="PATH", help="Write JSON here instead of stdout.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    setup_logging(getattr(logging, args.log_level.upper()))
+    transport = get_transport(args.transport)
+    steps = build_steps(args, transport)
+    try:
+        report = {
+            "meta": {
+                "revision": git_revision(),
+                "python": platform.python_version(),
+                "codec_backend": "orjson" if codec.orjson is not None else "json",
+                "transport": args.transport,
+                "source": args.replay or "synthetic",
+                "paced": args.paced,
+                "tool_latency": args.tool_latency,
+            },
+            # Timings come from a pass without tracemalloc, which slows
+            # allocation-heavy code several times over.
+            "run": asyncio.run(run_once(args, steps)),
+        }
+        if not args.no_allocations:
+            report["allocations"] = asyncio.run(run_once(args, steps, trace_allocations=True))["allocations"]
+    finally:
+        stop_logging()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Local stand-in for the OpenAI realtime API and the Amadeus REST API.
+
+The realtime side speaks the subset of the protocol the assistant uses:
+session.created/updated, server VAD (a turn starts once `--speech-seconds`
+of input audio has arrived), function calls that wait for the client's
+response.create, and audio deltas streamed faster than real time. The
+Amadeus side hands out tokens and canned JSON for any GET.
+
+    python -m benchmarks.fake_realtime_server --port 9100 --amadeus-port 9101
+"""
+import argparse
+import asyncio
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import websockets
+
+from benchmarks.fakes import ScenarioBuilder, TOOL_QUERIES
+
+logger = logging.getLogger(__name__)
+
+_APPEND_MARKER = '"input_audio_buffer.append"'
+
+
+class FakeRealtimeConnection:
+    def __init__(self, websocket, options):
+        self.websocket = websocket
+        self.options = options
+        self.builder = ScenarioBuilder(options.wire_bytes_per_second, server_delay=options.server_delay)
+        self.speech_bytes = int(options.speech_seconds * options.wire_bytes_per_second)
+        self.audio_bytes = 0
+        self.turns = 0
+        self.turn_task = None
+        self.response_create = asyncio.Event()
+
+    async def play_turn(self, tool):
+        steps = self.builder.turn(speech_seconds=0.0, reply_seconds=self.options.reply_seconds, tool=tool)
+        for step in steps:
+            if step.delay > 0:
+                await asyncio.sleep(step.delay)
+            if step.kind == "wait":
+                await self.response_create.wait()
+                self.response_create.clear()
+            else:
+                await self.websocket.send(step.payload)
+        self.audio_bytes = 0
+        self.turn_task = None
+
+    def _next_tool(self):
+        every = self.options.tool_every
+        if not every or self.turns % every != every - 1:
+            return None
+        tools = list(TOOL_QUERIES)
+        return tools[(self.turns // every) % len(tools)]
+
+    async def serve(self):
+        await self.websocket.send(self.builder.event("session.created", session={"id": self.builder.new_id("sess")}))
+        try:
+            async for message in self.websocket:
+                if _APPEND_MARKER in message[:64]:
+                    if self.turn_task is None:
+                        # Base64 payload length, near enough to the audio size.
+                        self.audio_bytes += (len(message) - 50) * 3 // 4
+                        if self.audio_bytes >= self.speech_bytes:
+                            self.turn_task = asyncio.create_task(self.play_turn(self._next_tool()))
+                            self.turns += 1
+                    continue
+                event_type = json.loads(message).get("type")
+                if event_type == "session.update":
+                    await self.websocket.send(self.builder.event("session.updated", session={}))
+                elif event_type == "response.create":
+                    self.response_create.set()
+        finally:
+            if self.turn_task is not None:
+                self.turn_task.cancel()
+
+
+class _AmadeusHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    payload = b"{}"
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self, body: bytes):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._reply(json.dumps({"access_token": "fake-token", "expires_in": 1799}).encode())
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        self._reply(self.payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_fake_amadeus(host: str, port: int, latency: float = 0.05, records: int = 20) -> ThreadingHTTPServer:
+    """Serve canned Amadeus responses from a background thread."""
+    record = {
+        "id": "X", "name": "Sample result", "shortDescription": "A canned Amadeus record. " * 4,
+        "price": {"amount": "123.45", "currencyCode": "EUR"},
+        "geoCode": {"latitude": 41.9, "longitude": 12.5},
+    }
+    handler = type("AmadeusHandler", (_AmadeusHandler,), {
+        "latency": latency,
+        "payload": json.dumps({"data": [dict(record, id=str(i)) for i in range(records)]}).encode(),
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-amadeus", daemon=True).start()
+    return server
+
+
+async def serve(options):
+    start_fake_amadeus(options.host, options.amadeus_port, options.amadeus_latency)
+    async with websockets.serve(
+        lambda websocket: FakeRealtimeConnection(websocket, options).serve(),
+        options.host,
+        options.port,
+        max_size=None,
+    ):
+        logger.info(
+            f"Fake realtime API on ws://{options.host}:{options.port}, "
+            f"Amadeus on http://{options.host}:{options.amadeus_port}"
+        )
+        await asyncio.Future()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--amadeus-port", type=int, default=9101)
+    parser.add_argument("--amadeus-latency", type=float, default=0.05)
+    parser.add_argument("--speech-seconds", type=float, default=2.0)
+    parser.add_argument("--reply-seconds", type=float, default=3.0)
+    parser.add_argument("--server-delay", type=float, default=0.3)
+    parser.add_argument("--tool-every", type=int, default=3)
+    parser.add_argument("--wire-bytes-per-second", type=int, default=48000, help="48000 for pcm16, 8000 for G.711.")
+    return parser.parse_args(argv)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    try:
+        asyncio.run(serve(parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""Stand-ins for the realtime API, audio devices and agents.
+
+Shared by the end-to-end benchmark and the load generator so both exercise
+the real RealtimeEventHandler against the same event streams.
+"""
+import array
+import asyncio
+import base64
+import json
+import math
+import os
+import time
+from collections import namedtuple
+
+from websockets.exceptions import ConnectionClosedOK
+from websockets.frames import Close
+
+from assistant_modules import codec
+from assistant_modules.audio_io import AudioSink
+
+# A script step: wait `delay` seconds after the previous step (when paced),
+# then either deliver `payload` to recv() ("recv") or block until the client
+# sends an event of type `payload` ("wait").
+Step = namedtuple("Step", "delay kind payload")
+
+TOOL_QUERIES = {
+    "amadeus_flight_agent": "Flights from Paris to New York on 2025-06-01, economy, non-stop",
+    "amadeus_hotel_agent": "Hotels in Barcelona with a pool, rating 4",
+    "amadeus_activities_agent": "Things to do in Rome",
+}
+
+
+class ScriptedRealtimeSocket:
+    """Plays a list of Steps to the handler and collects what it sends back."""
+
+    def __init__(self, steps, paced: bool = False):
+        self.steps = list(steps)
+        self.paced = paced
+        self.index = 0
+        self.sent_types = {}
+        self.sent_audio_frames = 0
+        self.closed = False
+        self._sent = asyncio.Condition()
+
+    async def recv(self):
+        while self.index < len(self.steps):
+            step = self.steps[self.index]
+            self.index += 1
+            if self.paced and step.delay > 0:
+                await asyncio.sleep(step.delay)
+            if step.kind == "wait":
+                async with self._sent:
+                    await self._sent.wait_for(lambda: self.sent_types.get(step.payload, 0) > 0)
+                    self.sent_types[step.payload] -= 1
+                continue
+            return step.payload
+        self.closed = True
+        raise ConnectionClosedOK(Close(1000, "end of script"), Close(1000, "end of script"), True)
+
+    async def send(self, message):
+        if '"input_audio_buffer.append"' in message[:64]:
+            self.sent_audio_frames += 1
+            return
+        event_type = codec.loads(message).get("type")
+        async with self._sent:
+            self.sent_types[event_type] = self.sent_types.get(event_type, 0) + 1
+            self._sent.notify_all()
+
+    async def close(self):
+        self.closed = True
+
+
+class NullPlayer(AudioSink):
+    """Accepts audio like AudioPlayer, without a device or the drain delay."""
+
+    def __init__(self):
+        super().__init__()
+        self.bytes_played = 0
+        self.chunks = 0
+
+    async def play_audio_chunk(self, audio_chunk: bytes, visual_interface):
+        if not self.is_playing:
+            self.is_playing = True
+            visual_interface.set_assistant_speaking(True)
+        self.bytes_played += len(audio_chunk)
+        self.chunks += 1
+        visual_interface.process_audio_data(audio_chunk)
+        await asyncio.sleep(0)
+
+    async def stop_playback(self, visual_interface):
+        if self.is_playing:
+            self.is_playing = False
+            visual_interface.set_assistant_speaking(False)
+
+
+def make_stub_agent(latency: float = 0.0, response_chars: int = 800):
+    """An agent replacement that blocks its worker thread like a real one."""
+    response = ("Found 3 options. " * (response_chars // 17 + 1))[:response_chars]
+
+    def agent(query: str):
+        if latency:
+            time.sleep(latency)
+        return response
+
+    return agent
+
+
+def stub_tool_functions(latency: float = 0.0, response_chars: int = 800) -> dict:
+    agent = make_stub_agent(latency, response_chars)
+    return {name: agent for name in TOOL_QUERIES}
+
+
+class ScenarioBuilder:
+    """Generates server event streams shaped like real realtime API turns."""
+
+    def __init__(self, wire_bytes_per_second: int, delta_ms: int = 100, server_delay: float = 0.3):
+        self.delta_ms = delta_ms
+        self.server_delay = server_delay
+        delta_bytes = wire_bytes_per_second * delta_ms // 1000
+        # Deltas are built once and reused; decoding cost does not depend on content.
+        self.delta_b64 = base64.b64encode(os.urandom(delta_bytes)).decode("ascii")
+        self.counter = 0
+
+    def new_id(self, prefix: str) -> str:
+        self.counter += 1
+        return f"{prefix}_{self.counter:012d}"
+
+    def event(self, event_type: str, **fields) -> str:
+        return json.dumps({"type": event_type, "event_id": self.new_id("event"), **fields})
+
+    def turn(self, speech_seconds: float = 2.0, reply_seconds: float = 3.0, tool: str = None, error: bool = False) -> list:
+        steps = []
+        add = lambda delay, payload: steps.append(Step(delay, "recv", payload))
+        user_item = self.new_id("item")
+        if error:
+            add(0.0, self.event("error", error={"type": "invalid_request_error", "message": "Error committing input audio buffer: buffer is empty"}))
+        add(0.0, self.event("input_audio_buffer.speech_started", audio_start_ms=0, item_id=user_item))
+        add(speech_seconds, self.event("input_audio_buffer.speech_stopped", audio_end_ms=int(speech_seconds * 1000), item_id=user_item))
+        add(0.02, self.event("input_audio_buffer.committed", item_id=user_item))
+        add(0.0, self.event(
+            "conversation.item.created",
+            item={"id": user_item, "type": "message", "role": "user", "content": [{"type": "input_audio", "transcript": None}]},
+        ))
+
+        response_id = self.new_id("resp")
+        add(self.server_delay, self.event("response.created", response={"id": response_id, "status": "in_progress"}))
+        if tool:
+            call_item, call_id = self.new_id("item"), self.new_id("call")
+            arguments = json.dumps({"query": TOOL_QUERIES.get(tool, "query")})
+            item = {"id": call_item, "type": "function_call", "call_id": call_id, "name": tool, "arguments": ""}
+            add(0.05, self.event("response.output_item.added", response_id=response_id, output_index=0, item=item))
+            add(0.0, self.event("conversation.item.created", item=item))
+            for i in range(0, len(arguments), 8):
+                add(0.005, self.event(
+                    "response.function_call_arguments.delta",
+                    response_id=response_id, item_id=call_item, call_id=call_id, delta=arguments[i:i + 8],
+                ))
+            add(0.0, self.event(
+                "response.function_call_arguments.done",
+                response_id=response_id, item_id=call_item, call_id=call_id, arguments=arguments,
+            ))
+            add(0.0, self.event("response.output_item.done", response_id=response_id, item={**item, "arguments": arguments, "status": "completed"}))
+            add(0.0, self.event("response.done", response={"id": response_id, "status": "completed"}))
+            steps.append(Step(0.0, "wait", "response.create"))
+            response_id = self.new_id("resp")
+            add(self.server_delay, self.event("response.created", response={"id": response_id, "status": "in_progress"}))
+
+        reply_item = self.new_id("item")
+        reply = {"id": reply_item, "type": "message", "role": "assistant", "content": []}
+        add(0.05, self.event("response.output_item.added", response_id=response_id, output_index=0, item=reply))
+        add(0.0, self.event("conversation.item.created", item=reply))
+        deltas = max(1, int(reply_seconds * 1000 / self.delta_ms))
+        # The server streams audio faster than real time.
+        for i in range(deltas):
+            add(self.delta_ms / 4000, self.event(
+                "response.audio.delta", response_id=response_id, item_id=reply_item,
+                output_index=0, content_index=0, delta=self.delta_b64,
+            ))
+            if i % 5 == 0:
+                add(0.0, self.event("response.audio_transcript.delta", response_id=response_id, item_id=reply_item, delta="Sure, here is "))
+        add(0.0, self.event(
+            "conversation.item.input_audio_transcription.completed",
+            item_id=user_item, content_index=0, transcript="Find me something to do",
+        ))
+        add(0.0, self.event("response.audio.done", response_id=response_id, item_id=reply_item))
+        transcript = "Sure, here is " * (deltas // 5 + 1)
+        add(0.0, self.event("response.output_item.done", response_id=response_id, item={
+            **reply, "status": "completed", "content": [{"type": "audio", "transcript": transcript}],
+        }))
+        add(0.0, self.event("response.done", response={"id": response_id, "status": "completed"}))
+        add(0.0, self.event("rate_limits.updated", rate_limits=[]))
+        return steps
+
+    def conversation(self, turns: int, tool_every: int = 3, error_every: int = 0, **turn_kwargs) -> list:
+        tools = list(TOOL_QUERIES)
+        steps = [Step(0.0, "recv", self.event("session.created", session={"id": self.new_id("sess")}))]
+        for n in range(turns):
+            tool = tools[(n // tool_every) % len(tools)] if tool_every and n % tool_every == tool_every - 1 else None
+            error = bool(error_every) and n % error_every == error_every - 1
+            steps.extend(self.turn(tool=tool, error=error, **turn_kwargs))
+        return steps
+
+
+def load_recording(path: str) -> list:
+    """Turn an EventRecorder file into Steps.
+
+    Inbound events are replayed as-is; a recorded outbound response.create
+    becomes a wait so tool calls gate the rest of the stream as they did live.
+    """
+    steps = []
+    last = 0.0
+    with open(path) as file:
+        for line in file:
+            record = json.loads(line)
+            delay, last = max(0.0, record["t"] - last), record["t"]
+            if record["dir"] == "in":
+                steps.append(Step(delay, "recv", record["message"]))
+            elif codec.loads(record["message"]).get("type") == "response.create":
+                steps.append(Step(delay, "wait", "response.create"))
+    return steps
+
+
+# Amadeus endpoints each agent hits first, with representative parameters.
+AMADEUS_CALLS = {
+    "amadeus_flight_agent": ("/v2/shopping/flight-offers", {
+        "originLocationCode": "CDG", "destinationLocationCode": "JFK",
+        "departureDate": "2025-06-01", "adults": 1, "max": 5,
+    }),
+    "amadeus_hotel_agent": ("/v1/reference-data/locations/hotels/by-city", {"cityCode": "BCN", "ratings": 4}),
+    "amadeus_activities_agent": ("/v1/shopping/activities", {"latitude": 41.9, "longitude": 12.5, "radius": 25}),
+}
+
+
+def amadeus_tool_functions(think_time: float = 0.5, response_chars: int = 800) -> dict:
+    """Agents that make one real AmadeusClient request plus simulated LLM time.
+
+    Point AMADEUS_BASE_URL at benchmarks.fake_realtime_server's Amadeus stub
+    so the shared token and HTTP pool are exercised without the network.
+    """
+    from ai.agents.amadeus_client import get_client
+
+    def make(path: str, params: dict):
+        def agent(query: str):
+            time.sleep(think_time / 2)
+            data = get_client().get(path, params=params)
+            time.sleep(think_time / 2)
+            return json.dumps(data)[:response_chars]
+
+        return agent
+
+    return {name: make(path, params) for name, (path, params) in AMADEUS_CALLS.items()}
+
+
+class SyntheticClient:
+    """A gateway client that streams PCM16 at real-time rate and counts replies.
+
+    Iterating yields one audio frame every `frame_ms`; iteration stops after
+    `turns` replies have finished playing (signalled by playback.done).
+    """
+
+    def __init__(self, turns: int, bytes_per_second: int, frame_ms: int = 20):
+        self.turns = turns
+        self.frame_seconds = frame_ms / 1000
+        samples = bytes_per_second * frame_ms // 1000 // 2
+        # A quiet 220 Hz tone; the stand-in server only counts bytes.
+        tone = [int(2000 * math.sin(2 * math.pi * 220 * i / (bytes_per_second // 2))) for i in range(samples)]
+        self.frame = array.array("h", tone).tobytes()
+        self.replies = 0
+        self.audio_bytes_received = 0
+        self.late_frames = 0
+
+    def __aiter__(self):
+        return self._frames()
+
+    async def _frames(self):
+        loop = asyncio.get_running_loop()
+        next_at = loop.time()
+        while self.replies < self.turns:
+            next_at += self.frame_seconds
+            delay = next_at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif delay < -self.frame_seconds:
+                # More than a frame behind real time: the loop is overloaded.
+                self.late_frames += 1
+            yield self.frame
+
+    async def send(self, message):
+        if isinstance(message, bytes):
+            self.audio_bytes_received += len(message)
+        elif '"playback.done"' in message:
+            self.replies += 1
+
+    async def close(self, *args):
+        pass
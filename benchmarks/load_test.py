@@ -0,0 +1,230 @@
+"""Concurrent-session load test for the gateway pipeline.
+
+Starts benchmarks.fake_realtime_server, then for each session count N runs
+a worker process hosting N GatewaySessions. Every session streams synthetic
+PCM16 at real-time rate, goes through server VAD turns and makes tool calls
+through the shared AmadeusClient against the stubbed Amadeus API. Reports
+CPU and memory per session, event-loop lag and tail latency per N, and the
+largest N that was sustained.
+
+    python -m benchmarks.load_test --sessions 10,25,50,100 --turns 4
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+
+from config import CHANNELS, RATE
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # ru_maxrss is in KiB on Linux; a peak, but the best available here.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+async def run_worker(args) -> dict:
+    from assistant_modules.gateway import GatewaySession, SessionLimits
+    from assistant_modules.tracing import tracer
+    from benchmarks.bench_e2e import LoopLagMonitor
+    from benchmarks.fakes import SyntheticClient, amadeus_tool_functions
+
+    limits = SessionLimits(max_session_seconds=3600, idle_timeout_seconds=3600)
+    tools = amadeus_tool_functions(args.think_time)
+    bytes_per_second = RATE * CHANNELS * 2
+    clients = []
+    failures = []
+
+    async def run_session(session_id: int):
+        client = SyntheticClient(args.turns, bytes_per_second)
+        clients.append(client)
+        session = GatewaySession(session_id, client, limits, tool_functions=tools)
+        try:
+            await session.run(args.realtime_url, {})
+        except Exception as e:
+            failures.append(f"{type(e).__name__}: {e}")
+
+    peak_rss = baseline_rss = rss_bytes()
+
+    async def sample_rss():
+        nonlocal peak_rss
+        while True:
+            peak_rss = max(peak_rss, rss_bytes())
+            await asyncio.sleep(0.25)
+
+    monitor = LoopLagMonitor(interval=0.01)
+    monitor.start()
+    sampler = asyncio.create_task(sample_rss())
+    cpu_started, started = cpu_seconds(), time.perf_counter()
+
+    tasks = []
+    for i in range(args.sessions):
+        tasks.append(asyncio.create_task(run_session(i + 1)))
+        # Ramp up so N handshakes do not land in the same millisecond.
+        await asyncio.sleep(args.ramp_seconds / max(1, args.sessions))
+    await asyncio.gather(*tasks)
+
+    elapsed = time.perf_counter() - started
+    cpu = cpu_seconds() - cpu_started
+    sampler.cancel()
+    lag = await monitor.stop()
+    completed = sum(1 for c in clients if c.replies >= args.turns)
+    latency = tracer.summary()
+    return {
+        "sessions": args.sessions,
+        "completed": completed,
+        "failures": failures[:5],
+        "wall_seconds": elapsed,
+        "cpu_seconds": cpu,
+        "cpu_cores_per_session": cpu / elapsed / args.sessions,
+        "rss_baseline_mb": baseline_rss / 2**20,
+        "rss_peak_mb": peak_rss / 2**20,
+        "rss_per_session_mb": (peak_rss - baseline_rss) / 2**20 / args.sessions,
+        "late_audio_frames": sum(c.late_frames for c in clients),
+        "loop_lag_ms": lag,
+        "latency_ms": {
+            stage: latency[stage]
+            for stage in latency
+            if stage.startswith(("speech_stopped", "tool_call", "amadeus_http", "playback"))
+        },
+    }
+
+
+def wait_for_port(host: str, port: int, timeout: float = 15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Fake realtime server did not come up on {host}:{port}")
+
+
+def sustained(result: dict, args) -> bool:
+    first_audio = result["latency_ms"].get("speech_stopped_to_first_audio", {})
+    return (
+        result["completed"] == result["sessions"]
+        and not result["failures"]
+        and result["loop_lag_ms"]["p99_ms"] <= args.max_loop_lag_ms
+        and first_audio.get("p99_ms", 0.0) <= args.max_first_audio_ms
+    )
+
+
+def run_driver(args) -> dict:
+    host = "127.0.0.1"
+    server = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.fake_realtime_server",
+        "--host", host, "--port", str(args.port), "--amadeus-port", str(args.port + 1),
+        "--speech-seconds", str(args.speech_seconds), "--reply-seconds", str(args.reply_seconds),
+        "--server-delay", str(args.server_delay), "--tool-every", str(args.tool_every),
+        "--amadeus-latency", str(args.amadeus_latency),
+    ], stderr=subprocess.DEVNULL)
+    levels = []
+    try:
+        wait_for_port(host, args.port)
+        env = dict(
+            os.environ,
+            AMADEUS_BASE_URL=f"http://{host}:{args.port + 1}",
+            AMADEUS_API_KEY="load-test",
+            AMADEUS_API_SECRET="load-test",
+        )
+        for n in [int(n) for n in args.sessions.split(",")]:
+            worker = subprocess.run(
+                [
+                    sys.executable, "-m", "benchmarks.load_test", "--worker",
+                    "--sessions", str(n), "--turns", str(args.turns),
+                    "--realtime-url", f"ws://{host}:{args.port}",
+                    "--think-time", str(args.think_time), "--ramp-seconds", str(args.ramp_seconds),
+                ],
+                env=env, capture_output=True, text=True,
+            )
+            if worker.returncode != 0:
+                result = {"sessions": n, "error": worker.stderr.strip().splitlines()[-5:]}
+                levels.append(result)
+                print(f"N={n:4d}  worker failed: {result['error']}", file=sys.stderr)
+                break
+            result = json.loads(worker.stdout.strip().splitlines()[-1])
+            result["sustained"] = sustained(result, args)
+            levels.append(result)
+            first_audio = result["latency_ms"].get("speech_stopped_to_first_audio", {})
+            print(
+                f"N={n:4d}  completed {result['completed']:4d}  "
+                f"cpu/session {result['cpu_cores_per_session'] * 100:5.1f}%  "
+                f"rss/session {result['rss_per_session_mb']:6.2f} MB  "
+                f"loop lag p99 {result['loop_lag_ms']['p99_ms']:7.1f} ms  "
+                f"first audio p99 {first_audio.get('p99_ms', 0.0):7.1f} ms  "
+                f"{'ok' if result['sustained'] else 'NOT SUSTAINED'}",
+                file=sys.stderr,
+            )
+            if not result["sustained"] and not args.keep_going:
+                break
+    finally:
+        server.terminate()
+        server.wait()
+
+    sustained_levels = [level["sessions"] for level in levels if level.get("sustained")]
+    return {
+        "max_sustained_sessions": max(sustained_levels, default=0),
+        "criteria": {
+            "max_loop_lag_ms": args.max_loop_lag_ms,
+            "max_first_audio_ms": args.max_first_audio_ms,
+        },
+        "levels": levels,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", default="5,10,20,40", help="Comma-separated session counts.")
+    parser.add_argument("--turns", type=int, default=4, help="Turns per session.")
+    parser.add_argument("--speech-seconds", type=float, default=2.0)
+    parser.add_argument("--reply-seconds", type=float, default=3.0)
+    parser.add_argument("--server-delay", type=float, default=0.3)
+    parser.add_argument("--tool-every", type=int, default=2)
+    parser.add_argument("--think-time", type=float, default=0.5, help="Simulated LLM time per tool call.")
+    parser.add_argument("--amadeus-latency", type=float, default=0.05)
+    parser.add_argument("--ramp-seconds", type=float, default=2.0)
+    parser.add_argument("--max-loop-lag-ms", type=float, default=50.0)
+    parser.add_argument("--max-first-audio-ms", type=float, default=2500.0)
+    parser.add_argument("--keep-going", action="store_true", help="Run every level even after one fails.")
+    parser.add_argument("--port", type=int, default=9100, help="Fake realtime port; Amadeus uses port + 1.")
+    parser.add_argument("--output", metavar="PATH")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--realtime-url", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.worker:
+        args.sessions = int(args.sessions)
+        logging.basicConfig(level=logging.ERROR)
+        print(json.dumps(asyncio.run(run_worker(args))))
+        return
+
+    report = run_driver(args)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import logging
+from functools import lru_cache, partial
+from urllib.parse import quote_plus
+
+from ai.agents.projections import text
+from assistant_modules import codec
+from browser_tool.pool import BrowserPool
+from config import BROWSER_MAX_TEXT, BROWSER_SEARCH_URL
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def get_pool() -> BrowserPool:
+    """The shared browser pool, launched on first use (or by warm_agents())."""
+    pool = BrowserPool()
+    pool.start()
+    return pool
+
+
+async def read_page(url: str, page) -> dict:
+    await page.goto(url, wait_until="domcontentloaded")
+    content = await page.evaluate("() => document.body ? document.body.innerText : ''")
+    return {"url": page.url, "title": await page.title(), "text": content}
+
+
+def browse(url: str) -> dict:
+    """Title and visible text of `url`, fetched on a pooled page."""
+    return get_pool().run(partial(read_page, url))
+
+
+def get_as_openai_function(query: str) -> str:
+    from assistant_modules.tracing import tracer
+
+    url = BROWSER_SEARCH_URL.format(query=quote_plus(query))
+    with tracer.span("agent.browser"):
+        page = browse(url)
+    logger.info(f"Browser lookup for {query!r}: {len(page['text'])} characters from {page['url']}")
+    return codec.dumps({"url": page["url"], "title": text(page["title"]), "text": text(page["text"], BROWSER_MAX_TEXT)})
+
+
+use_browser = get_as_openai_function
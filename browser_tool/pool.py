@@ -0,0 +1,171 @@
+"""Pre-launched Chromium contexts shared by every browser lookup.
+
+Launching Chromium costs seconds, so doing it per query would dominate the
+lookup. BrowserPool launches one browser on its own event-loop thread and
+opens `size` contexts up front, each with a page kept warm. A task borrows
+a context, runs against its page under a timeout and hands it back; pages
+are replaced after `max_uses` tasks or any failure so cookies, memory and
+broken state do not pile up. Images, fonts and media are aborted at the
+network layer, and `size` also bounds how many lookups run at once.
+
+Playwright is optional; it is only imported when a pool starts.
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future
+
+from config import (
+    BROWSER_BLOCKED_RESOURCES,
+    BROWSER_PAGE_MAX_USES,
+    BROWSER_POOL_SIZE,
+    BROWSER_TASK_TIMEOUT_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _Slot(object):
+    __slots__ = ("context", "page", "uses")
+
+    def __init__(self, context, page):
+        self.context = context
+        self.page = page
+        self.uses = 0
+
+
+class BrowserPool(object):
+    """Run `async def task(page)` callables on pooled Playwright pages.
+
+    run() and submit() may be called from any thread or event loop; the
+    browser itself only ever runs on the pool's thread.
+    """
+
+    def __init__(
+        self,
+        size: int = BROWSER_POOL_SIZE,
+        task_timeout: float = BROWSER_TASK_TIMEOUT_SECONDS,
+        max_uses: int = BROWSER_PAGE_MAX_USES,
+        blocked_resources=BROWSER_BLOCKED_RESOURCES,
+        headless: bool = True,
+    ):
+        self.size = size
+        self.task_timeout = task_timeout
+        self.max_uses = max_uses
+        self.blocked_resources = frozenset(blocked_resources)
+        self.headless = headless
+        self.wait_seconds = 0.0  # total time tasks spent waiting for a free page
+        self._loop = None
+        self._thread = None
+        self._playwright = None
+        self._browser = None
+        self._idle = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Launch the browser and open every context; idempotent."""
+        with self._lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="browser-pool", daemon=True)
+            thread.start()
+            started = time.perf_counter()
+            try:
+                asyncio.run_coroutine_threadsafe(self._launch(), loop).result()
+            except Exception:
+                loop.call_soon_threadsafe(loop.stop)
+                thread.join()
+                loop.close()
+                raise
+            self._loop, self._thread = loop, thread
+        logger.info(f"Browser pool of {self.size} ready in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    async def _launch(self):
+        from playwright.async_api import async_playwright
+
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        self._idle = asyncio.Queue()
+        for _ in range(self.size):
+            self._idle.put_nowait(await self._new_slot())
+
+    async def _new_slot(self) -> _Slot:
+        if not self._browser.is_connected():
+            logger.warning("Browser disconnected; relaunching")
+            self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        context = await self._browser.new_context(service_workers="block")
+        if self.blocked_resources:
+            await context.route("**/*", self._filter)
+        page = await context.new_page()
+        page.set_default_timeout(self.task_timeout * 1000)
+        return _Slot(context, page)
+
+    async def _filter(self, route):
+        if route.request.resource_type in self.blocked_resources:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _recycle(self, slot: _Slot) -> _Slot:
+        try:
+            await slot.context.close()
+        except Exception as e:
+            logger.debug(f"Closing browser context failed: {e}")
+        try:
+            return await self._new_slot()
+        except Exception as e:
+            # Keep the pool at full size; the next task retries the recycle.
+            logger.warning(f"Could not open a browser context: {e}")
+            slot.uses = self.max_uses
+            return slot
+
+    async def _run(self, task):
+        waited = time.perf_counter()
+        slot = await asyncio.wait_for(self._idle.get(), self.task_timeout)
+        self.wait_seconds += time.perf_counter() - waited
+        healthy = False
+        try:
+            if slot.uses >= self.max_uses:
+                slot = await self._recycle(slot)
+            result = await asyncio.wait_for(task(slot.page), self.task_timeout)
+            healthy = True
+            return result
+        finally:
+            slot.uses += 1
+            if not healthy or slot.uses >= self.max_uses or slot.page.is_closed():
+                slot = await self._recycle(slot)
+            self._idle.put_nowait(slot)
+
+    def submit(self, task) -> Future:
+        """Schedule `task(page)` on the pool; returns a concurrent.futures.Future."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(self._run(task), self._loop)
+
+    def run(self, task):
+        """submit() and wait; raises asyncio.TimeoutError after task_timeout."""
+        return self.submit(task).result()
+
+    async def _shutdown(self):
+        while not self._idle.empty():
+            slot = self._idle.get_nowait()
+            try:
+                await slot.context.close()
+            except Exception:
+                pass
+        await self._browser.close()
+        await self._playwright.stop()
+
+    def close(self):
+        with self._lock:
+            if self._loop is None:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(self.task_timeout)
+            except Exception as e:
+                logger.warning(f"Browser pool shutdown failed: {e}")
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = self._thread = None
@@ -2,21 +2,82 @@
 import json
 import os
 
-import pyaudio
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
 # Constants
+REALTIME_URL = os.getenv(
+    "REALTIME_URL",
+    "wss://api.openai.com/v1/realtime?model=gpt-4o-realtime-preview-2024-10-01",
+)
 PREFIX_PADDING_MS = 300
 SILENCE_THRESHOLD = 0.05
 SILENCE_DURATION_MS = 800
 RUN_TIME_TABLE_LOG_JSON = "runtime_time_table.jsonl"
 CHUNK = 1024
-FORMAT = pyaudio.paInt16
+FORMAT = 8  # pyaudio.paInt16; a literal so importing config does not load PortAudio
 CHANNELS = 1
 RATE = 24000
+# Wire format for the realtime session: pcm16, g711_ulaw or g711_alaw.
+# G.711 modes are resampled to 8 kHz and cut upstream bandwidth by 6x.
+AUDIO_TRANSPORT = os.getenv("AUDIO_TRANSPORT", "pcm16")
+G711_RATE = 8000
+# Audio devices: "pyaudio", "null" or "file:<path>" (WAV or raw PCM16,
+# memory-mapped) for input; "pyaudio", "null", "memory" or "file:<path>.wav"
+# for output. AUDIO_SPEED scales file playback (0 = as fast as possible).
+AUDIO_INPUT = os.getenv("AUDIO_INPUT", "pyaudio")
+AUDIO_OUTPUT = os.getenv("AUDIO_OUTPUT", "pyaudio")
+AUDIO_SPEED = float(os.getenv("AUDIO_SPEED", "1.0"))
+# Display backend: pygame (in-process window), process (renderer in a child
+# process) or headless (no UI, no pygame import).
+DISPLAY_BACKEND = os.getenv("DISPLAY_BACKEND", "pygame")
+
+# Reconnect and failover
+RECONNECT_BASE_DELAY = 0.25
+RECONNECT_MAX_DELAY = 8.0
+RECONNECT_MAX_ATTEMPTS = 8
+# Replay the conversation (as transcripts) into a new session after a reconnect.
+# This turns on whisper-1 input transcription, which OpenAI bills per minute
+# of user audio; set CONVERSATION_REPLAY=false to avoid that cost.
+CONVERSATION_REPLAY = os.getenv("CONVERSATION_REPLAY", "true").lower() == "true"
+# Keep a pre-authenticated standby websocket open for instant failover.
+REALTIME_STANDBY = os.getenv("REALTIME_STANDBY", "false").lower() == "true"
+STANDBY_MAX_AGE_SECONDS = 10 * 60
+
+# Gateway server mode (python runner.py --gateway)
+GATEWAY_HOST = os.getenv("GATEWAY_HOST", "0.0.0.0")
+GATEWAY_PORT = int(os.getenv("GATEWAY_PORT", "8765"))
+GATEWAY_MAX_SESSIONS = int(os.getenv("GATEWAY_MAX_SESSIONS", "50"))
+GATEWAY_MAX_SESSION_SECONDS = 30 * 60
+GATEWAY_IDLE_TIMEOUT_SECONDS = 120
+GATEWAY_MAX_AUDIO_RATE = 1.5  # multiple of real time
+GATEWAY_MAX_MESSAGE_BYTES = 64 * 1024
+
+# Logging: "text" or "json" (one structured record per line). Records are
+# written by a background thread; payloads are capped at LOG_PAYLOAD_LIMIT
+# characters and high-frequency events are sampled 1 in N.
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+LOG_PAYLOAD_LIMIT = int(os.getenv("LOG_PAYLOAD_LIMIT", "500"))
+LOG_QUEUE_SIZE = 10000
+LOG_SAMPLE_EVERY = {
+    "response.audio.delta": 200,
+    "input_audio_buffer.append": 200,
+    "response.audio_transcript.delta": 50,
+    "response.function_call_arguments.delta": 50,
+}
+
+# Prometheus /metrics endpoint; disabled when the port is 0.
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# Activity search. Amadeus results are cached per geohash cell (precision 4,
+# about 20 x 30 km) for every session; a search merges the cells covering
+# its radius and filters by distance locally.
+ACTIVITY_SEARCH_RADIUS_KM = float(os.getenv("ACTIVITY_SEARCH_RADIUS_KM", "20"))
+ACTIVITY_CACHE_TTL_SECONDS = 6 * 60 * 60
+ACTIVITY_CACHE_MAX_CELLS = 2048
 
 
 SESSION_INSTRUCTIONS = """You are a travel assistant named EMA. You are speacialized in travel and tourism. You can help user with creating travel itineraries, finding flights, hotels, and activities. You can also provide information about destinations, travel tips, and recommendations. 
@@ -30,4 +91,57 @@ Mandatory rules:  
 1. You should not say anything about your internal tools or how you work.
 2. When users asks for info which is not related to travel, you should say "I am sorry, I can only help you with travel related queries as of now."
 3. Your responses should be short and crisp and to the point.
-"""
\ No newline at end of file
+"""
+
+# Flight-status watches: a subscription whose session has had no user turn
+# for this long is dropped, and its poller stops when it was the last one.
+FLIGHT_WATCH_IDLE_SECONDS = 30 * 60
+
+# Browser fallback lookup (browser_tool/), off unless BROWSER_TOOL=true; needs
+# `playwright install chromium`. The pool keeps BROWSER_POOL_SIZE contexts
+# open, which is also the number of concurrent lookups.
+BROWSER_TOOL = os.getenv("BROWSER_TOOL", "false").lower() == "true"
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+BROWSER_TASK_TIMEOUT_SECONDS = 15.0
+BROWSER_PAGE_MAX_USES = 20
+BROWSER_BLOCKED_RESOURCES = ("image", "font", "media")
+BROWSER_SEARCH_URL = os.getenv("BROWSER_SEARCH_URL", "https://html.duckduckgo.com/html/?q={query}")
+BROWSER_MAX_TEXT = 1500
+
+# Filler clips played while a tool call runs (assistant_modules/fillers.py).
+# Off by default: no clips ship with the repo; render them first with
+# `python -m assistant_modules.fillers`, then set FILLER_AUDIO=true.
+FILLER_AUDIO = os.getenv("FILLER_AUDIO", "false").lower() == "true"
+FILLER_AUDIO_DIR = os.getenv(
+    "FILLER_AUDIO_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "assistant_modules", "data", "fillers"),
+)
+
+# Tool-call scheduling (assistant_modules/scheduler.py). Agent calls from all
+# sessions share TOOL_WORKERS threads; waiting calls start by priority (lower
+# first), then deadline. A call is abandoned once its tool's latency budget
+# is spent, since by then the user has waited too long for the answer.
+TOOL_WORKERS = int(os.getenv("TOOL_WORKERS", "8"))
+TOOL_PRIORITIES = {
+    "amadeus_flight_agent": 0,
+    "amadeus_hotel_agent": 1,
+    "amadeus_activities_agent": 2,
+    "browser_lookup": 3,
+}
+TOOL_DEFAULT_PRIORITY = 5
+TOOL_DEADLINE_SECONDS = {
+    "amadeus_flight_agent": 30.0,
+    "amadeus_hotel_agent": 30.0,
+    "amadeus_activities_agent": 20.0,
+    "browser_lookup": 15.0,
+}
+TOOL_DEFAULT_DEADLINE_SECONDS = 20.0
+
+# Conversation pruning (assistant_modules/context.py). When a response used
+# more input tokens than the budget, old tool results are shortened and then
+# the oldest items deleted until the estimate is below budget * target ratio.
+# The most recent items are never touched. A budget of 0 disables pruning.
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "12000"))
+CONTEXT_TARGET_RATIO = 0.75
+CONTEXT_KEEP_RECENT_ITEMS = 8
+CONTEXT_DIGEST_CHARS = 240
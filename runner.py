@@ -1,212 +1,317 @@
 # src/voice_assistant/main.py
+import time
+
+_PROCESS_START = time.perf_counter()
+
+import argparse
 import asyncio
-import json
 import logging
 import os
-
-import pygame
-import websockets
-from websockets.exceptions import ConnectionClosedError
+import signal
 
 from config import (
-    PREFIX_PADDING_MS,
-    SESSION_INSTRUCTIONS,
-    SILENCE_DURATION_MS,
-    SILENCE_THRESHOLD,
+    AUDIO_INPUT,
+    AUDIO_OUTPUT,
+    AUDIO_SPEED,
+    CONVERSATION_REPLAY,
+    GATEWAY_HOST,
+    GATEWAY_MAX_SESSIONS,
+    GATEWAY_PORT,
+    METRICS_HOST,
+    METRICS_PORT,
+    REALTIME_STANDBY,
+    REALTIME_URL,
 )
-from assistant_modules.microphone import AsyncMicrophone
-from assistant_modules.utils import base64_encode_audio
-from assistant_modules.log_utils import log_ws_event
-from assistant_modules.visual_interface import (
-    VisualInterface,
-    run_visual_interface,
+from assistant_modules import codec
+from assistant_modules.audio_io import get_audio_sink, get_audio_source
+from assistant_modules.connection import (
+    ConversationLog,
+    RealtimeConnectionManager,
+    close_code,
+    is_retryable,
 )
-from assistant_modules.websocket_handler import process_ws_messages
-
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s.%(msecs)03d - %(levelname)s - %(message)s",
-    datefmt="%H:%M:%S",
+from assistant_modules.transport import get_transport
+from assistant_modules.log_utils import log_ws_event, setup_logging, stop_logging
+from assistant_modules.metrics import (
+    AUDIO_BYTES_UP,
+    AUDIO_FRAMES_SENT,
+    AUDIO_INPUT_QUEUE_DEPTH,
+    start_metrics_server,
 )
+from assistant_modules.display import get_display
+from assistant_modules.session import build_session_update
+from assistant_modules.startup import StartupProfiler
+from assistant_modules.tracing import tracer
+from assistant_modules.websocket_handler import process_ws_messages, warm_agents
+
+# Set up logging; records are written from a background thread.
+setup_logging()
 logger = logging.getLogger(__name__)
 
 
-async def realtime_api():
+async def stream_microphone(websocket, mic, visual_interface, transport):
     while True:
-        try:
-            api_key = os.getenv("OPENAI_API_KEY")
-            if not api_key:
-                logger.error("Please set the OPENAI_API_KEY in your .env file.")
-                return
-
-            exit_event = asyncio.Event()
-
-            url = "wss://api.openai.com/v1/realtime?model=gpt-4o-realtime-preview-2024-10-01"
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "OpenAI-Beta": "realtime=v1",
-            }
-
-            mic = AsyncMicrophone()
-            visual_interface = VisualInterface()
-
-            async with websockets.connect(url, extra_headers=headers, ping_timeout=120 ) as websocket:
-                logger.info("Connected to the server.")
-                # Initialize the session with voice capabilities and tools
-                session_update = {
-                    "type": "session.update",
-                    "session": {
-                        "modalities": ["text", "audio"],
-                        "instructions": SESSION_INSTRUCTIONS,
-                        "voice": "ash",
-                        "input_audio_format": "pcm16",
-                        "output_audio_format": "pcm16",
-                        "turn_detection": {
-                            "type": "server_vad",
-                            "threshold": SILENCE_THRESHOLD,
-                            "prefix_padding_ms": PREFIX_PADDING_MS,
-                            "silence_duration_ms": SILENCE_DURATION_MS,
-                        },
-                        "tools": [
-                            {
-                              "name": "amadeus_hotel_agent",
-                              "type": "function",
-                              "description": "Handles any Hotel related request such as searching, or checking status of booking on a freeform user query.",
-                              "parameters": {
-                                "type": "object",
-                                "properties": {
-                                  "query": {
-                                    "type": "string",
-                                    "description": "A natural language query related to travel, such as hotel search. The query should have city name, ammenities(optional) required and rating(optional) of hotel. Example: 'I want to book a hotel in Bengaluru (BLR city code), with swimming pool, and atleast 4 star rating. What options are available?'"
-                                  }
-                                },
-                                "required": ["query"]
-                              }
-                            },
-                            {
-                              "name": "amadeus_flight_agent",
-                              "type": "function",
-                              "description": "Handles any flight related request such as searching, or checking status of flights on a freeform user query.",
-                              "parameters": {
-                                "type": "object",
-                                "properties": {
-                                  "query": {
-                                    "type": "string",
-                                    "description": "A natural language query related to travel, such as flight search, or status check. Example: 'I want to book a flight from Gorakhpur to Bengaluru for 25-05-2025. What options are available?'"
-                                  }
-                                },
-                                "required": ["query"]
-                              }
-                            },
-                            {
-                              "name": "amadeus_activities_agent",
-                              "type": "function",
-                              "description": "Handles any query related to searching for activities in a city or country on a freeform user query.",
-                              "parameters": {
-                                "type": "object",
-                                "properties": {
-                                  "query": {
-                                    "type": "string",
-                                    "description": "A natural language query related to activity search in a city or country. Example: 'Suggest me some activities to do in Paris.'"
-                                  }
-                                },
-                                "required": ["query"]
-                              }
-                            }
-
-                        ],
-                    },
-                }
-                # log_ws_event("outgoing", session_update)
-                await websocket.send(json.dumps(session_update))
-
-                ws_task = asyncio.create_task(
-                    process_ws_messages(websocket, mic, visual_interface)
-                )
-                visual_task = asyncio.create_task(
-                    run_visual_interface(visual_interface)
+        await asyncio.sleep(0.01)  # Small delay to reduce CPU usage
+        if not mic.is_receiving:
+            AUDIO_INPUT_QUEUE_DEPTH.set(mic.queue_depth())
+            audio_data = mic.get_audio_data()
+            if audio_data:
+                wire_audio = transport.encode(audio_data)
+                audio_event = codec.encode_audio_append(wire_audio)
+                log_ws_event("outgoing", "input_audio_buffer.append")
+                await websocket.send(audio_event)
+                AUDIO_FRAMES_SENT.inc()
+                AUDIO_BYTES_UP.inc(len(wire_audio))
+                # Update energy for visualization
+                visual_interface.process_audio_data(audio_data)
+            else:
+                logger.debug("No audio data to send")
+
+
+def prefetch_amadeus_token():
+    from ai.agents.amadeus_client import prefetch_token
+
+    prefetch_token()
+
+
+async def warm_up_agents(profiler: StartupProfiler):
+    # Runs after "Listening" so LangChain imports never delay the first turn.
+    start = time.perf_counter()
+    await profiler.run_in_thread("agent_warmup", warm_agents)
+    logger.info(f"Agents ready in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+async def realtime_api(
+    profiler: StartupProfiler = None,
+    profile_startup: bool = False,
+    record_events: str = None,
+    audio_in: str = None,
+    audio_out: str = None,
+    audio_speed: float = AUDIO_SPEED,
+):
+    profiler = profiler or StartupProfiler()
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        logger.error("Please set the OPENAI_API_KEY in your .env file.")
+        return
+
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "OpenAI-Beta": "realtime=v1",
+    }
+
+    # Devices, display and conversation log outlive any single connection, so
+    # a reconnect only swaps the websocket.
+    transport = get_transport()
+    conversation_log = ConversationLog() if CONVERSATION_REPLAY else None
+    manager = RealtimeConnectionManager(
+        REALTIME_URL,
+        headers,
+        lambda: build_session_update(transport),
+        conversation_log,
+        standby=REALTIME_STANDBY,
+    )
+
+    # The handshake, both audio devices and the Amadeus token come up in
+    # parallel. The display is created on the main thread (pygame requires
+    # it on some platforms) while the others are in flight.
+    startup = [
+        asyncio.create_task(profiler.run("websocket_handshake", manager.connect())),
+        asyncio.create_task(profiler.run_in_thread("audio_input_open", get_audio_source, audio_in, audio_speed)),
+        asyncio.create_task(profiler.run_in_thread("audio_output_open", get_audio_sink, audio_out, audio_speed)),
+        asyncio.create_task(profiler.run_in_thread("amadeus_token", prefetch_amadeus_token)),
+    ]
+    await asyncio.sleep(0)
+    with profiler.phase("display_init"):
+        visual_interface = get_display()
+    websocket, mic, audio_player, _ = await asyncio.gather(*startup, return_exceptions=True)
+    failures = [r for r in (websocket, mic, audio_player) if isinstance(r, BaseException)]
+    if failures:
+        for resource in (websocket, mic, audio_player):
+            if not isinstance(resource, BaseException):
+                close = resource.close()
+                if asyncio.iscoroutine(close):
+                    await close
+        visual_interface.close()
+        raise failures[0]
+
+    visual_task = asyncio.create_task(visual_interface.run())
+    recorder = None
+    if record_events:
+        from assistant_modules.recording import EventRecorder
+
+        recorder = EventRecorder(record_events)
+        logger.info(f"Recording realtime events to {record_events}")
+    warmup_task = None
+    reconnecting = False
+
+    try:
+        while True:
+            if reconnecting:
+                websocket = await manager.connect(replay=True)
+            if recorder is not None:
+                websocket = recorder.wrap(websocket)
+            logger.info("Connected to the server.")
+
+            ws_task = asyncio.create_task(
+                process_ws_messages(
+                    websocket, mic, visual_interface, transport,
+                    player=audio_player, conversation_log=conversation_log,
                 )
+            )
+            mic_task = asyncio.create_task(
+                stream_microphone(websocket, mic, visual_interface, transport)
+            )
 
+            if not reconnecting:
                 logger.info(
                     "Conversation started. Speak freely, and the assistant will respond."
                 )
-                mic.start_recording()
-                logger.info("Recording started. Listening for speech...")
-
-                try:
-                    while not exit_event.is_set():
-                        await asyncio.sleep(0.01)  # Small delay to reduce CPU usage
-                        if not mic.is_receiving:
-                            audio_data = mic.get_audio_data()
-                            if audio_data:
-                                base64_audio = base64_encode_audio(audio_data)
-                                if base64_audio:
-                                    audio_event = {
-                                        "type": "input_audio_buffer.append",
-                                        "audio": base64_audio,
-                                    }
-                                    # log_ws_event("outgoing", audio_event)
-                                    await websocket.send(json.dumps(audio_event))
-                                    # Update energy for visualization
-                                    visual_interface.process_audio_data(audio_data)
-                                else:
-                                    logger.debug("No audio data to send")
-                except KeyboardInterrupt:
-                    logger.info("Keyboard interrupt received. Closing the connection.")
-                except Exception as e:
-                    logger.exception(
-                        f"An unexpected error occurred in the main loop: {e}"
-                    )
-                finally:
-                    exit_event.set()
-                    mic.stop_recording()
-                    mic.close()
-                    await websocket.close()
-                    visual_interface.set_active(False)
-
-                # Wait for the WebSocket processing task to complete
-                try:
-                    await ws_task
-                    await visual_task
-                except Exception as e:
-                    logging.exception(f"Error in WebSocket processing task: {e}")
-
-            # If execution reaches here without exceptions, exit the loop
-            break
-        except ConnectionClosedError as e:
-            logging.error(f"WebSocket connection closed: {e}")
-            if "keepalive ping timeout" in str(e):
-                logging.warning(
-                    "WebSocket connection lost due to keepalive ping timeout. Reconnecting..."
-                )
-                await asyncio.sleep(1)  # Wait before reconnecting
-                continue  # Retry the connection
-            logging.exception("WebSocket connection closed unexpectedly.")
-            break  # Exit the loop on other connection errors
-        except Exception as e:
-            logging.exception(f"An unexpected error occurred: {e}")
-            break  # Exit the loop on unexpected exceptions
-        finally:
-            if "mic" in locals():
-                mic.stop_recording()
-                mic.close()
-            if "websocket" in locals():
+            mic.stop_receiving()
+            mic.start_recording()
+            logger.info("Recording started. Listening for speech...")
+            if warmup_task is None:
+                profiler.mark_ready()
+                if profile_startup:
+                    logger.info("Startup profile:\n" + profiler.report())
+                else:
+                    logger.info(f"Ready in {profiler.ready_at * 1000:.0f} ms")
+                warmup_task = asyncio.create_task(warm_up_agents(profiler))
+
+            await asyncio.wait([ws_task, mic_task], return_when=asyncio.FIRST_COMPLETED)
+            mic_task.cancel()
+            await asyncio.gather(mic_task, return_exceptions=True)
+            if not mic_task.cancelled() and mic_task.exception() is not None:
+                # The send side noticed the drop first; let the receive side finish.
+                logger.warning(f"Audio send failed: {mic_task.exception()}")
                 await websocket.close()
-            pygame.quit()
+            closed = await ws_task
+            await websocket.close()
+
+            if closed is None or not is_retryable(closed):
+                break
+            logger.warning(
+                f"Realtime connection lost (code {close_code(closed)}). Reconnecting..."
+            )
+            mic.stop_recording()
+            await audio_player.stop_playback(visual_interface)
+            visual_interface.set_active(False)
+            reconnecting = True
+    except KeyboardInterrupt:
+        logger.info("Keyboard interrupt received. Closing the connection.")
+    except Exception as e:
+        logger.exception(f"An unexpected error occurred: {e}")
+    finally:
+        mic.stop_recording()
+        mic.close()
+        if websocket is not None:
+            await websocket.close()
+        await manager.close()
+        audio_player.close()
+        visual_interface.set_active(False)
+        visual_interface.close()
+        if warmup_task is not None:
+            warmup_task.cancel()
+        if recorder is not None:
+            recorder.close()
+        await asyncio.gather(visual_task, return_exceptions=True)
+
+
+def log_latency_summary():
+    if tracer.histograms:
+        logger.info("Latency summary:\n" + tracer.format_summary())
+
+
+async def main_async(args, profiler):
+    flusher = asyncio.create_task(tracer.flush_forever())
+    try:
+        # `kill -USR1 <pid>` prints the live per-stage percentiles.
+        asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, log_latency_summary)
+    except (NotImplementedError, AttributeError):
+        pass
+    metrics_server = None
+    if args.metrics_port:
+        metrics_server = await start_metrics_server(METRICS_HOST, args.metrics_port)
+    try:
+        if args.gateway:
+            from assistant_modules.gateway import GatewayServer
+
+            server = GatewayServer(args.host, args.port, max_sessions=args.max_sessions)
+            await server.serve_forever()
+        else:
+            await realtime_api(
+                profiler,
+                profile_startup=args.profile_startup,
+                record_events=args.record_events,
+                audio_in=args.audio_in,
+                audio_out=args.audio_out,
+                audio_speed=args.audio_speed,
+            )
+    finally:
+        if metrics_server is not None:
+            metrics_server.close()
+        flusher.cancel()
+        await asyncio.gather(flusher, return_exceptions=True)
+        log_latency_summary()
 
 
-async def main_async():
-    await realtime_api()
+def parse_args():
+    parser = argparse.ArgumentParser(description="EMA travel voice assistant")
+    parser.add_argument(
+        "--gateway",
+        action="store_true",
+        help="Serve many client audio websockets instead of the local microphone.",
+    )
+    parser.add_argument("--host", default=GATEWAY_HOST)
+    parser.add_argument("--port", type=int, default=GATEWAY_PORT)
+    parser.add_argument("--max-sessions", type=int, default=GATEWAY_MAX_SESSIONS)
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print per-phase startup timings once the assistant is listening.",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=METRICS_PORT,
+        help="Serve Prometheus metrics on this port (0 disables).",
+    )
+    parser.add_argument(
+        "--audio-in",
+        default=AUDIO_INPUT,
+        help='Audio input: "pyaudio", "null" or "file:<path>" (WAV or raw PCM16).',
+    )
+    parser.add_argument(
+        "--audio-out",
+        default=AUDIO_OUTPUT,
+        help='Audio output: "pyaudio", "null", "memory" or "file:<path>.wav".',
+    )
+    parser.add_argument(
+        "--audio-speed",
+        type=float,
+        default=AUDIO_SPEED,
+        help="Playback speed for file input/output (0 = as fast as possible).",
+    )
+    parser.add_argument(
+        "--record-events",
+        metavar="PATH",
+        help="Record realtime traffic as JSONL for replay with benchmarks/bench_e2e.py.",
+    )
+    return parser.parse_args()
 
 
 def main():
+    profiler = StartupProfiler(origin=_PROCESS_START)
+    profiler.record("imports", _PROCESS_START, time.perf_counter())
+    args = parse_args()
     try:
-        asyncio.run(main_async())
+        asyncio.run(main_async(args, profiler))
     except KeyboardInterrupt:
         logger.info("Program terminated by user")
     except Exception as e:
         logger.exception(f"An unexpected error occurred: {e}")
+    finally:
+        stop_logging()
 
 
 if __name__ == "__main__":